@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Compiled columnar catalog (``.bcat``) for the bearing datasets.
+
+catalog.csv is compiled once into a typed binary file that is opened with
+mmap and used in place: numeric columns are float64 arrays viewed directly
+in the mapped file, text columns are uint32 codes into one interned string
+table, and every numeric column also stores its sort order so range
+indexes need no sorting at load time. Opening a compiled catalog parses
+only a small JSON header, whatever the number of rows.
+
+File layout (little-endian, every section 8-byte aligned):
+
+    b"BCAT0001"                  magic
+    u32                          header length in bytes
+    JSON header                  rows, source stamp, section offsets
+    f64[rows]     per numeric column
+    u32[rows]     per numeric column: row ids in ascending value order
+    u32[rows]     per text column: string codes
+    u32[m + 1]    string offsets into the blob
+    bytes         UTF-8 string blob
+
+Использование:
+    python scripts/bearing_catalog.py compile
+    python scripts/bearing_catalog.py info _meta/catalog.bcat
+
+API:
+    columns = load_columns(Path("kb/ru/bearings/datasets/catalog.csv"))
+    with CompiledCatalog.open(ensure_compiled()) as catalog:
+        catalog.columns["C_kN"][0], catalog.row(0)
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import json
+import mmap
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from kb_io import atomic_open
+
+DEFAULT_CATALOG = Path("kb/ru/bearings/datasets/catalog.csv")
+DEFAULT_COMPILED = Path("_meta/catalog.bcat")
+
+NUMERIC_COLUMNS = (
+    "d_mm", "D_mm", "B_mm", "C_kN", "C0_kN", "mass_kg", "rpm_grease", "rpm_oil",
+)
+TEXT_COLUMNS = ("designation", "type", "series", "manufacturer", "source")
+
+MAGIC = b"BCAT0001"
+ALIGN = 8
+LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+def _pad(n: int) -> int:
+    return -n % ALIGN
+
+
+class StringTable:
+    """Interned UTF-8 strings, decoded lazily and memoized per code."""
+
+    def __init__(self, offsets: Sequence[int], blob: memoryview) -> None:
+        self._offsets = offsets
+        self._blob = blob
+        self._cache: List[Optional[str]] = [None] * (len(offsets) - 1)
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def __getitem__(self, code: int) -> str:
+        value = self._cache[code]
+        if value is None:
+            start, stop = self._offsets[code], self._offsets[code + 1]
+            value = self._cache[code] = str(self._blob[start:stop], "utf-8")
+        return value
+
+
+class StringColumn(Sequence):
+    """Text column backed by a code array and a shared StringTable."""
+
+    def __init__(self, codes: Sequence[int], table: StringTable) -> None:
+        self.codes = codes
+        self.table = table
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.table[c] for c in self.codes[i]]
+        return self.table[self.codes[i]]
+
+
+class CompiledCatalog:
+    """Read-only view over a mapped .bcat file."""
+
+    def __init__(
+        self,
+        mm: mmap.mmap,
+        header: dict,
+        columns: Dict[str, Sequence],
+        orders: Dict[str, Sequence],
+        views: List[memoryview],
+    ) -> None:
+        self._mm = mm
+        self._views = views
+        self.header = header
+        self.size: int = header["rows"]
+        self.columns = columns
+        self.orders = orders
+
+    @classmethod
+    def open(cls, path: Path) -> "CompiledCatalog":
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if mm[: len(MAGIC)] != MAGIC:
+                raise ValueError(f"{path}: not a compiled catalog")
+            (header_len,) = struct.unpack_from("<I", mm, len(MAGIC))
+            start = len(MAGIC) + 4
+            header = json.loads(mm[start : start + header_len])
+        except Exception:
+            mm.close()
+            raise
+
+        view = memoryview(mm)
+        views = [view]
+        n = header["rows"]
+
+        def section(offset: int, typecode: str, count: int) -> Sequence:
+            raw = view[offset : offset + count * struct.calcsize(typecode)]
+            views.append(raw)
+            if LITTLE_ENDIAN:
+                views.append(raw.cast(typecode))
+                return views[-1]
+            values = array(typecode, raw)
+            values.byteswap()
+            return values
+
+        sections = header["sections"]
+        columns: Dict[str, Sequence] = {}
+        orders: Dict[str, Sequence] = {}
+        for name in header["numeric"]:
+            columns[name] = section(sections[name], "d", n)
+            orders[name] = section(sections[f"{name}.order"], "I", n)
+        m = header["strings"]
+        blob = view[sections["strings.blob"] :]
+        views.append(blob)
+        table = StringTable(section(sections["strings.offsets"], "I", m + 1), blob)
+        for name in header["text"]:
+            columns[name] = StringColumn(section(sections[name], "I", n), table)
+        return cls(mm, header, columns, orders, views)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __enter__(self) -> "CompiledCatalog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        # Views into the map must be released before the map can close.
+        for view in reversed(self._views):
+            view.release()
+        self._views, self.columns, self.orders = [], {}, {}
+        try:
+            self._mm.close()
+        except BufferError:
+            # A caller still holds its own slice of a column; the map is freed with it.
+            pass
+
+    def row(self, i: int) -> dict:
+        return {name: self.columns[name][i] for name in self.header["text"] + self.header["numeric"]}
+
+    def rows(self) -> Iterator[dict]:
+        """Typed row dicts in catalog order (numbers are floats)."""
+        for i in range(self.size):
+            yield self.row(i)
+
+
+def compiled_path(source: Path) -> Path:
+    """
+    Where the compiled copy of source lives: DEFAULT_COMPILED for the default
+    catalog, ``_meta/catalog-<stem>-<path hash>.bcat`` for any other CSV, so
+    a custom catalog never overwrites the default catalog's cache.
+    """
+    if source.resolve() == DEFAULT_CATALOG.resolve():
+        return DEFAULT_COMPILED
+    digest = hashlib.sha1(str(source.resolve()).encode("utf-8")).hexdigest()[:10]
+    return DEFAULT_COMPILED.with_name(f"catalog-{source.stem}-{digest}.bcat")
+
+
+def _source_stamp(path: Path) -> List[int]:
+    st = path.stat()
+    return [st.st_mtime_ns, st.st_size]
+
+
+def compile_catalog(source: Path = DEFAULT_CATALOG, target: Path = DEFAULT_COMPILED) -> int:
+    """Compile a catalog CSV into a .bcat file; returns the number of rows."""
+    numeric: Dict[str, array] = {name: array("d") for name in NUMERIC_COLUMNS}
+    codes: Dict[str, array] = {name: array("I") for name in TEXT_COLUMNS}
+    interned: Dict[str, int] = {}
+    with open(source, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            for name in NUMERIC_COLUMNS:
+                numeric[name].append(float(row[name]))
+            for name in TEXT_COLUMNS:
+                value = row.get(name) or ""
+                code = interned.get(value)
+                if code is None:
+                    code = interned[value] = len(interned)
+                codes[name].append(code)
+
+    n = len(numeric[NUMERIC_COLUMNS[0]])
+    blob = bytearray()
+    offsets = array("I", [0])
+    for value in interned:  # dicts keep insertion order == code order
+        blob += value.encode("utf-8")
+        offsets.append(len(blob))
+
+    payload: List[tuple] = []
+    for name in NUMERIC_COLUMNS:
+        values = numeric[name]
+        payload.append((name, values))
+        payload.append((f"{name}.order", array("I", sorted(range(n), key=values.__getitem__))))
+    for name in TEXT_COLUMNS:
+        payload.append((name, codes[name]))
+    payload.append(("strings.offsets", offsets))
+    payload.append(("strings.blob", bytes(blob)))
+
+    header = {
+        "rows": n,
+        "numeric": list(NUMERIC_COLUMNS),
+        "text": list(TEXT_COLUMNS),
+        "strings": len(interned),
+        "source": _source_stamp(source),
+        "sections": {},
+    }
+    # Offsets depend on the header length, so size the header with
+    # placeholder offsets of the final width first.
+    sizes = [(name, len(data) * getattr(data, "itemsize", 1)) for name, data in payload]
+    header["sections"] = {name: 0 for name, _ in sizes}
+    while True:
+        header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+        pos = len(MAGIC) + 4 + len(header_bytes)
+        pos += _pad(pos)
+        sections = {}
+        for name, size in sizes:
+            sections[name] = pos
+            pos += size + _pad(size)
+        if sections == header["sections"]:
+            break
+        header["sections"] = sections
+
+    with atomic_open(target, binary=True) as out:
+        out.write(MAGIC)
+        out.write(struct.pack("<I", len(header_bytes)))
+        out.write(header_bytes)
+        out.write(b"\0" * _pad(out.tell()))
+        for name, data in payload:
+            if isinstance(data, array):
+                if not LITTLE_ENDIAN:
+                    data = array(data.typecode, data)
+                    data.byteswap()
+                data.tofile(out)
+            else:
+                out.write(data)
+            out.write(b"\0" * _pad(out.tell()))
+    return n
+
+
+def is_stale(source: Path, target: Path) -> bool:
+    """True when target is missing or was compiled from a different source version."""
+    if not target.exists():
+        return True
+    try:
+        with CompiledCatalog.open(target) as catalog:
+            return catalog.header.get("source") != _source_stamp(source)
+    except (ValueError, KeyError, struct.error):
+        return True
+
+
+def ensure_compiled(source: Path = DEFAULT_CATALOG, target: Optional[Path] = None) -> Path:
+    """Compile source into target (compiled_path(source) by default) unless an up-to-date compiled file exists."""
+    if target is None:
+        target = compiled_path(source)
+    if is_stale(source, target):
+        compile_catalog(source, target)
+    return target
+
+
+def load_columns(path: Path) -> Dict[str, Sequence]:
+    """
+    Array-backed catalog columns from a .bcat or CSV file.
+
+    A compiled file is mapped in place (the map lives as long as the
+    returned columns); a CSV is parsed into ``array('d')`` numeric columns
+    and plain lists of strings.
+    """
+    if path.suffix == ".bcat":
+        return CompiledCatalog.open(path).columns
+    columns: Dict[str, Sequence] = {name: array("d") for name in NUMERIC_COLUMNS}
+    columns.update({name: [] for name in TEXT_COLUMNS})
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            for name in NUMERIC_COLUMNS:
+                columns[name].append(float(row[name]))
+            for name in TEXT_COLUMNS:
+                columns[name].append(row.get(name) or "")
+    return columns
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Компиляция каталога подшипников в колоночный формат .bcat.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_compile = sub.add_parser("compile", help="Скомпилировать CSV в .bcat")
+    p_compile.add_argument("--catalog", type=Path, default=DEFAULT_CATALOG, help="Путь к CSV-каталогу")
+    p_compile.add_argument(
+        "--output",
+        type=Path,
+        help=f"Путь к .bcat (по умолчанию {DEFAULT_COMPILED} для основного каталога, иначе _meta/catalog-<имя>-<хеш>.bcat)",
+    )
+    p_compile.add_argument("--force", action="store_true", help="Компилировать, даже если файл актуален")
+
+    p_info = sub.add_parser("info", help="Показать заголовок .bcat")
+    p_info.add_argument("path", type=Path, nargs="?", default=DEFAULT_COMPILED)
+
+    args = parser.parse_args()
+
+    if args.command == "compile":
+        if args.output is None:
+            args.output = compiled_path(args.catalog)
+        if not args.force and not is_stale(args.catalog, args.output):
+            print(f"Up to date: {args.output}")
+            return 0
+        n = compile_catalog(args.catalog, args.output)
+        print(f"Compiled {n} row(s) -> {args.output} ({args.output.stat().st_size} bytes)")
+        return 0
+
+    try:
+        with CompiledCatalog.open(args.path) as catalog:
+            header = catalog.header
+            print(f"rows: {header['rows']}")
+            print(f"strings: {header['strings']}")
+            print(f"numeric: {', '.join(header['numeric'])}")
+            print(f"text: {', '.join(header['text'])}")
+    except (OSError, ValueError) as exc:
+        print(f"ERROR: {exc}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
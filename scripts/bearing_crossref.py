@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Streaming ingester for manufacturer nomenclature tables.
+
+Each nomenclature file in inbox/processed (``# SKF``, ``Источник: <url>``,
+``Всего позиций: N`` and a ``| подшипник | аналог | завод |`` table) is
+read line by line; rows are deduplicated on the fly against a set of 8-byte
+row digests. The text of a file is never held whole: a worker keeps the
+digests of the rows seen so far and the set of distinct (bearing, analog)
+links, which it returns sorted to the parent — memory per file grows with
+its unique links, not its size. Files are parsed in a process pool and the
+links are bulk-loaded into the ``bearings_crossref`` table of
+analog-search-schema.md in a SQLite file (built next to the target and
+swapped in atomically). The per-file counts are written back to
+manufacturers.csv; the hand-maintained ``country`` column is preserved.
+
+``--csv`` additionally exports the table as a bearings_crossref CSV that
+``bearing_equivalence.py --crossref`` accepts.
+
+Использование:
+    python scripts/bearing_crossref.py build
+    python scripts/bearing_crossref.py build --csv _meta/bearings_crossref.csv
+    python scripts/bearing_crossref.py lookup 2206 "6-12213К1М"
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, fields
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from kb_io import atomic_open, atomic_path
+
+DEFAULT_SOURCES = Path("inbox/processed")
+DEFAULT_DB = Path("_meta/crossref.sqlite")
+DEFAULT_MANUFACTURERS = Path("kb/ru/bearings/datasets/manufacturers.csv")
+# Bump when the table layout changes
+DB_VERSION = 1
+
+CROSSREF_COLUMNS = (
+    "from_designation",
+    "from_system",
+    "to_manufacturer",
+    "to_designation",
+    "match_grade",
+    "match_notes",
+    "source_url",
+    "source_file",
+    "confidence",
+    "updated_at",
+)
+TABLE_HEADER = ("подшипник", "аналог", "завод")
+TITLE = re.compile(r"^#\s+(.+?)\s*$")
+SOURCE_URL = re.compile(r"^Источник:\s*(\S+)")
+TOTAL = re.compile(r"^Всего позиций:\s*(\d+)")
+WHITESPACE = re.compile(r"\s+")
+SEPARATOR = re.compile(r":?-{3,}:?")
+INSERT_BATCH = 10000
+
+# (from_designation, to_designation) of one unique row with an analog
+Link = Tuple[str, str]
+
+
+@dataclass
+class NomenclatureStats:
+    """One manufacturers.csv row (country is filled in from the existing file)."""
+
+    manufacturer: str
+    country: str
+    total_positions: int
+    extracted_rows: int
+    unique_rows: int
+    with_analogs: int
+    source_url: str
+    source_file: str
+
+
+def _cell(text: str) -> str:
+    return WHITESPACE.sub(" ", text.strip())
+
+
+def iter_table_rows(lines: Iterator[str]) -> Iterator[Tuple[str, str, str]]:
+    """(bearing, analog, plant) of each data row; header and separator rows are skipped."""
+    for line in lines:
+        if not line.startswith("|"):
+            continue
+        cells = line.strip().strip("|").split("|")
+        if len(cells) != 3:
+            continue
+        row = (_cell(cells[0]), _cell(cells[1]), _cell(cells[2]))
+        if row == TABLE_HEADER or SEPARATOR.fullmatch(row[0]):
+            continue
+        yield row
+
+
+def parse_nomenclature(path: str) -> Optional[Tuple[NomenclatureStats, List[Link]]]:
+    """
+    Stream one file: counts for manufacturers.csv and its unique (bearing, analog) links.
+
+    Returns None for files that are not nomenclature tables (no
+    ``Всего позиций`` line before the first ``---``).
+    """
+    name, url, total = "", "", None
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if line.strip() == "---":
+                break
+            m = TITLE.match(line)
+            if m and not name:
+                name = m.group(1)
+            m = SOURCE_URL.match(line)
+            if m:
+                url = m.group(1)
+            m = TOTAL.match(line)
+            if m:
+                total = int(m.group(1))
+        if total is None:
+            return None
+
+        extracted = with_analogs = 0
+        seen: set = set()
+        links: Set[Link] = set()
+        for bearing, analog, plant in iter_table_rows(f):
+            extracted += 1
+            if analog:
+                with_analogs += 1
+            digest = hashlib.blake2b(f"{bearing}\t{analog}\t{plant}".encode(), digest_size=8).digest()
+            if digest in seen:
+                continue
+            seen.add(digest)
+            if bearing and analog:
+                links.add((bearing, analog))
+
+    source_file = os.path.basename(path)
+    stats = NomenclatureStats(
+        manufacturer=name or Path(source_file).stem,
+        country="",
+        total_positions=total,
+        extracted_rows=extracted,
+        unique_rows=len(seen),
+        with_analogs=with_analogs,
+        source_url=url,
+        source_file=source_file,
+    )
+    return stats, sorted(links)
+
+
+def collect_sources(paths: Sequence[Path]) -> List[str]:
+    files: List[str] = []
+    for path in paths:
+        if path.is_file():
+            files.append(str(path))
+        else:
+            files.extend(str(p) for p in sorted(path.rglob("*.md")) if p.name != "README.md")
+    return files
+
+
+def parse_all(files: List[str], jobs: int) -> Iterator[Tuple[NomenclatureStats, List[Link]]]:
+    """Parse files (in a process pool if jobs > 1), in input order, skipping non-tables."""
+    if jobs <= 1 or len(files) < 2:
+        results = map(parse_nomenclature, files)
+        yield from (r for r in results if r is not None)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for result in pool.map(parse_nomenclature, files, chunksize=4):
+            if result is not None:
+                yield result
+
+
+def _create_schema(conn: sqlite3.Connection) -> None:
+    conn.executescript(
+        f"""
+        CREATE TABLE bearings_crossref (
+            from_designation TEXT NOT NULL,
+            from_system TEXT NOT NULL,
+            to_manufacturer TEXT NOT NULL,
+            to_designation TEXT NOT NULL,
+            match_grade TEXT,
+            match_notes TEXT,
+            source_url TEXT,
+            source_file TEXT,
+            confidence REAL,
+            updated_at TEXT
+        );
+        PRAGMA user_version = {DB_VERSION};
+        """
+    )
+
+
+def _create_indexes(conn: sqlite3.Connection) -> None:
+    conn.executescript(
+        """
+        CREATE INDEX crossref_from ON bearings_crossref (from_designation);
+        CREATE INDEX crossref_to ON bearings_crossref (to_designation, to_manufacturer);
+        """
+    )
+
+
+def build_crossref(
+    files: List[str],
+    db_path: Path = DEFAULT_DB,
+    jobs: int = 1,
+) -> List[NomenclatureStats]:
+    """Rebuild the bearings_crossref database; returns per-file statistics."""
+    stats: List[NomenclatureStats] = []
+    today = date.today().isoformat()
+    with atomic_path(db_path) as tmp:
+        conn = sqlite3.connect(tmp)
+        try:
+            conn.execute("PRAGMA journal_mode = OFF")
+            conn.execute("PRAGMA synchronous = OFF")
+            _create_schema(conn)
+            insert = f"INSERT INTO bearings_crossref VALUES ({', '.join('?' * len(CROSSREF_COLUMNS))})"
+            with conn:
+                for file_stats, links in parse_all(files, jobs):
+                    stats.append(file_stats)
+                    rows = [
+                        (bearing, "GOST", file_stats.manufacturer, analog, None, None,
+                         file_stats.source_url, file_stats.source_file, None, today)
+                        for bearing, analog in links
+                    ]
+                    for i in range(0, len(rows), INSERT_BATCH):
+                        conn.executemany(insert, rows[i:i + INSERT_BATCH])
+                _create_indexes(conn)
+        finally:
+            conn.close()
+    return stats
+
+
+def write_manufacturers(stats: List[NomenclatureStats], path: Path = DEFAULT_MANUFACTURERS) -> None:
+    """Rewrite manufacturers.csv from fresh counts, keeping countries of known manufacturers."""
+    countries: Dict[str, str] = {}
+    if path.exists():
+        with open(path, newline="", encoding="utf-8") as f:
+            countries = {row["manufacturer"]: row.get("country", "") for row in csv.DictReader(f)}
+    rows = sorted(stats, key=lambda s: (-s.total_positions, s.manufacturer))
+    with atomic_open(path) as f:
+        writer = csv.DictWriter(f, fieldnames=[field.name for field in fields(NomenclatureStats)])
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({**asdict(row), "country": countries.get(row.manufacturer, row.country)})
+
+
+def export_csv(db_path: Path, csv_path: Path) -> int:
+    """Dump bearings_crossref as CSV (the format bearing_equivalence.py --crossref reads)."""
+    conn = sqlite3.connect(db_path)
+    try:
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(CROSSREF_COLUMNS)
+            count = 0
+            for row in conn.execute(f"SELECT {', '.join(CROSSREF_COLUMNS)} FROM bearings_crossref ORDER BY rowid"):
+                writer.writerow(["" if value is None else value for value in row])
+                count += 1
+    finally:
+        conn.close()
+    return count
+
+
+def lookup(conn: sqlite3.Connection, code: str) -> List[Tuple[str, str, str, str]]:
+    """(from_designation, to_manufacturer, to_designation, source_file) rows mentioning code."""
+    code = _cell(code)
+    return conn.execute(
+        """
+        SELECT from_designation, to_manufacturer, to_designation, source_file FROM bearings_crossref
+        WHERE from_designation = ?1 OR to_designation = ?1
+        ORDER BY to_manufacturer, from_designation, to_designation
+        """,
+        (code,),
+    ).fetchall()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Кросс-справочник аналогов из таблиц номенклатуры производителей.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="Разобрать файлы номенклатуры и пересобрать базу")
+    build.add_argument("paths", nargs="*", type=Path, help=f"Файлы или папки (по умолчанию {DEFAULT_SOURCES})")
+    build.add_argument("--db", type=Path, default=DEFAULT_DB, help=f"SQLite-файл (по умолчанию {DEFAULT_DB})")
+    build.add_argument(
+        "--manufacturers",
+        type=Path,
+        default=DEFAULT_MANUFACTURERS,
+        help="manufacturers.csv для обновления счётчиков",
+    )
+    build.add_argument("--no-manufacturers", action="store_true", help="Не переписывать manufacturers.csv")
+    build.add_argument("--csv", type=Path, help="Дополнительно выгрузить bearings_crossref в CSV")
+    build.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Число процессов разбора")
+
+    find = sub.add_parser("lookup", help="Найти аналоги по обозначению")
+    find.add_argument("codes", nargs="+", help="Обозначения (ГОСТ или аналог)")
+    find.add_argument("--db", type=Path, default=DEFAULT_DB, help=f"SQLite-файл (по умолчанию {DEFAULT_DB})")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        paths = args.paths or [DEFAULT_SOURCES]
+        for path in paths:
+            if not path.exists():
+                print(f"ERROR: {path} does not exist", file=sys.stderr)
+                return 2
+        stats = build_crossref(collect_sources(paths), args.db, args.jobs)
+        if not stats:
+            print("ERROR: no nomenclature tables found", file=sys.stderr)
+            return 2
+        if not args.no_manufacturers:
+            write_manufacturers(stats, args.manufacturers)
+        extracted = sum(s.extracted_rows for s in stats)
+        unique = sum(s.unique_rows for s in stats)
+        print(f"{len(stats)} manufacturer file(s), {extracted} rows, {unique} unique -> {args.db}")
+        if args.csv:
+            print(f"{export_csv(args.db, args.csv)} link(s) -> {args.csv}")
+        return 0
+
+    if not args.db.exists():
+        print(f"ERROR: {args.db} not found (run `bearing_crossref.py build`)", file=sys.stderr)
+        return 2
+    conn = sqlite3.connect(args.db)
+    status = 0
+    try:
+        for code in args.codes:
+            rows = lookup(conn, code)
+            if not rows:
+                print(f"{code}: не найдено")
+                status = 1
+                continue
+            print(f"{code}:")
+            for bearing, manufacturer, analog, source_file in rows:
+                print(f"  {bearing} -> {manufacturer} {analog} ({source_file})")
+    finally:
+        conn.close()
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Bearing designation grammar: split a code into its parts and normalize it.
+
+ISO/manufacturer codes are read as ``[prefix letters] base [suffixes]``
+(``NU205 ECP/C3``, ``6205-2RS1/C3``, ``6205DDU``, ``62/22``); GOST codes as
+``[class digits-] digits [Cyrillic suffixes]`` (``6-180205``, ``12213К1М``).
+The last two base digits are the bore code in both systems, read the same
+way ``bore_code()`` in generate_bearing_cards.py writes it (00-03 are 10,
+12, 15 and 17 mm, 04 and above are × 5; a single digit is the bore itself;
+``/22`` is 22 mm). Prefix letters must be written together with the base:
+``W6205`` parses, but a prefix separated by a space or a dot (``W 6205``,
+``E2.6205-2Z``) is not supported and gives None.
+
+Manufacturer spellings of the same closure collapse to one seal code
+(2RS1, 2RSH, 2RSR, DDU, LLU -> 2RS; ZZ, 2ZR -> 2Z), and GOST construction
+digits of radial ball bearings map to the same codes (180205 -> 2RS;
+``parse_designation("80205", system="GOST")`` -> 2Z). A bare code is read
+as GOST only when it shows a GOST-only feature — a class prefix, Cyrillic
+suffixes, six or more digits, or three digits not starting with 6 — so a
+five-digit code such as 80205 is ISO unless system="GOST" is given. The
+GOST class prefix gives the precision (6- -> P6).
+
+All patterns are compiled once and parse_designation() is memoized, so a
+price list that repeats a code costs one dict lookup per repeat.
+
+Использование:
+    from bearing_designation import parse_designation, parse_many
+    parse_designation("6205-2RS C3").canonical   # '6205-2RS C3'
+    parse_designation("6205 2RS1/C3").seal      # '2RS'
+    python scripts/bearing_designation.py 6205DDU 180205 "NU205 ECP/C3"
+"""
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+# Suffixes joined to the base with "-" in card designations (6205-2RS, 7205-B)
+DASH_SUFFIXES = ("2RS", "2Z", "B")
+
+SEAL_CODES = {
+    "2RS": "2RS", "2RS1": "2RS", "2RSH": "2RS", "2RSR": "2RS", "2RSL": "2RS",
+    "DDU": "2RS", "LLU": "2RS", "UU": "2RS",
+    "RS": "RS", "RS1": "RS", "RSH": "RS", "RSR": "RS", "DU": "RS", "LU": "RS",
+    "2RZ": "2RZ", "LLB": "2RZ", "VV": "2RZ",
+    "RZ": "RZ", "LB": "RZ",
+    "2Z": "2Z", "ZZ": "2Z", "2ZR": "2Z",
+    "Z": "Z", "ZR": "Z",
+}
+# GOST 3395 construction digits of radial ball bearings (type digit 0)
+GOST_SEALS = {"6": "Z", "8": "2Z", "16": "RS", "18": "2RS"}
+GOST_PRECISION = {"0": "", "6": "P6", "5": "P5", "4": "P4", "2": "P2"}
+
+WHITESPACE = re.compile(r"\s+")
+SEPARATORS = re.compile(r"[\s\-./]+")
+CYRILLIC = re.compile(r"[А-ЯЁ]")
+GOST = re.compile(r"^(?:(?P<cls>\d{1,3})-)?(?P<digits>\d{3,7})(?P<rest>(?:[\s\-]?[А-ЯЁ][А-ЯЁ0-9]*)*)$")
+ISO = re.compile(r"^(?P<prefix>[A-Z]*)(?P<digits>\d{2,6})(?:/(?P<size>\d{1,4}))?(?P<rest>.*)$")
+SUFFIX_TOKEN = re.compile(
+    "(?P<seal>{seals})"
+    "|P(?P<pc>[0-6])(?P<pc_clearance>[2-5])(?![0-9])"
+    "|(?P<clearance>C[2-5]|CN)"
+    "|(?P<precision>P[0-6]X?)"
+    "|(?P<other>[A-Z](?:(?!C[2-5N]|P[0-6])[A-Z])*[0-9]*|[0-9]+)".format(
+        seals="|".join(sorted(SEAL_CODES, key=len, reverse=True))
+    )
+)
+
+
+@dataclass(frozen=True)
+class Designation:
+    """Parts of one bearing designation; empty strings for absent parts."""
+
+    text: str  # input after normalize (upper case, single spaces)
+    system: str  # ISO | GOST
+    prefix: str  # ISO prefix letters (NU, QJ) or GOST class digits (6 in 6-180205)
+    base: str  # base digits, ISO with a /size part (6205, 62/22, 180205)
+    series: str  # base without the bore code (62, 302, 1802)
+    bore_code: str  # 05, 3, /22
+    bore_mm: Optional[int]
+    seal: str  # 2RS, RS, 2RZ, RZ, 2Z, Z
+    clearance: str  # C2..C5, CN
+    precision: str  # P0..P6, P6X
+    suffixes: Tuple[str, ...]  # everything else, in input order
+
+    @property
+    def suffix_list(self) -> List[str]:
+        """Suffixes in card order: seal, other suffixes, clearance, precision."""
+        return [s for s in (self.seal, *self.suffixes, self.clearance, self.precision) if s]
+
+    @property
+    def code(self) -> str:
+        """Prefix and base without suffixes (NU205, 180205)."""
+        if self.system == "GOST":
+            return self.base
+        return self.prefix + self.base
+
+    @property
+    def without_tolerances(self) -> str:
+        """Canonical spelling without clearance and precision (6205-2RS for 6205-2RS1/C3)."""
+        if self.system == "GOST":
+            return self.base + "".join(self.suffixes)
+        return format_designation(self.code, [s for s in (self.seal, *self.suffixes) if s])
+
+    @property
+    def canonical(self) -> str:
+        """One spelling per bearing: ``6205-2RS C3`` for ISO, ``6-180205К`` for GOST."""
+        if self.system == "GOST":
+            cls = f"{self.prefix}-" if self.prefix else ""
+            return cls + self.base + "".join(self.suffixes)
+        return format_designation(self.code, self.suffix_list)
+
+
+def normalize(code: str) -> str:
+    """Upper case, trimmed, inner whitespace collapsed (same key as bearing_equivalence.normalize_code)."""
+    return WHITESPACE.sub(" ", code.strip()).upper()
+
+
+def format_designation(base: str, suffixes: Sequence[str]) -> str:
+    """Full designation string, e.g. '6205-2RS C3'."""
+    result = base
+    for i, s in enumerate(suffixes):
+        result += ("-" if i == 0 and s in DASH_SUFFIXES else " ") + s
+    return result
+
+
+def designation_slug(base: str, suffixes: Sequence[str]) -> str:
+    """Card folder name: lowercase, dash-separated (6205-2rs-c3)."""
+    return "-".join([base.lower(), *(s.lower() for s in suffixes)])
+
+
+def bore_mm(code: str) -> Optional[int]:
+    """Inverse of bore_code(): 00 -> 10, 03 -> 17, 05 -> 25, 3 -> 3, /22 -> 22."""
+    if code.startswith("/"):
+        return int(code[1:])
+    if len(code) == 1:
+        return int(code)
+    if len(code) == 2 and code.isdigit():
+        return (10, 12, 15, 17)[int(code)] if code < "04" else int(code) * 5
+    return None
+
+
+def _split_bore(digits: str, miniature: bool) -> Tuple[str, str]:
+    if miniature:
+        return digits[:-1], digits[-1]
+    if len(digits) >= 3:
+        return digits[:-2], digits[-2:]
+    return digits, ""
+
+
+def _parse_gost(text: str, m: "re.Match[str]") -> Designation:
+    cls, digits = m.group("cls") or "", m.group("digits")
+    series, bore = _split_bore(digits, miniature=False)
+    construction = digits[:-4] if len(digits) > 4 else ""
+    seal = GOST_SEALS.get(construction, "") if len(digits) > 4 and digits[-4] == "0" else ""
+    return Designation(
+        text=text,
+        system="GOST",
+        prefix=cls,
+        base=digits,
+        series=series,
+        bore_code=bore,
+        bore_mm=bore_mm(bore),
+        seal=seal,
+        clearance="",
+        precision=GOST_PRECISION.get(cls[-1:], "") if cls else "",
+        suffixes=tuple(t for t in SEPARATORS.split(m.group("rest")) if t),
+    )
+
+
+def _parse_iso(text: str, m: "re.Match[str]") -> Designation:
+    prefix, digits, size = m.group("prefix"), m.group("digits"), m.group("size")
+    if size:
+        series, bore = digits, f"/{size}"
+    else:
+        series, bore = _split_bore(digits, miniature=len(digits) == 3 and not prefix)
+    seal = clearance = precision = ""
+    others: List[str] = []
+    for token in SEPARATORS.split(m.group("rest")):
+        for part in SUFFIX_TOKEN.finditer(token):
+            if part.group("seal"):
+                seal = SEAL_CODES[part.group("seal")]
+            elif part.group("pc"):
+                precision, clearance = f"P{part.group('pc')}", f"C{part.group('pc_clearance')}"
+            elif part.group("clearance"):
+                clearance = part.group("clearance")
+            elif part.group("precision"):
+                precision = part.group("precision")
+            else:
+                others.append(part.group("other"))
+    return Designation(
+        text=text,
+        system="ISO",
+        prefix=prefix,
+        base=f"{digits}/{size}" if size else digits,
+        series=series,
+        bore_code=bore,
+        bore_mm=bore_mm(bore) if bore else None,
+        seal=seal,
+        clearance=clearance,
+        precision=precision,
+        suffixes=tuple(others),
+    )
+
+
+def _looks_gost(m: "re.Match[str]") -> bool:
+    """Bare codes are ISO unless GOST-only features show: a class prefix, Cyrillic, 6+ digits or 3 digits not 6xx."""
+    digits = m.group("digits")
+    return bool(
+        m.group("cls")
+        or CYRILLIC.search(m.group("rest"))
+        or len(digits) >= 6
+        or (len(digits) == 3 and not digits.startswith("6"))
+    )
+
+
+@lru_cache(maxsize=65536)
+def parse_designation(code: str, system: Optional[str] = None) -> Optional[Designation]:
+    """
+    Parts of code, or None if it has no base digits.
+
+    system ("ISO" or "GOST") settles codes valid in both (7204 is a GOST
+    tapered roller and an ISO angular contact bearing); without it bare
+    digits are ISO unless they can only be GOST.
+    """
+    text = normalize(code)
+    gost = GOST.match(text)
+    if gost is not None and (system == "GOST" or (system is None and _looks_gost(gost))):
+        return _parse_gost(text, gost)
+    iso = ISO.match(text)
+    if iso is not None and system != "GOST":
+        return _parse_iso(text, iso)
+    return None
+
+
+def parse_many(codes: Iterable[str], system: Optional[str] = None) -> List[Optional[Designation]]:
+    """parse_designation() over a batch; repeated codes hit the cache."""
+    return [parse_designation(code, system) for code in codes]
+
+
+def canonical_key(code: str, system: Optional[str] = None) -> str:
+    """Lookup key: the canonical spelling if code parses, else normalize(code)."""
+    parsed = parse_designation(code, system)
+    return parsed.canonical if parsed is not None else normalize(code)
+
+
+def lookup_keys(code: str, system: Optional[str] = None) -> List[str]:
+    """Keys to try for code, most specific first: canonical, then without clearance and precision."""
+    parsed = parse_designation(code, system)
+    if parsed is None:
+        return [normalize(code)]
+    keys = [parsed.canonical]
+    if parsed.without_tolerances != parsed.canonical:
+        keys.append(parsed.without_tolerances)
+    return keys
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Разбор обозначений подшипников на части.")
+    parser.add_argument("codes", nargs="+", help="Обозначения, напр. \"6205-2RS C3\" или 180205")
+    parser.add_argument("--system", choices=("ISO", "GOST"), help="Система обозначения (по умолчанию — определить)")
+    args = parser.parse_args()
+
+    status = 0
+    for code, parsed in zip(args.codes, parse_many(args.codes, args.system)):
+        if parsed is None:
+            print(f"{code}: не разобрано")
+            status = 1
+            continue
+        bore = f"{parsed.bore_code} (d = {parsed.bore_mm} мм)" if parsed.bore_mm is not None else parsed.bore_code
+        print(f"{code}: {parsed.canonical} [{parsed.system}]")
+        for label, value in (
+            ("prefix", parsed.prefix),
+            ("base", parsed.base),
+            ("series", parsed.series),
+            ("bore", bore),
+            ("seal", parsed.seal),
+            ("clearance", parsed.clearance),
+            ("precision", parsed.precision),
+            ("suffixes", " ".join(parsed.suffixes)),
+        ):
+            if value:
+                print(f"  {label:<10} {value}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
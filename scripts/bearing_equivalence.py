@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Cross-brand designation resolution via equivalence classes.
+
+Every row of equivalents.csv (and every edge of an optional
+``bearings_crossref`` CSV, see analog-search-schema.md) links designations
+of different manufacturers. A union-find over (system, code) nodes groups
+them into equivalence classes; the result is persisted as a compact JSON
+lookup (normalized code -> class ids), so resolving "NSK 6205DDU" to its
+GOST sibling is a single dict lookup.
+
+Nodes are qualified by system because the same string can name different
+bearings: GOST 7204 is the tapered roller 30204, ISO 7204 is an angular
+contact ball bearing. A bare code may therefore map to several classes;
+passing the manufacturer narrows it down.
+
+The lookup file is rebuilt automatically when any source file changes.
+
+Использование:
+    python scripts/bearing_equivalence.py 6205DDU --to GOST
+    python scripts/bearing_equivalence.py 180205 "7201 BEP"
+    python scripts/bearing_equivalence.py 7204 --from GOST
+    python scripts/bearing_equivalence.py --rebuild --crossref _meta/bearings_crossref.csv 6205
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from bearing_designation import lookup_keys
+
+DEFAULT_EQUIVALENTS = Path("kb/ru/bearings/datasets/equivalents.csv")
+DEFAULT_INDEX = Path("_meta/equivalence_index.json")
+INDEX_VERSION = 2
+
+# equivalents.csv column -> manufacturer/system label
+EQUIVALENTS_COLUMNS = {
+    "base_designation": "ISO",
+    "SKF": "SKF",
+    "FAG": "FAG",
+    "NTN": "NTN",
+    "NSK": "NSK",
+    "GOST": "GOST",
+}
+MANUFACTURER_ALIASES = {"ГОСТ": "GOST"}
+
+# Stronger grade wins when a code is linked more than once.
+GRADE_RANK = {"exact": 0, "functional": 1, "unknown": 2}
+
+WHITESPACE = re.compile(r"\s+")
+
+# (manufacturer, code, equivalence_type)
+Member = Tuple[str, str, str]
+
+
+def normalize_code(code: str) -> str:
+    """Lookup key: upper case, trimmed, inner whitespace collapsed."""
+    return WHITESPACE.sub(" ", code.strip()).upper()
+
+
+def normalize_manufacturer(name: str) -> str:
+    name = name.strip()
+    return MANUFACTURER_ALIASES.get(name, MANUFACTURER_ALIASES.get(name.upper(), name.upper()))
+
+
+class UnionFind:
+    """Union-find over hashable keys with path halving and union by size."""
+
+    def __init__(self) -> None:
+        self.parent: Dict[str, str] = {}
+        self.size: Dict[str, int] = {}
+
+    def add(self, key: str) -> None:
+        if key not in self.parent:
+            self.parent[key] = key
+            self.size[key] = 1
+
+    def find(self, key: str) -> str:
+        parent = self.parent
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    def union(self, a: str, b: str) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+
+
+def iter_equivalents_links(path: Path) -> Iterable[List[Member]]:
+    """One group of linked members per equivalents.csv row."""
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            grade = (row.get("equivalence_type") or "unknown").strip() or "unknown"
+            group = [
+                (label, row[column].strip(), grade)
+                for column, label in EQUIVALENTS_COLUMNS.items()
+                if (row.get(column) or "").strip()
+            ]
+            if group:
+                yield group
+
+
+def iter_crossref_links(path: Path) -> Iterable[List[Member]]:
+    """One pair of linked members per bearings_crossref row."""
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            src = (row.get("from_designation") or "").strip()
+            dst = (row.get("to_designation") or "").strip()
+            if not src or not dst:
+                continue
+            grade = (row.get("match_grade") or "").strip() or "unknown"
+            yield [
+                (normalize_manufacturer(row.get("from_system") or "GOST"), src, grade),
+                (normalize_manufacturer(row.get("to_manufacturer") or ""), dst, grade),
+            ]
+
+
+class EquivalenceIndex:
+    """Normalized code -> equivalence classes of (manufacturer, code, equivalence_type)."""
+
+    def __init__(self, classes: List[List[Member]], lookup: Dict[str, List[int]]) -> None:
+        self.classes = classes
+        self.lookup = lookup
+
+    @classmethod
+    def build(cls, groups: Iterable[List[Member]]) -> "EquivalenceIndex":
+        uf = UnionFind()
+        members: Dict[str, Member] = {}
+        for group in groups:
+            keys = []
+            for mfr, code, grade in group:
+                key = f"{mfr}\t{normalize_code(code)}"
+                uf.add(key)
+                keys.append(key)
+                old = members.get(key)
+                if old is None or GRADE_RANK.get(grade, 3) < GRADE_RANK.get(old[2], 3):
+                    members[key] = (mfr, code, grade)
+            for key in keys[1:]:
+                uf.union(keys[0], key)
+
+        by_root: Dict[str, List[Member]] = {}
+        for key, member in members.items():
+            by_root.setdefault(uf.find(key), []).append(member)
+
+        classes: List[List[Member]] = []
+        lookup: Dict[str, List[int]] = {}
+        for root in sorted(by_root):
+            class_id = len(classes)
+            classes.append(sorted(by_root[root]))
+            for _mfr, code, _grade in classes[-1]:
+                ids = lookup.setdefault(normalize_code(code), [])
+                if not ids or ids[-1] != class_id:
+                    ids.append(class_id)
+        return cls(classes, lookup)
+
+    def resolve(self, code: str, manufacturer: Optional[str] = None) -> List[List[Member]]:
+        """
+        Equivalence classes containing code (optionally only as manufacturer's code).
+
+        A code spelled differently from the sources (6206 2RS1, 6206LLU) is
+        retried under its canonical spelling from bearing_designation, then
+        without clearance and precision (6206-2RS1/C3 -> 6206-2RS).
+        """
+        key = normalize_code(code)
+        if key not in self.lookup:
+            system = "GOST" if manufacturer and normalize_manufacturer(manufacturer) == "GOST" else None
+            keys = [normalize_code(k) for k in lookup_keys(code, system)]
+            key = next((k for k in keys if k in self.lookup), key)
+        classes = [self.classes[i] for i in self.lookup.get(key, ())]
+        if manufacturer:
+            source = normalize_manufacturer(manufacturer)
+            classes = [
+                c for c in classes if any(m[0] == source and normalize_code(m[1]) == key for m in c)
+            ]
+        return classes
+
+    def translate(self, code: str, to: str, manufacturer: Optional[str] = None) -> List[Member]:
+        """Codes of the target manufacturer/system equivalent to code."""
+        target = normalize_manufacturer(to)
+        return [m for c in self.resolve(code, manufacturer) for m in c if m[0] == target]
+
+    def to_json(self, sources: Dict[str, List[int]]) -> str:
+        return json.dumps(
+            {
+                "version": INDEX_VERSION,
+                "sources": sources,
+                "classes": self.classes,
+                "lookup": self.lookup,
+            },
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+
+
+def _source_stamps(paths: Sequence[Path]) -> Dict[str, List[int]]:
+    stamps = {}
+    for p in paths:
+        st = p.stat()
+        stamps[p.as_posix()] = [st.st_mtime_ns, st.st_size]
+    return stamps
+
+
+def load_or_build(
+    equivalents: Path = DEFAULT_EQUIVALENTS,
+    crossrefs: Sequence[Path] = (),
+    index_path: Path = DEFAULT_INDEX,
+    rebuild: bool = False,
+) -> EquivalenceIndex:
+    """Load the persisted lookup, rebuilding it if any source changed."""
+    sources = [equivalents, *crossrefs]
+    stamps = _source_stamps(sources)
+    if not rebuild and index_path.exists():
+        data = json.loads(index_path.read_text(encoding="utf-8"))
+        if data.get("version") == INDEX_VERSION and data.get("sources") == stamps:
+            return EquivalenceIndex([[tuple(m) for m in c] for c in data["classes"]], data["lookup"])
+
+    groups: List[List[Member]] = list(iter_equivalents_links(equivalents))
+    for path in crossrefs:
+        groups.extend(iter_crossref_links(path))
+    index = EquivalenceIndex.build(groups)
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = index_path.with_suffix(index_path.suffix + ".tmp")
+    tmp.write_text(index.to_json(stamps), encoding="utf-8")
+    tmp.replace(index_path)
+    return index
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Поиск эквивалентов подшипника по любому коду производителя.")
+    parser.add_argument("codes", nargs="+", help="Обозначения, напр. 6205DDU или \"7201 BEP\"")
+    parser.add_argument("--from", dest="source", help="Производитель/система входного кода (SKF, FAG, NTN, NSK, GOST, ISO)")
+    parser.add_argument("--to", help="Вывести только коды этого производителя/системы (SKF, FAG, NTN, NSK, GOST)")
+    parser.add_argument("--equivalents", type=Path, default=DEFAULT_EQUIVALENTS, help="Путь к equivalents.csv")
+    parser.add_argument(
+        "--crossref",
+        type=Path,
+        action="append",
+        default=[],
+        help="CSV в формате bearings_crossref (можно несколько раз)",
+    )
+    parser.add_argument("--index", type=Path, default=DEFAULT_INDEX, help="Файл индекса")
+    parser.add_argument("--rebuild", action="store_true", help="Перестроить индекс")
+    args = parser.parse_args()
+
+    index = load_or_build(args.equivalents, args.crossref, args.index, args.rebuild)
+
+    status = 0
+    for code in args.codes:
+        classes = index.resolve(code, args.source)
+        if args.to:
+            target = normalize_manufacturer(args.to)
+            classes = [[m for m in c if m[0] == target] for c in classes]
+            classes = [c for c in classes if c]
+        if not classes:
+            print(f"{code}: не найдено")
+            status = 1
+            continue
+        for n, members in enumerate(classes, 1):
+            suffix = f" (вариант {n} из {len(classes)})" if len(classes) > 1 else ""
+            print(f"{code}{suffix}:")
+            for mfr, sibling, grade in members:
+                print(f"  {mfr:<6} {sibling:<16} {grade}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
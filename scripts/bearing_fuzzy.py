@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Typo-tolerant designation search over every known code.
+
+The index holds the designations of catalog.csv, equivalents.csv and the
+``bearings_crossref`` table (bearing_crossref.py). Codes are compared by a
+search key: Cyrillic look-alikes folded to Latin, seals typed by sound
+mapped back (``6205-2РС`` -> ``6205-2RS``), then bearing_match.compact_key()
+— so ``6205 2rs``, ``62052RS`` and ``6205-2РС`` share the key ``62052RS``.
+
+A query collects candidates from four places and ranks them by edit
+distance, then by trigram overlap:
+
+- the exact key (one dict lookup);
+- designations on the query's own base (prefix and digits from
+  bearing_designation: ``NU205`` for ``NU205 ECP/C3``, or the leading
+  letters and digit run, which differ when a typed extra digit moves the
+  parser's cut, and the base without a GOST class: ``180205`` for
+  ``6-180205``) within MAX_LENGTH_GAP characters of the query's length;
+- base codes within one edit of those, found through a single-deletion
+  table — the query's deletions are looked up instead of walking the
+  bases — each tried bare and with the query's suffix (``180250-2RS`` ->
+  ``180200-2RS``);
+- character trigrams for suffix and spelling variants, counting only the
+  rarest posting lists (prefix filtering) up to SCAN_BUDGET entries.
+
+Only when none of these is within one edit of the query is the BK-tree
+over base codes walked with radius 2. A BK-tree visit costs an edit
+distance per node, so over 10^5 bases it stays off the common path;
+the deletion table answers radius 1 in a couple of dozen dict lookups.
+
+Dropping a GOST class costs one edit, and among equal distances the
+class-less base ranks first: ``6-180205`` finds ``180205`` at d=1 ahead
+of ``6-180204``.
+
+Edit distances use Hyyrö's bit-parallel Levenshtein: one pass of integer
+operations per character of the candidate, the query's bit masks built
+once per query.
+
+Использование:
+    python scripts/bearing_fuzzy.py "6205 2rs" 62052RS "6205-2РС"
+    python scripts/bearing_fuzzy.py -k 5 180250 --db _meta/crossref.sqlite
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import math
+import re
+import sqlite3
+import sys
+import time
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from bearing_crossref import DEFAULT_DB
+from bearing_designation import normalize, parse_designation
+from bearing_equivalence import DEFAULT_EQUIVALENTS, EQUIVALENTS_COLUMNS
+from bearing_match import compact_key, trigrams
+
+DEFAULT_CATALOG = Path("kb/ru/bearings/datasets/catalog.csv")
+
+TOP_K = 10
+MIN_DICE = 0.5
+MAX_POSTING = 20000  # trigrams shared by more keys do not narrow the search
+SCAN_BUDGET = 4000  # posting entries counted per query beyond the rarest list
+TRIGRAM_CANDIDATES = 64
+MAX_LENGTH_GAP = 2
+BK_RADIUS = 2
+
+# Cyrillic letters that look like Latin ones (С3 typed for C3, Е for E)
+HOMOGLYPHS = str.maketrans("АВЕЁКМНОРСТУХ", "ABEEKMHOPCTYX")
+# Seal suffixes typed by sound on a Russian layout (2РС for 2RS, ЗЗ for ZZ)
+PHONETIC_SUFFIXES = {"2РС": "2RS", "РС": "RS", "2З": "2Z", "ЗЗ": "ZZ"}
+PHONETIC = re.compile("|".join(sorted(PHONETIC_SUFFIXES, key=len, reverse=True)))
+
+# leading letters and the whole first digit run: 7118561TN9 -> 7118561 where the parser stops at 711856
+LEADING_BASE = re.compile(r"\d{1,2}-\d+|[^\W\d_]*\d+")
+
+# (code as written in the source, source: catalog or manufacturer/system)
+Entry = Tuple[str, str]
+
+
+def fold_homoglyphs(code: str) -> str:
+    """normalize() with Cyrillic look-alikes folded to Latin: ``6205-2РС`` -> ``6205-2RS``, ``С3`` -> ``C3``."""
+    text = normalize(code)
+    return PHONETIC.sub(lambda m: PHONETIC_SUFFIXES[m.group(0)], text).translate(HOMOGLYPHS)
+
+
+def search_key(code: str) -> str:
+    """compact_key() of the homoglyph-folded code: ``6205-2РС`` -> ``62052RS``."""
+    return compact_key(fold_homoglyphs(code))
+
+
+def base_key(code: str) -> str:
+    """Search key of the base code (``NU205 ECP/C3`` -> ``NU205``); the whole key if it does not parse."""
+    folded = fold_homoglyphs(code)
+    parsed = parse_designation(folded)
+    return compact_key(parsed.code if parsed is not None else folded)
+
+
+def deletions(word: str) -> Set[str]:
+    """word itself and every string one deletion away."""
+    return {word} | {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+def pattern_masks(pattern: str) -> Dict[str, int]:
+    """Bit mask of the positions of each character of pattern."""
+    masks: Dict[str, int] = {}
+    for i, ch in enumerate(pattern):
+        masks[ch] = masks.get(ch, 0) | (1 << i)
+    return masks
+
+
+def levenshtein(masks: Dict[str, int], m: int, text: str) -> int:
+    """Edit distance between the pattern behind masks (length m) and text (Hyyrö 2001)."""
+    if m == 0:
+        return len(text)
+    full = (1 << m) - 1
+    high = 1 << (m - 1)
+    vp, vn, score = full, 0, m
+    for ch in text:
+        eq = masks.get(ch, 0)
+        xv = eq | vn
+        xh = (((eq & vp) + vp) ^ vp) | eq
+        hp = vn | (~(xh | vp) & full)
+        hn = vp & xh
+        if hp & high:
+            score += 1
+        elif hn & high:
+            score -= 1
+        hp = ((hp << 1) | 1) & full
+        hn = (hn << 1) & full
+        vp = hn | (~(xv | hp) & full)
+        vn = hp & xv
+    return score
+
+
+class BKTree:
+    """Burkhard–Keller tree over strings under Levenshtein distance."""
+
+    def __init__(self, words: Iterable[str] = ()) -> None:
+        self.root: Optional[list] = None  # [word, {distance: child}]
+        self.size = 0
+        for word in words:
+            self.add(word)
+
+    def add(self, word: str) -> None:
+        if self.root is None:
+            self.root = [word, {}]
+            self.size = 1
+            return
+        masks, m = pattern_masks(word), len(word)
+        node = self.root
+        while True:
+            d = levenshtein(masks, m, node[0])
+            if d == 0:
+                return
+            child = node[1].get(d)
+            if child is None:
+                node[1][d] = [word, {}]
+                self.size += 1
+                return
+            node = child
+
+    def search(self, word: str, radius: int) -> List[Tuple[int, str]]:
+        """(distance, word) for every stored word within radius of word."""
+        if self.root is None:
+            return []
+        masks, m = pattern_masks(word), len(word)
+        found = []
+        stack = [self.root]
+        while stack:
+            node_word, children = stack.pop()
+            d = levenshtein(masks, m, node_word)
+            if d <= radius:
+                found.append((d, node_word))
+            for dist, child in children.items():
+                if d - radius <= dist <= d + radius:
+                    stack.append(child)
+        return found
+
+
+@dataclass(frozen=True)
+class Hit:
+    key: str
+    distance: int
+    similarity: float
+    entries: Tuple[Entry, ...]
+
+
+class FuzzyIndex:
+    """Search key -> codes, with a BK-tree over base codes and trigram postings over keys."""
+
+    def __init__(self, entries: Iterable[Entry]) -> None:
+        self.codes: Dict[str, List[Entry]] = {}
+        for code, source in entries:
+            key = search_key(code)
+            if key:
+                bucket = self.codes.setdefault(key, [])
+                if (code, source) not in bucket:
+                    bucket.append((code, source))
+        self.keys: List[str] = sorted(self.codes)
+        self.by_base: Dict[str, List[int]] = {}
+        self.postings: Dict[str, array] = {}
+        for i, key in enumerate(self.keys):
+            self.by_base.setdefault(base_key(self.codes[key][0][0]), []).append(i)
+            for gram in set(trigrams(key)):
+                posting = self.postings.get(gram)
+                if posting is None:
+                    posting = self.postings[gram] = array("i")
+                posting.append(i)
+        self.near: Dict[str, List[str]] = {}
+        for base in self.by_base:
+            for variant in deletions(base):
+                self.near.setdefault(variant, []).append(base)
+        self.bases = BKTree(sorted(self.by_base))
+
+    @classmethod
+    def from_sources(
+        cls,
+        catalog: Optional[Path] = DEFAULT_CATALOG,
+        equivalents: Optional[Path] = DEFAULT_EQUIVALENTS,
+        crossref_db: Optional[Path] = DEFAULT_DB,
+    ) -> "FuzzyIndex":
+        return cls(iter_known_codes(catalog, equivalents, crossref_db))
+
+    def _trigram_candidates(self, key: str) -> List[int]:
+        """Keys sharing the most trigrams with key, counted over its rarest posting lists."""
+        grams = set(trigrams(key))
+        needed = max(1, math.ceil(MIN_DICE * len(grams) / (2.0 - MIN_DICE) - 1e-9))
+        lists = sorted((self.postings[g] for g in grams if g in self.postings), key=len)
+        shared: Counter = Counter()
+        scanned = 0
+        for posting in lists[: len(grams) - needed + 1]:
+            if len(posting) > MAX_POSTING or (scanned and scanned + len(posting) > SCAN_BUDGET):
+                break
+            shared.update(posting)
+            scanned += len(posting)
+        return [i for i, _n in shared.most_common(TRIGRAM_CANDIDATES)]
+
+    def near_bases(self, base: str) -> Set[str]:
+        """Known bases within one edit of base: a shared single deletion, checked by edit distance."""
+        masks, m = pattern_masks(base), len(base)
+        found = set()
+        for variant in deletions(base):
+            for other in self.near.get(variant, ()):
+                if other not in found and levenshtein(masks, m, other) <= 1:
+                    found.add(other)
+        return found
+
+    @staticmethod
+    def _suffix(key: str, bare: str, base: str) -> str:
+        """What follows base in key (or in its class-less form bare); empty if neither starts with base."""
+        for text in (key, bare):
+            if text and text.startswith(base):
+                return text[len(base):]
+        return ""
+
+    def search(self, query: str, k: int = TOP_K) -> List[Hit]:
+        """Top k known keys closest to query (edit distance, then trigram overlap)."""
+        key = search_key(query)
+        if not key:
+            return []
+        masks, m = pattern_masks(key), len(key)
+        folded = fold_homoglyphs(query)
+        parsed = parse_designation(folded)
+        # a GOST class prefix dropped counts as one edit: 6-180205 -> 180205 at d=1
+        bare = ""
+        if parsed is not None and parsed.system == "GOST" and parsed.prefix and key.startswith(parsed.prefix + "-"):
+            bare = key[len(parsed.prefix) + 1:]
+        bare_masks = pattern_masks(bare)
+        distances: Dict[str, int] = {}
+        tie_keys: Dict[str, str] = {}  # key whose trigrams break ties for other
+
+        def consider(other: str) -> None:
+            if other not in distances and other in self.codes:
+                distances[other] = levenshtein(masks, m, other)
+                if bare:
+                    d = levenshtein(bare_masks, len(bare), other) + 1
+                    if d <= distances[other]:
+                        distances[other], tie_keys[other] = d, bare
+
+        def add_bases(bases: Iterable[str], suffix: str) -> None:
+            for found in bases:
+                consider(found)
+                if suffix:
+                    consider(found + suffix)
+
+        consider(key)
+        bases = {base_key(query) or key}
+        if parsed is not None:
+            bases.add(compact_key(parsed.base))
+        leading = LEADING_BASE.match(folded)
+        if leading:
+            bases.add(compact_key(leading.group(0)))
+        for base in bases:
+            suffix = self._suffix(key, bare, base)
+            add_bases(self.near_bases(base), suffix)
+            for i in self.by_base.get(base, ()):
+                if abs(len(self.keys[i]) - m) <= MAX_LENGTH_GAP:
+                    consider(self.keys[i])
+        for i in self._trigram_candidates(key):
+            consider(self.keys[i])
+        if min(distances.values(), default=m) > 1:
+            for base in bases:
+                if len(base) > BK_RADIUS + 1:
+                    suffix = self._suffix(key, bare, base)
+                    add_bases((found for _d, found in self.bases.search(base, BK_RADIUS)), suffix)
+        if not distances:
+            return []
+
+        # trigram overlap only breaks ties among the k nearest distances
+        cutoff = sorted(distances.values())[min(k, len(distances)) - 1]
+        ranked = []
+        for other, d in distances.items():
+            if d <= cutoff:
+                grams = set(trigrams(tie_keys.get(other, key)))
+                other_grams = set(trigrams(other))
+                ranked.append((d, -2.0 * len(grams & other_grams) / (len(grams) + len(other_grams)), other))
+        ranked.sort()
+        return [
+            Hit(other, d, round(1.0 - d / max(m, len(other)), 3), tuple(self.codes[other]))
+            for d, _dice, other in ranked[:k]
+        ]
+
+
+def iter_known_codes(
+    catalog: Optional[Path] = DEFAULT_CATALOG,
+    equivalents: Optional[Path] = DEFAULT_EQUIVALENTS,
+    crossref_db: Optional[Path] = DEFAULT_DB,
+) -> Iterable[Entry]:
+    """(code, source) from catalog.csv, equivalents.csv and bearings_crossref; missing sources are skipped."""
+    if catalog is not None and catalog.exists():
+        with open(catalog, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                yield row["designation"].strip(), "catalog"
+    if equivalents is not None and equivalents.exists():
+        with open(equivalents, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                for column, label in EQUIVALENTS_COLUMNS.items():
+                    code = (row.get(column) or "").strip()
+                    if code:
+                        yield code, label
+    if crossref_db is not None and crossref_db.exists():
+        conn = sqlite3.connect(crossref_db)
+        try:
+            rows = conn.execute(
+                "SELECT from_designation, from_system, to_designation, to_manufacturer FROM bearings_crossref"
+            )
+            for src, src_system, dst, manufacturer in rows:
+                yield src, src_system or "GOST"
+                if dst:
+                    yield dst, manufacturer or ""
+        finally:
+            conn.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Нечёткий поиск обозначений подшипников (опечатки, раскладка, слитное написание).")
+    parser.add_argument("queries", nargs="+", help="Обозначения, напр. \"6205 2rs\" или 6205-2РС")
+    parser.add_argument("-k", type=int, default=TOP_K, help=f"Число кандидатов (по умолчанию {TOP_K})")
+    parser.add_argument("--catalog", type=Path, default=DEFAULT_CATALOG, help="Путь к catalog.csv")
+    parser.add_argument("--equivalents", type=Path, default=DEFAULT_EQUIVALENTS, help="Путь к equivalents.csv")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help=f"База bearings_crossref (по умолчанию {DEFAULT_DB}, если есть)")
+    args = parser.parse_args()
+
+    if args.k < 1:
+        print("ERROR: -k must be positive", file=sys.stderr)
+        return 2
+
+    started = time.perf_counter()
+    index = FuzzyIndex.from_sources(args.catalog, args.equivalents, args.db)
+    print(
+        f"{len(index.keys)} key(s), {index.bases.size} base(s), "
+        f"built in {time.perf_counter() - started:.2f} s"
+    )
+    status = 0
+    for query in args.queries:
+        started = time.perf_counter()
+        hits = index.search(query, args.k)
+        elapsed = (time.perf_counter() - started) * 1000
+        if not hits:
+            print(f"{query}: не найдено")
+            status = 1
+            continue
+        print(f"{query} ({elapsed:.1f} ms):")
+        for hit in hits:
+            codes = ", ".join(f"{source} {code}" for code, source in hit.entries[:4])
+            more = f" (+{len(hit.entries) - 4})" if len(hit.entries) > 4 else ""
+            print(f"  {hit.key:<16} d={hit.distance} {hit.similarity:.2f}  {codes}{more}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
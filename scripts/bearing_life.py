@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Batch bearing-life calculator over the whole catalog.
+
+For every load case (Fr, Fa, rpm, lubrication) and every catalog row it
+computes
+
+    P   = X·Fr + Y·Fa          dynamic equivalent load, N
+    L10 = (C / P)^p            basic rating life, 10⁶ revolutions
+    L10h = L10·10⁶ / (60·n)    basic rating life, hours
+    s0  = C0 / P0              static safety factor
+
+with p = 3 for ball and 10/3 for roller bearings (see TYPE_INFO in
+generate_bearing_cards.py) and the speed check against rpm_grease or
+rpm_oil depending on lubrication. An axial load the bearing cannot carry
+gives P = inf, hence L10 = L10h = s0 = 0, so every consumer sees the row
+fail a life or s0 requirement: Fa > 0 on a series without ribs on one ring
+(NO_AXIAL_SERIES), Fa/Fr above the rib limit of the other cylindrical roller
+bearings (FA_FR_MAX, so Fr = 0 with Fa > 0 included), or Fa > 0 whenever
+the factors would leave P = 0.
+
+With NumPy installed, load cases are evaluated in chunks as one
+(cases × catalog) array expression; without it the same formulas run
+row by row in pure Python, which is only practical for small batches.
+
+Load-case CSV columns: ``case_id`` (optional), ``Fr_N``, ``Fa_N``,
+``rpm``, ``lubrication`` (``grease``/``oil``, default grease).
+
+Использование:
+    python scripts/bearing_life.py --fr 2000 --fa 500 --rpm 1500 --min-life-h 20000
+    python scripts/bearing_life.py --cases cases.csv --output life.csv --top 5
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import math
+import sys
+from bisect import bisect_right
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, TextIO
+
+from bearing_catalog import DEFAULT_CATALOG
+from bearing_query import Bounds, CatalogIndex, merge_bounds, parse_filter
+
+try:
+    import numpy as np
+except ImportError:  # optional: pure-Python fallback below
+    np = None
+
+# Life exponent p in L10 = (C / P)^p
+BALL_EXPONENT = 3.0
+ROLLER_EXPONENT = 10 / 3
+
+# Deep groove ball bearings: e and Y (for Fa/Fr > e, X = 0.56) depend on Fa/C0.
+RADIAL_BALL_FA_C0 = (0.014, 0.028, 0.056, 0.084, 0.11, 0.17, 0.28, 0.42, 0.56)
+RADIAL_BALL_E = (0.19, 0.22, 0.26, 0.28, 0.30, 0.34, 0.38, 0.42, 0.44)
+RADIAL_BALL_Y = (2.30, 1.99, 1.71, 1.55, 1.45, 1.31, 1.15, 1.04, 1.00)
+
+
+class LoadFactors(NamedTuple):
+    exponent: float
+    e: float  # Fa/Fr threshold; ignored for ball_radial (interpolated)
+    X: float  # applied when Fa/Fr > e (P = Fr otherwise)
+    Y: float
+    X0: float  # static: P0 = max(Fr, X0·Fr + Y0·Fa)
+    Y0: float
+    fa_fr_max: float = math.inf  # larger Fa/Fr cannot be carried at all
+
+
+# Cylindrical roller bearings with ribs on both rings (NJ, NUP) take axial
+# load only through the roller ends; above this Fa/Fr the ribs are overloaded.
+FA_FR_MAX = 0.4
+
+# Same X/Y as the worked examples in the generated cards (40° contact angle,
+# tapered 30xxx series).
+LOAD_FACTORS: Dict[str, LoadFactors] = {
+    "ball_radial": LoadFactors(BALL_EXPONENT, 0.0, 0.56, 0.0, 0.6, 0.5),
+    "ball_angular": LoadFactors(BALL_EXPONENT, 1.14, 0.57, 0.93, 0.5, 0.26),
+    "roller_cylindrical": LoadFactors(ROLLER_EXPONENT, math.inf, 1.0, 0.0, 1.0, 0.0, FA_FR_MAX),
+    "roller_tapered": LoadFactors(ROLLER_EXPONENT, 0.37, 0.4, 1.6, 0.5, 0.9),
+}
+DEFAULT_FACTORS = LoadFactors(BALL_EXPONENT, math.inf, 1.0, 0.0, 1.0, 0.0)
+
+# Cylindrical roller series without ribs on one ring carry no axial load.
+NO_AXIAL_SERIES = ("NUxx", "Nxx")
+
+RESULT_COLUMNS = (
+    "case_id", "designation", "type", "P_N", "L10_mrev", "L10h", "s0", "rpm_limit", "speed_ok",
+)
+
+
+class LoadCase(NamedTuple):
+    case_id: str
+    Fr: float
+    Fa: float
+    rpm: float
+    oil: bool
+
+
+def read_cases(f: TextIO) -> List[LoadCase]:
+    cases = []
+    for i, row in enumerate(csv.DictReader(f), 1):
+        lubrication = (row.get("lubrication") or "grease").strip().lower()
+        if lubrication not in ("grease", "oil"):
+            raise ValueError(f"case {i}: lubrication must be grease or oil, got {lubrication!r}")
+        cases.append(
+            LoadCase(
+                (row.get("case_id") or str(i)).strip(),
+                float(row["Fr_N"]),
+                float(row.get("Fa_N") or 0),
+                float(row["rpm"]),
+                lubrication == "oil",
+            )
+        )
+    return cases
+
+
+# ---------------------------------------------------------------------------
+# Formulas, written once for both backends
+# ---------------------------------------------------------------------------
+
+
+class _ScalarOps:
+    """Scalar stand-ins for the NumPy functions used by _evaluate."""
+
+    @staticmethod
+    def where(cond, a, b):
+        return a if cond else b
+
+    maximum = staticmethod(max)
+
+    @staticmethod
+    def interp(x, xp, fp):
+        if x <= xp[0]:
+            return fp[0]
+        if x >= xp[-1]:
+            return fp[-1]
+        i = bisect_right(xp, x)
+        t = (x - xp[i - 1]) / (xp[i] - xp[i - 1])
+        return fp[i - 1] + t * (fp[i] - fp[i - 1])
+
+    @staticmethod
+    def divide(a, b):
+        if b:
+            return a / b
+        return math.inf if a > 0 else 0.0
+
+
+def _numpy_divide(a, b):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.true_divide(a, b)
+    return np.where(b == 0, np.where(a > 0, np.inf, 0.0), out)
+
+
+def _evaluate(ops, Fr, Fa, n, oil, cat):
+    """Life figures for load (Fr, Fa, n, oil) against catalog columns cat (N and rpm units)."""
+    fa_c0 = ops.divide(Fa, cat["C0"])
+    e = ops.where(cat["radial_ball"], ops.interp(fa_c0, RADIAL_BALL_FA_C0, RADIAL_BALL_E), cat["e"])
+    Y = ops.where(cat["radial_ball"], ops.interp(fa_c0, RADIAL_BALL_FA_C0, RADIAL_BALL_Y), cat["Y"])
+    fa_fr = ops.divide(Fa, Fr)
+    P = ops.where(fa_fr > e, cat["X"] * Fr + Y * Fa, Fr)
+    # Axial load the bearing cannot take: rejected, not rated on Fr alone
+    infeasible = (Fa > 0) & ((fa_fr > cat["fa_fr_max"]) | (P == 0))
+    P = ops.where(infeasible, math.inf, P)
+    P0 = ops.where(infeasible, math.inf, ops.maximum(Fr, cat["X0"] * Fr + cat["Y0"] * Fa))
+    L10 = ops.divide(cat["C"], P) ** cat["p"]
+    L10h = ops.divide(L10 * 1e6, 60 * n)
+    s0 = ops.divide(cat["C0"], P0)
+    rpm_limit = ops.where(oil, cat["rpm_oil"], cat["rpm_grease"])
+    return P, L10, L10h, s0, rpm_limit, n <= rpm_limit
+
+
+# ---------------------------------------------------------------------------
+# Catalog preparation and batch evaluation
+# ---------------------------------------------------------------------------
+
+
+def catalog_arrays(columns: Dict[str, Sequence]) -> Dict[str, Sequence]:
+    """
+    Per-row inputs of _evaluate: capacities in N and load factors by type.
+
+    Computed once per catalog; pass the result to evaluate(cat=...) when
+    evaluating many small batches against the same catalog.
+    """
+    factors = [LOAD_FACTORS.get(t, DEFAULT_FACTORS) for t in columns["type"]]
+    cat = {
+        "C": [c * 1000 for c in columns["C_kN"]],
+        "C0": [c * 1000 for c in columns["C0_kN"]],
+        "rpm_grease": list(columns["rpm_grease"]),
+        "rpm_oil": list(columns["rpm_oil"]),
+        "radial_ball": [t == "ball_radial" for t in columns["type"]],
+        "fa_fr_max": [0.0 if s in NO_AXIAL_SERIES else f.fa_fr_max for s, f in zip(columns["series"], factors)],
+        "p": [f.exponent for f in factors],
+        "e": [f.e for f in factors],
+        "X": [f.X for f in factors],
+        "Y": [f.Y for f in factors],
+        "X0": [f.X0 for f in factors],
+        "Y0": [f.Y0 for f in factors],
+    }
+    if np is not None:
+        return {k: np.asarray(v) for k, v in cat.items()}
+    return cat
+
+
+class CaseResult(NamedTuple):
+    """Results of one load case; every sequence is aligned with rows."""
+
+    case: LoadCase
+    rows: List[int]  # catalog row ids
+    P: List[float]
+    L10: List[float]
+    L10h: List[float]
+    s0: List[float]
+    rpm_limit: List[float]
+    speed_ok: List[bool]
+
+
+def evaluate(
+    columns: Dict[str, Sequence],
+    cases: Sequence[LoadCase],
+    rows: Optional[Sequence[int]] = None,
+    min_life_h: Optional[float] = None,
+    min_s0: Optional[float] = None,
+    speed_ok_only: bool = False,
+    top: Optional[int] = None,
+    chunk_cells: int = 1_000_000,
+    cat: Optional[Dict[str, Sequence]] = None,
+) -> Iterator[CaseResult]:
+    """
+    Evaluate every load case against the catalog rows (all rows by default).
+
+    Yields one CaseResult per case with the rows that pass min_life_h,
+    min_s0 and speed_ok_only, in catalog order, or the best ``top`` of them
+    by L10h.
+    """
+    if cat is None:
+        cat = catalog_arrays(columns)
+    candidates = list(range(len(columns["designation"]))) if rows is None else list(rows)
+    if np is None or not candidates:
+        yield from _evaluate_python(cat, cases, candidates, min_life_h, min_s0, speed_ok_only, top)
+        return
+
+    ids = np.asarray(candidates, dtype=np.int64)
+    arrays = {k: v[ids][np.newaxis, :] for k, v in cat.items()}
+    ops = SimpleNamespace(where=np.where, maximum=np.maximum, interp=np.interp, divide=_numpy_divide)
+    step = max(1, chunk_cells // len(candidates))
+    for start in range(0, len(cases), step):
+        chunk = cases[start : start + step]
+        Fr, Fa, n, oil = (
+            np.array([c[k] for c in chunk])[:, np.newaxis] for k in range(1, 5)
+        )
+        shape = (len(chunk), len(candidates))
+        results = [np.broadcast_to(a, shape) for a in _evaluate(ops, Fr, Fa, n, oil, arrays)]
+        P, L10, L10h, s0, rpm_limit, speed_ok = results
+
+        mask = np.ones(shape, dtype=bool)
+        if min_life_h is not None:
+            mask &= L10h >= min_life_h
+        if min_s0 is not None:
+            mask &= s0 >= min_s0
+        if speed_ok_only:
+            mask &= speed_ok
+        for j, case in enumerate(chunk):
+            keep = np.flatnonzero(mask[j])
+            if top is not None:
+                keep = keep[np.argsort(-L10h[j, keep], kind="stable")[:top]]
+            yield CaseResult(case, ids[keep].tolist(), *(a[j, keep].tolist() for a in results))
+
+
+def _evaluate_python(
+    cat: Dict[str, Sequence],
+    cases: Sequence[LoadCase],
+    candidates: List[int],
+    min_life_h: Optional[float],
+    min_s0: Optional[float],
+    speed_ok_only: bool,
+    top: Optional[int],
+) -> Iterator[CaseResult]:
+    rows = [{k: v[i] for k, v in cat.items()} for i in candidates]
+    for case in cases:
+        results = [_evaluate(_ScalarOps, case.Fr, case.Fa, case.rpm, case.oil, row) for row in rows]
+        keep = [
+            j for j, (_P, _L10, L10h, s0, _rpm, ok) in enumerate(results)
+            if (min_life_h is None or L10h >= min_life_h)
+            and (min_s0 is None or s0 >= min_s0)
+            and (ok or not speed_ok_only)
+        ]
+        if top is not None:
+            keep.sort(key=lambda j: -results[j][2])
+            keep = keep[:top]
+        columns = [[results[j][k] for j in keep] for k in range(6)]
+        yield CaseResult(case, [candidates[j] for j in keep], *columns)
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def _fmt(value: float, digits: int) -> str:
+    if math.isinf(value):
+        return "inf"
+    return f"{value:.{digits}f}"
+
+
+def write_results(out: TextIO, columns: Dict[str, Sequence], results: Iterator[CaseResult]) -> int:
+    writer = csv.writer(out)
+    writer.writerow(RESULT_COLUMNS)
+    count = 0
+    designations, types = columns["designation"], columns["type"]
+    for r in results:
+        for k, i in enumerate(r.rows):
+            writer.writerow([
+                r.case.case_id,
+                designations[i],
+                types[i],
+                _fmt(r.P[k], 1),
+                _fmt(r.L10[k], 2),
+                _fmt(r.L10h[k], 0),
+                _fmt(r.s0[k], 2),
+                _fmt(r.rpm_limit[k], 0),
+                int(bool(r.speed_ok[k])),
+            ])
+            count += 1
+    return count
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Расчёт ресурса L10/L10h и s0 для всего каталога по набору нагрузок.")
+    parser.add_argument("--catalog", type=Path, default=DEFAULT_CATALOG, help="Путь к CSV-каталогу или .bcat")
+    parser.add_argument("--cases", type=Path, help="CSV нагрузок: case_id, Fr_N, Fa_N, rpm, lubrication")
+    parser.add_argument("--fr", type=float, help="Радиальная нагрузка Fr, Н (один расчётный случай)")
+    parser.add_argument("--fa", type=float, default=0.0, help="Осевая нагрузка Fa, Н")
+    parser.add_argument("--rpm", type=float, help="Частота вращения, об/мин")
+    parser.add_argument("--lubrication", choices=("grease", "oil"), default="grease", help="Смазка")
+    parser.add_argument("-f", "--filter", action="append", default=[], help='Фильтр каталога, как в bearing_query.py: "d_mm=25"')
+    parser.add_argument("--type", help="Тип подшипника, напр. ball_radial")
+    parser.add_argument("--min-life-h", type=float, help="Минимальный ресурс L10h, ч")
+    parser.add_argument("--min-s0", type=float, help="Минимальный коэффициент статической безопасности")
+    parser.add_argument("--speed-ok", action="store_true", help="Только подшипники, допускающие заданные обороты")
+    parser.add_argument("--top", type=int, help="Оставить N лучших по L10h для каждого случая")
+    parser.add_argument("--output", type=Path, help="Файл результата (по умолчанию stdout)")
+    args = parser.parse_args()
+
+    try:
+        if args.cases:
+            with open(args.cases, newline="", encoding="utf-8") as f:
+                cases = read_cases(f)
+        elif args.fr is not None and args.rpm is not None:
+            cases = [LoadCase("1", args.fr, args.fa, args.rpm, args.lubrication == "oil")]
+        else:
+            parser.error("нужен --cases или пара --fr и --rpm")
+
+        index = CatalogIndex.from_path(args.catalog)
+        ranges: Dict[str, Bounds] = {}
+        for expr in args.filter:
+            col, bounds = parse_filter(expr)
+            ranges[col] = merge_bounds(ranges.get(col, (None, None)), bounds)
+        rows = index.query_ids(type=args.type, **ranges) if ranges or args.type else None
+        results = evaluate(
+            index.columns,
+            cases,
+            rows=rows,
+            min_life_h=args.min_life_h,
+            min_s0=args.min_s0,
+            speed_ok_only=args.speed_ok,
+            top=args.top,
+        )
+        if args.output:
+            with open(args.output, "w", newline="", encoding="utf-8") as out:
+                count = write_results(out, index.columns, results)
+        else:
+            count = write_results(sys.stdout, index.columns, results)
+    except (ValueError, KeyError) as exc:
+        print(f"ERROR: {exc}", file=sys.stderr)
+        return 2
+
+    backend = "numpy" if np is not None else "python"
+    print(f"# {len(cases)} case(s), {count} row(s), backend: {backend}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Batch matcher: price-list designations -> catalog and equivalents codes.
+
+Every designation the knowledge base knows — catalog.csv rows and all
+members of the equivalence classes (equivalents.csv plus optional
+bearings_crossref CSVs, see bearing_equivalence.py) — goes into one
+in-memory dict keyed by a compact form of the code (upper case, separators
+dropped), so resolving a price-list row is a single hash lookup. Codes
+that miss fall back to
+
+- parsed: the canonical spelling from bearing_designation (``6205 2RS1/C3``
+  -> ``6205-2RS C3``), then the same without clearance and precision
+  (``6205-2RS``);
+- prefix: the longest known code the designation starts with, cut where a
+  suffix begins (``6205-2RS/C3`` -> ``6205``, but never ``62051`` -> ``6205``);
+  the rest must parse as suffix tokens, and a size such as ``120Х165`` or
+  ``220X300`` is never cut to ``120``/``220``;
+- trigram: known codes sharing most character trigrams, ranked by Dice
+  similarity. Digits carry the type and size of a bearing, so only codes
+  with the same digit sequence qualify: letters may differ
+  (``697716`` -> ``697716Л``, ``GEH20`` -> ``GEH 20 S``), digits may not
+  (``178813`` never becomes ``178818Е``).
+
+Results are memoized per designation — a price list repeats the same
+designation across brands and variants — so throughput is bounded by CSV
+I/O rather than by the lookups.
+
+Output: the input columns followed by match, match_system,
+base_designation (ISO code of the equivalence class), in_catalog, method
+(exact | normalized | parsed | prefix | trigram | none), confidence and
+alternatives (other systems' codes with the same key).
+
+Использование:
+    python scripts/bearing_match.py kb/ru/bearings-price-list/price-list-2025/prices.csv
+    python scripts/bearing_match.py prices.csv -o matches.csv --crossref _meta/bearings_crossref.csv
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import math
+import re
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from bearing_designation import SUFFIX_TOKEN, lookup_keys
+from bearing_equivalence import DEFAULT_EQUIVALENTS, DEFAULT_INDEX, EquivalenceIndex, load_or_build, normalize_code
+
+DEFAULT_CATALOG = Path("kb/ru/bearings/datasets/catalog.csv")
+DEFAULT_PRICES = Path("kb/ru/bearings-price-list/price-list-2025/prices.csv")
+DEFAULT_OUTPUT = Path("_meta/price_matches.csv")
+
+MATCH_COLUMNS = (
+    "match",
+    "match_system",
+    "base_designation",
+    "in_catalog",
+    "method",
+    "confidence",
+    "alternatives",
+)
+MIN_PREFIX = 3
+MIN_SIMILARITY = 0.6
+MAX_ALTERNATIVES = 3
+
+NON_ALNUM = re.compile(r"[\W_]+")
+NON_DIGIT = re.compile(r"\D+")
+# GOST precision/clearance prefix: 5-309 is class 5 of 309, not the 5309 double-row bearing
+GOST_PREFIX = re.compile(r"^(\d{1,2})-(?=\d)")
+# what may follow a prefix match: ISO suffix tokens (2RSC3) or GOST letter groups (К, ЛС17)
+SUFFIX_TAIL = re.compile(r"(?:{})+|(?:[А-ЯЁ][А-ЯЁ0-9]*)+".format(SUFFIX_TOKEN.pattern))
+# a size given as dimensions, 120Х165 or 220X300: never a suffix
+DIMENSIONS = re.compile(r"[XХ]\d")
+
+
+def compact_key(code: str) -> str:
+    """
+    Lookup key: normalize_code() with separators dropped (``6205-2RS/C3`` -> ``62052RSC3``).
+
+    A leading GOST class prefix keeps its dash so ``5-309`` and ``5309`` stay apart.
+    """
+    code = normalize_code(code)
+    m = GOST_PREFIX.match(code)
+    if m:
+        return f"{m.group(1)}-{NON_ALNUM.sub('', code[m.end():])}"
+    return NON_ALNUM.sub("", code)
+
+
+def trigrams(key: str) -> List[str]:
+    padded = f"^{key}$"
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+@dataclass(frozen=True)
+class Target:
+    code: str
+    system: str
+    base: str
+    in_catalog: bool
+
+
+@dataclass(frozen=True)
+class Match:
+    target: Optional[Target]
+    method: str
+    confidence: float
+    alternatives: Tuple[Target, ...] = ()
+
+    def columns(self) -> List[str]:
+        if self.target is None:
+            return ["", "", "", "", self.method, "0", ""]
+        t = self.target
+        return [
+            t.code,
+            t.system,
+            t.base,
+            "yes" if t.in_catalog else "no",
+            self.method,
+            f"{self.confidence:.2f}",
+            "; ".join(f"{a.system}:{a.code}" for a in self.alternatives[:MAX_ALTERNATIVES]),
+        ]
+
+
+NO_MATCH = Match(None, "none", 0.0)
+
+
+class DesignationMatcher:
+    """Compact key -> known targets, with prefix and trigram fallbacks for misses."""
+
+    def __init__(self, targets: Iterable[Target], min_similarity: float = MIN_SIMILARITY) -> None:
+        self.min_similarity = min_similarity
+        self.exact: Dict[str, List[Target]] = {}
+        self.by_key: Dict[str, List[Target]] = {}
+        seen = set()
+        for target in targets:
+            if (target.system, target.code) in seen:
+                continue
+            seen.add((target.system, target.code))
+            self.exact.setdefault(normalize_code(target.code), []).append(target)
+            key = compact_key(target.code)
+            if key:
+                self.by_key.setdefault(key, []).append(target)
+        for bucket in (*self.exact.values(), *self.by_key.values()):
+            bucket.sort(key=lambda t: (not t.in_catalog, t.system != "ISO", t.system, t.code))
+        self.max_key = max(map(len, self.by_key), default=0)
+        self._postings: Optional[Dict[str, List[str]]] = None
+        self._memo: Dict[str, Match] = {}
+
+    @classmethod
+    def from_sources(
+        cls,
+        catalog: Path = DEFAULT_CATALOG,
+        equivalents: Path = DEFAULT_EQUIVALENTS,
+        crossrefs: Sequence[Path] = (),
+        index_path: Path = DEFAULT_INDEX,
+        min_similarity: float = MIN_SIMILARITY,
+    ) -> "DesignationMatcher":
+        with open(catalog, newline="", encoding="utf-8") as f:
+            catalog_codes = {normalize_code(row["designation"]) for row in csv.DictReader(f)}
+        index = load_or_build(equivalents, crossrefs, index_path)
+        return cls(_targets(index, catalog_codes), min_similarity)
+
+    def _trigram_postings(self) -> Dict[str, List[str]]:
+        """Trigram -> keys, built on the first trigram fallback."""
+        if self._postings is None:
+            self._postings = {}
+            for key in self.by_key:
+                for gram in set(trigrams(key)):
+                    self._postings.setdefault(gram, []).append(key)
+        return self._postings
+
+    def _prefix(self, key: str) -> Optional[str]:
+        """Longest known key that key starts with, the rest parsing as suffixes (not 120Х165 -> 120)."""
+        for end in range(min(len(key) - 1, self.max_key), MIN_PREFIX - 1, -1):
+            rest = key[end:]
+            if (
+                key[:end] in self.by_key
+                and not (key[end - 1].isdigit() and rest[0].isdigit())
+                and not DIMENSIONS.match(rest)
+                and SUFFIX_TAIL.fullmatch(rest)
+            ):
+                return key[:end]
+        return None
+
+    def _similar(self, key: str) -> Optional[Tuple[str, float]]:
+        """
+        Best key with the same digits by Dice similarity of trigram sets, at least min_similarity.
+
+        A key reaching the threshold shares at least t*|A|/(2-t) of the query's
+        trigrams, so it must occur in one of the |A| - that + 1 rarest of them:
+        only those posting lists are scanned (prefix filtering).
+        """
+        grams = set(trigrams(key))
+        digits = NON_DIGIT.sub("", key)
+        postings = self._trigram_postings()
+        t = self.min_similarity
+        needed = max(1, math.ceil(t * len(grams) / (2.0 - t) - 1e-9))
+        rarest = sorted(grams, key=lambda g: len(postings.get(g, ())))[: len(grams) - needed + 1]
+        candidates = {candidate for gram in rarest for candidate in postings.get(gram, ())}
+        best: Optional[Tuple[str, float]] = None
+        for candidate in candidates:
+            if NON_DIGIT.sub("", candidate) != digits:
+                continue
+            other = set(trigrams(candidate))
+            score = 2.0 * len(grams & other) / (len(grams) + len(other))
+            if score >= t and (best is None or (score, candidate) > (best[1], best[0])):
+                best = (candidate, score)
+        return best
+
+    def match(self, designation: str) -> Match:
+        text = normalize_code(designation)
+        exact = self.exact.get(text)
+        if exact:
+            return Match(exact[0], "exact", 1.0, tuple(exact[1:]))
+        found = self._memo.get(text)
+        if found is None:
+            found = self._resolve(text)
+            self._memo[text] = found
+        return found
+
+    def _resolve(self, text: str) -> Match:
+        key = compact_key(text)
+        if not key:
+            return NO_MATCH
+        targets = self.by_key.get(key)
+        if targets:
+            return Match(targets[0], "normalized", 0.9, tuple(targets[1:]))
+        for rank, parsed_key in enumerate(lookup_keys(text)):
+            targets = self.by_key.get(compact_key(parsed_key))
+            if targets:
+                return Match(targets[0], "parsed", 0.85 - 0.1 * rank, tuple(targets[1:]))
+        prefix = self._prefix(key)
+        if prefix is not None:
+            targets = self.by_key[prefix]
+            return Match(targets[0], "prefix", round(0.5 + 0.4 * len(prefix) / len(key), 2), tuple(targets[1:]))
+        similar = self._similar(key)
+        if similar is not None:
+            targets = self.by_key[similar[0]]
+            return Match(targets[0], "trigram", round(0.8 * similar[1], 2), tuple(targets[1:]))
+        return NO_MATCH
+
+
+def _targets(index: EquivalenceIndex, catalog_codes: set) -> Iterable[Target]:
+    for members in index.classes:
+        base = next((code for mfr, code, _grade in members if mfr == "ISO"), "")
+        in_catalog = normalize_code(base) in catalog_codes if base else False
+        for mfr, code, _grade in members:
+            yield Target(code, mfr, base, in_catalog or normalize_code(code) in catalog_codes)
+    for code in sorted(catalog_codes):
+        yield Target(code, "ISO", code, True)
+
+
+def match_file(
+    matcher: DesignationMatcher,
+    source: Path,
+    target: Path,
+    column: str = "designation",
+) -> Counter:
+    """Write source rows with match columns appended; returns counts per method."""
+    counts: Counter = Counter()
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with open(source, newline="", encoding="utf-8") as fin, open(target, "w", newline="", encoding="utf-8") as fout:
+        reader = csv.reader(fin)
+        header = next(reader, None)
+        if header is None or column not in header:
+            raise ValueError(f"{source}: no {column!r} column")
+        position = header.index(column)
+        writer = csv.writer(fout, lineterminator="\n")
+        writer.writerow([*header, *MATCH_COLUMNS])
+        for row in reader:
+            found = matcher.match(row[position] if position < len(row) else "")
+            counts[found.method] += 1
+            writer.writerow([*row, *found.columns()])
+    return counts
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Сопоставление обозначений прайс-листа с каталогом и аналогами.")
+    parser.add_argument(
+        "prices",
+        type=Path,
+        nargs="?",
+        default=DEFAULT_PRICES,
+        help=f"CSV с колонкой обозначений (по умолчанию {DEFAULT_PRICES})",
+    )
+    parser.add_argument("-o", "--output", type=Path, default=DEFAULT_OUTPUT, help=f"Итоговый CSV (по умолчанию {DEFAULT_OUTPUT})")
+    parser.add_argument("--column", default="designation", help="Колонка с обозначением")
+    parser.add_argument("--catalog", type=Path, default=DEFAULT_CATALOG, help="Путь к catalog.csv")
+    parser.add_argument("--equivalents", type=Path, default=DEFAULT_EQUIVALENTS, help="Путь к equivalents.csv")
+    parser.add_argument(
+        "--crossref",
+        type=Path,
+        action="append",
+        default=[],
+        help="CSV в формате bearings_crossref (можно несколько раз)",
+    )
+    parser.add_argument("--index", type=Path, default=DEFAULT_INDEX, help="Файл индекса эквивалентов")
+    parser.add_argument(
+        "--min-similarity",
+        type=float,
+        default=MIN_SIMILARITY,
+        help=f"Порог сходства по триграммам (по умолчанию {MIN_SIMILARITY})",
+    )
+    args = parser.parse_args()
+
+    for path in (args.prices, args.catalog, args.equivalents, *args.crossref):
+        if not path.exists():
+            print(f"ERROR: {path} not found", file=sys.stderr)
+            return 2
+
+    started = time.perf_counter()
+    matcher = DesignationMatcher.from_sources(
+        args.catalog, args.equivalents, args.crossref, args.index, args.min_similarity
+    )
+    try:
+        counts = match_file(matcher, args.prices, args.output, args.column)
+    except ValueError as exc:
+        print(f"ERROR: {exc}", file=sys.stderr)
+        return 2
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    methods = ", ".join(f"{m} {counts[m]}" for m in ("exact", "normalized", "parsed", "prefix", "trigram", "none"))
+    print(f"{total} row(s): {methods} ({total / elapsed:,.0f} rows/s) -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
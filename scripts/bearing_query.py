@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Range queries over the bearing catalog (``bearings_catalog`` in
+kb/ru/bearings/datasets/analog-search-schema.md).
+
+Every numeric column gets a sorted index, so a query such as
+"d = 25, D within ±1 mm, B ≤ 17, C ≥ 14 kN" binary-searches the most
+selective predicate and only checks the remaining predicates on that
+slice instead of scanning the whole catalog.
+
+Использование:
+    python scripts/bearing_query.py -f d_mm=25 -f "D_mm=52±1" -f "B_mm<=17" -f "C_kN>=14"
+    python scripts/bearing_query.py -f "d_mm=20..30" --type ball_radial --order-by mass_kg --asc
+    python scripts/bearing_query.py --compiled -f "C_kN>=100"
+
+With ``--compiled`` (or a ``.bcat`` path in ``--catalog``) the catalog is
+read from the mmap-ed columnar file of bearing_catalog.py, whose stored
+sort orders replace the per-column sorting at load time.
+
+API:
+    index = CatalogIndex.from_path(Path("kb/ru/bearings/datasets/catalog.csv"))
+    rows = index.query(d_mm=(25, 25), D_mm=(51, 53), B_mm=(None, 17), C_kN=(14, None))
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import re
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from bearing_catalog import (
+    DEFAULT_CATALOG,
+    DEFAULT_COMPILED,
+    NUMERIC_COLUMNS,
+    TEXT_COLUMNS,
+    CompiledCatalog,
+    ensure_compiled,
+)
+
+# (lo, hi) bounds, both inclusive; None means unbounded.
+Bounds = Tuple[Optional[float], Optional[float]]
+
+FILTER_PATTERN = re.compile(
+    r"^\s*(?P<col>\w+)\s*(?P<op><=|>=|=)\s*(?P<value>[-+]?\d+(?:\.\d+)?)"
+    r"(?:\s*(?:\.\.\s*(?P<hi>[-+]?\d+(?:\.\d+)?)|(?:±|~|\+-)\s*(?P<tol>\d+(?:\.\d+)?)))?\s*$"
+)
+
+
+class _Permuted(Sequence):
+    """values in the order given by a row-id permutation (for bisect)."""
+
+    def __init__(self, values: Sequence[float], order: Sequence[int]) -> None:
+        self.values = values
+        self.order = order
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def __getitem__(self, i):
+        return self.values[self.order[i]]
+
+
+class CatalogIndex:
+    """Column-oriented catalog with one sorted index per numeric column."""
+
+    def __init__(self, columns: Dict[str, Sequence], orders: Optional[Dict[str, Sequence[int]]] = None) -> None:
+        self.columns = columns
+        self.size = len(columns["designation"])
+        # column -> (sorted values, row ids in the same order)
+        self._sorted: Dict[str, Tuple[Sequence[float], Sequence[int]]] = {}
+        for name in NUMERIC_COLUMNS:
+            values = columns[name]
+            if orders and name in orders:
+                self._sorted[name] = (_Permuted(values, orders[name]), orders[name])
+                continue
+            order = sorted(range(self.size), key=values.__getitem__)
+            self._sorted[name] = ([values[i] for i in order], array("l", order))
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict]) -> "CatalogIndex":
+        columns: Dict[str, list] = {name: [] for name in TEXT_COLUMNS + NUMERIC_COLUMNS}
+        for row in rows:
+            for name in TEXT_COLUMNS:
+                columns[name].append(row.get(name, ""))
+            for name in NUMERIC_COLUMNS:
+                columns[name].append(float(row[name]))
+        return cls(columns)
+
+    @classmethod
+    def from_csv(cls, path: Path) -> "CatalogIndex":
+        with open(path, newline="", encoding="utf-8") as f:
+            return cls.from_rows(csv.DictReader(f))
+
+    @classmethod
+    def from_compiled(cls, path: Path) -> "CatalogIndex":
+        catalog = CompiledCatalog.open(path)
+        return cls(catalog.columns, catalog.orders)
+
+    @classmethod
+    def from_path(cls, path: Path) -> "CatalogIndex":
+        """Load a .bcat file in place or parse a CSV, depending on the suffix."""
+        if path.suffix == ".bcat":
+            return cls.from_compiled(path)
+        return cls.from_csv(path)
+
+    def _span(self, column: str, bounds: Bounds) -> Tuple[int, int]:
+        values, _ = self._sorted[column]
+        lo, hi = bounds
+        start = 0 if lo is None else bisect_left(values, lo)
+        stop = len(values) if hi is None else bisect_right(values, hi)
+        return start, max(start, stop)
+
+    def count(self, column: str, bounds: Bounds) -> int:
+        """Number of rows whose column falls within bounds (O(log n))."""
+        start, stop = self._span(column, bounds)
+        return stop - start
+
+    def row(self, i: int) -> dict:
+        return {name: self.columns[name][i] for name in TEXT_COLUMNS + NUMERIC_COLUMNS}
+
+    def query_ids(self, type: Optional[str] = None, **ranges: Bounds) -> List[int]:
+        """Row ids matching all ranges (and type, if given), in catalog order."""
+        unknown = set(ranges) - set(NUMERIC_COLUMNS)
+        if unknown:
+            raise ValueError(f"unknown numeric column(s): {sorted(unknown)}")
+
+        if ranges:
+            # Drive the query from the most selective predicate.
+            driver = min(ranges, key=lambda name: self.count(name, ranges[name]))
+            start, stop = self._span(driver, ranges[driver])
+            candidates: Iterable[int] = self._sorted[driver][1][start:stop]
+            rest = [(self.columns[name], ranges[name]) for name in ranges if name != driver]
+        else:
+            candidates = range(self.size)
+            rest = []
+
+        types = self.columns["type"]
+        result = []
+        for i in candidates:
+            if type is not None and types[i] != type:
+                continue
+            for values, (lo, hi) in rest:
+                v = values[i]
+                if (lo is not None and v < lo) or (hi is not None and v > hi):
+                    break
+            else:
+                result.append(i)
+        result.sort()
+        return result
+
+    def query(
+        self,
+        type: Optional[str] = None,
+        order_by: Optional[str] = "C_kN",
+        descending: bool = True,
+        limit: Optional[int] = None,
+        **ranges: Bounds,
+    ) -> List[dict]:
+        """Rows matching all ranges, ranked by order_by (C_kN descending by default)."""
+        ids = self.query_ids(type=type, **ranges)
+        if order_by:
+            values = self.columns[order_by]
+            ids.sort(key=values.__getitem__, reverse=descending)
+        if limit is not None:
+            ids = ids[:limit]
+        return [self.row(i) for i in ids]
+
+
+def parse_filter(expr: str) -> Tuple[str, Bounds]:
+    """Parse 'col=v', 'col<=v', 'col>=v', 'col=a..b' or 'col=v±t' into bounds."""
+    m = FILTER_PATTERN.match(expr)
+    if not m:
+        raise ValueError(f"cannot parse filter: {expr!r}")
+    col, op, value = m.group("col"), m.group("op"), float(m.group("value"))
+    if op == "<=":
+        return col, (None, value)
+    if op == ">=":
+        return col, (value, None)
+    if m.group("hi") is not None:
+        return col, (value, float(m.group("hi")))
+    if m.group("tol") is not None:
+        tol = float(m.group("tol"))
+        return col, (value - tol, value + tol)
+    return col, (value, value)
+
+
+def merge_bounds(a: Bounds, b: Bounds) -> Bounds:
+    lo = b[0] if a[0] is None else a[0] if b[0] is None else max(a[0], b[0])
+    hi = b[1] if a[1] is None else a[1] if b[1] is None else min(a[1], b[1])
+    return lo, hi
+
+
+def _fmt(value) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Поиск подшипников по диапазонам размеров и нагрузок.")
+    parser.add_argument("--catalog", type=Path, default=DEFAULT_CATALOG, help="Путь к CSV-каталогу или .bcat")
+    parser.add_argument(
+        "--compiled",
+        action="store_true",
+        help=f"Читать скомпилированный каталог ({DEFAULT_COMPILED} или свой .bcat для другого CSV), пересобирая его при изменении CSV",
+    )
+    parser.add_argument(
+        "-f",
+        "--filter",
+        action="append",
+        default=[],
+        help='Фильтр: "d_mm=25", "D_mm=52±1", "B_mm<=17", "C_kN>=14", "d_mm=20..30"',
+    )
+    parser.add_argument("--type", help="Тип подшипника, напр. ball_radial")
+    parser.add_argument("--order-by", default="C_kN", help="Колонка для ранжирования (по умолчанию C_kN)")
+    parser.add_argument("--asc", action="store_true", help="Сортировать по возрастанию")
+    parser.add_argument("--limit", type=int, help="Максимум строк в выдаче")
+    args = parser.parse_args()
+
+    ranges: Dict[str, Bounds] = {}
+    try:
+        for expr in args.filter:
+            col, bounds = parse_filter(expr)
+            ranges[col] = merge_bounds(ranges.get(col, (None, None)), bounds)
+        if args.compiled and args.catalog.suffix != ".bcat":
+            index = CatalogIndex.from_compiled(ensure_compiled(args.catalog))
+        else:
+            index = CatalogIndex.from_path(args.catalog)
+        rows = index.query(
+            type=args.type,
+            order_by=args.order_by,
+            descending=not args.asc,
+            limit=args.limit,
+            **ranges,
+        )
+    except (ValueError, KeyError) as exc:
+        print(f"ERROR: {exc}", file=sys.stderr)
+        return 2
+
+    writer = csv.writer(sys.stdout)
+    writer.writerow(TEXT_COLUMNS[:3] + NUMERIC_COLUMNS)
+    for row in rows:
+        writer.writerow([row[c] for c in TEXT_COLUMNS[:3]] + [_fmt(row[c]) for c in NUMERIC_COLUMNS])
+    print(f"# {len(rows)} row(s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
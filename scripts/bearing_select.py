@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Bearing selection with a Pareto front over mass, outer diameter and capacity margin.
+
+Given a shaft diameter, radial/axial load, speed and target L10h, the
+engine takes the catalog rows for that bore, drops those that do not fit
+the envelope (D, B, type), cannot take the axial load (bearing_life
+rates them P = inf: NU/N series, Fa/Fr above the rib limit, Fr = 0 on a
+radial-only type), cannot run at the requested speed or miss the required life, and returns
+the rows no other candidate beats on all three criteria at once:
+
+- ``mass_kg`` — lower is better;
+- ``D_mm`` — lower is better (smaller housing);
+- capacity margin ``C / C_required`` — higher is better, where
+  C_required is the dynamic capacity giving exactly the target L10h.
+
+Speed limits are rpm_grease or rpm_oil; sealed variants (2RS/2Z) are
+grease-lubricated and limited to rpm_grease × SEALED_RPM_FACTOR, as in
+the generated cards.
+
+Rows are grouped by bore once, each group pre-sorted by (mass, D), so a
+request touches only its bore group and the Pareto sweep needs no sort.
+
+Использование:
+    python scripts/bearing_select.py --d 25 --fr 3000 --fa 600 --rpm 3000 --life-h 20000
+    python scripts/bearing_select.py --d 40 --fr 8000 --rpm 1500 --life-h 30000 --sealed --max-D 90
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import heapq
+import math
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+from bearing_catalog import DEFAULT_CATALOG
+from bearing_life import LoadCase, catalog_arrays, evaluate
+from bearing_query import CatalogIndex
+from generate_bearing_cards import SEALED_RPM_FACTOR
+
+
+class Requirement(NamedTuple):
+    d_mm: float
+    Fr: float
+    Fa: float
+    rpm: float
+    life_h: float
+    lubrication: str = "grease"
+    sealed: bool = False
+    d_tolerance: float = 0.0
+    max_D_mm: Optional[float] = None
+    max_B_mm: Optional[float] = None
+    type: Optional[str] = None
+    min_s0: Optional[float] = None
+
+
+class Candidate(NamedTuple):
+    row: int
+    mass_kg: float
+    D_mm: float
+    margin: float
+    L10h: float
+    s0: float
+    rpm_limit: float
+
+
+def dominates(a: Candidate, b: Candidate) -> bool:
+    """a is no worse than b on mass, D and margin, and better on at least one."""
+    return (
+        a.mass_kg <= b.mass_kg
+        and a.D_mm <= b.D_mm
+        and a.margin >= b.margin
+        and (a.mass_kg < b.mass_kg or a.D_mm < b.D_mm or a.margin > b.margin)
+    )
+
+
+def pareto_front(candidates: Sequence[Candidate]) -> List[Candidate]:
+    """
+    Non-dominated candidates, for input ordered by (mass, D).
+
+    In that order a dominating candidate can only precede the one it
+    dominates, except for ties on both mass and D, so each candidate is
+    compared with the current front only.
+    """
+    front: List[Candidate] = []
+    for c in candidates:
+        if any(dominates(f, c) for f in front):
+            continue
+        front = [f for f in front if not dominates(c, f)]
+        front.append(c)
+    return front
+
+
+class SelectionEngine:
+    """Catalog grouped by bore, each group ordered by (mass, D)."""
+
+    def __init__(self, index: CatalogIndex) -> None:
+        self.index = index
+        self.columns = index.columns
+        self._cat = catalog_arrays(self.columns)
+        mass, outer = self.columns["mass_kg"], self.columns["D_mm"]
+        groups: Dict[float, List[int]] = {}
+        for i, d in enumerate(self.columns["d_mm"]):
+            groups.setdefault(d, []).append(i)
+        self.bores = sorted(groups)
+        self.by_bore: Dict[float, array] = {
+            d: array("l", sorted(ids, key=lambda i: (mass[i], outer[i], i))) for d, ids in groups.items()
+        }
+
+    @classmethod
+    def from_path(cls, path: Path) -> "SelectionEngine":
+        return cls(CatalogIndex.from_path(path))
+
+    def _bore_rows(self, d: float, tolerance: float) -> List[int]:
+        lo, hi = bisect_left(self.bores, d - tolerance), bisect_right(self.bores, d + tolerance)
+        groups = [self.by_bore[b] for b in self.bores[lo:hi]]
+        if len(groups) == 1:
+            return list(groups[0])
+        mass, outer = self.columns["mass_kg"], self.columns["D_mm"]
+        return list(heapq.merge(*groups, key=lambda i: (mass[i], outer[i], i)))
+
+    def feasible(self, req: Requirement) -> List[Candidate]:
+        """Candidates meeting envelope, speed and life, ordered by (mass, D)."""
+        cols = self.columns
+        rows = [
+            i for i in self._bore_rows(req.d_mm, req.d_tolerance)
+            if (req.max_D_mm is None or cols["D_mm"][i] <= req.max_D_mm)
+            and (req.max_B_mm is None or cols["B_mm"][i] <= req.max_B_mm)
+            and (req.type is None or cols["type"][i] == req.type)
+        ]
+        if not rows:
+            return []
+
+        oil = req.lubrication == "oil" and not req.sealed
+        case = LoadCase("select", req.Fr, req.Fa, req.rpm, oil)
+        (result,) = evaluate(cols, [case], rows=rows, min_life_h=req.life_h, min_s0=req.min_s0, cat=self._cat)
+        by_row = {
+            i: (L10h, s0, rpm_limit)
+            for i, L10h, s0, rpm_limit in zip(result.rows, result.L10h, result.s0, result.rpm_limit)
+        }
+
+        candidates = []
+        for i in rows:  # keep the (mass, D) order
+            if i not in by_row:
+                continue
+            L10h, s0, rpm_limit = by_row[i]
+            # Under Fa > 0 a zero L10h (load not carried, P = inf) or an infinite
+            # one (P = 0) is not a rating, and neither is the margin derived from it
+            if req.Fa > 0 and not 0 < L10h < math.inf:
+                continue
+            if req.sealed:
+                rpm_limit = cols["rpm_grease"][i] * SEALED_RPM_FACTOR
+            if req.rpm > rpm_limit:
+                continue
+            # C_required = C · (target / L10h)^(1/p), so the margin is (L10h / target)^(1/p)
+            margin = (L10h / req.life_h) ** (1 / self._cat["p"][i]) if req.life_h > 0 else float("inf")
+            candidates.append(Candidate(i, cols["mass_kg"][i], cols["D_mm"][i], float(margin), L10h, s0, rpm_limit))
+        return candidates
+
+    def select(self, req: Requirement) -> List[Candidate]:
+        """Pareto-optimal candidates over mass, D and capacity margin, lightest first."""
+        return pareto_front(self.feasible(req))
+
+
+RESULT_COLUMNS = (
+    "designation", "type", "d_mm", "D_mm", "B_mm", "mass_kg", "C_kN", "L10h", "margin", "s0", "rpm_limit",
+)
+
+
+def _fmt(value) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Подбор подшипника: Парето-фронт по массе, наружному диаметру и запасу по C.")
+    parser.add_argument("--catalog", type=Path, default=DEFAULT_CATALOG, help="Путь к CSV-каталогу или .bcat")
+    parser.add_argument("--d", type=float, required=True, help="Диаметр вала d, мм")
+    parser.add_argument("--d-tol", type=float, default=0.0, help="Допуск по d, мм")
+    parser.add_argument("--fr", type=float, required=True, help="Радиальная нагрузка Fr, Н")
+    parser.add_argument("--fa", type=float, default=0.0, help="Осевая нагрузка Fa, Н")
+    parser.add_argument("--rpm", type=float, required=True, help="Частота вращения, об/мин")
+    parser.add_argument("--life-h", type=float, required=True, help="Требуемый ресурс L10h, ч")
+    parser.add_argument("--lubrication", choices=("grease", "oil"), default="grease", help="Смазка")
+    parser.add_argument("--sealed", action="store_true", help="Исполнение с уплотнениями (2RS/2Z): пластичная смазка, SEALED_RPM_FACTOR")
+    parser.add_argument("--max-D", type=float, help="Максимальный наружный диаметр D, мм")
+    parser.add_argument("--max-B", type=float, help="Максимальная ширина B, мм")
+    parser.add_argument("--type", help="Тип подшипника, напр. ball_radial")
+    parser.add_argument("--min-s0", type=float, help="Минимальный коэффициент статической безопасности")
+    parser.add_argument("--all", action="store_true", help="Показать все подходящие, с отметкой Парето-оптимальных")
+    args = parser.parse_args()
+
+    req = Requirement(
+        d_mm=args.d,
+        Fr=args.fr,
+        Fa=args.fa,
+        rpm=args.rpm,
+        life_h=args.life_h,
+        lubrication=args.lubrication,
+        sealed=args.sealed,
+        d_tolerance=args.d_tol,
+        max_D_mm=args.max_D,
+        max_B_mm=args.max_B,
+        type=args.type,
+        min_s0=args.min_s0,
+    )
+    try:
+        engine = SelectionEngine.from_path(args.catalog)
+        feasible = engine.feasible(req)
+    except (ValueError, KeyError) as exc:
+        print(f"ERROR: {exc}", file=sys.stderr)
+        return 2
+    front = pareto_front(feasible)
+
+    cols = engine.columns
+    writer = csv.writer(sys.stdout)
+    writer.writerow(RESULT_COLUMNS + (("pareto",) if args.all else ()))
+    on_front = {c.row for c in front}
+    for c in feasible if args.all else front:
+        i = c.row
+        line = [cols[name][i] for name in ("designation", "type")]
+        line += [_fmt(cols[name][i]) for name in ("d_mm", "D_mm", "B_mm", "mass_kg", "C_kN")]
+        line += [f"{c.L10h:.0f}", f"{c.margin:.2f}", f"{c.s0:.2f}", f"{c.rpm_limit:.0f}"]
+        if args.all:
+            line.append(int(i in on_front))
+        writer.writerow(line)
+    print(f"# {len(feasible)} feasible, {len(front)} on the Pareto front", file=sys.stderr)
+    return 0 if front else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
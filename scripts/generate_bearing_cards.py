@@ -3,24 +3,71 @@
 Генерация карточек подшипников из CSV-каталога.
 
 Читает CSV с характеристиками подшипников и создаёт README.md
-по шаблону bearing-card.md.
+по шаблону _templates/bearing-card.generator.md (разметка карточки той же
+структуры, что и bearing-card.md, с подстановками `{{...}}`).
+
+Разделы, зависящие только от типа, суффиксов и размерной группы, собираются
+в card_partials() и встраиваются в шаблон один раз на вариант
+(compiled_card_template); для каждой карточки подставляются лишь поля строки
+каталога из card_fields().
+
+С --incremental существующие карточки перегенерируются только при изменении
+входных данных: отпечатки (строка каталога, строка эквивалентов, суффиксы,
+CARD_FORMAT_VERSION и хеш шаблона) хранятся в _meta/bearing_cards_manifest.json вместе
+с id и хешем записанного файла. Карточка сохраняет id и created; карточка,
+изменённая вручную (хеш файла не совпадает с манифестом), пропускается без
+--force; карточка не из манифеста принимается в него, если генератор
+воспроизводит её байт в байт (иначе — только с --adopt). Рендер идёт в пуле
+процессов (--jobs).
+
+С --variants все сочетания суффиксов из VARIANT_MATRIX (или JSON из
+--variant-matrix) генерируются за один проход: каталог, эквиваленты и список
+карточек читаются один раз, общие для строки поля (row_fields) считаются
+один раз на строку. ID новых карточек выдаются из _meta/id_registry.json,
+если не задан --id-start.
+
+После записи новых или перегенерированных карточек индексы kb/ru
+пересобираются (kb_index.rebuild_indexes), отдельный запуск
+`kb_index.py` не нужен.
 
 Использование:
     python scripts/generate_bearing_cards.py \
         --catalog kb/ru/bearings/datasets/catalog.csv \
         --equivalents kb/ru/bearings/datasets/equivalents.csv \
         --output-dir kb/ru/bearings/cards \
-        --id-start 30 \
         --suffixes "2RS"
+    python scripts/generate_bearing_cards.py \
+        --catalog kb/ru/bearings/datasets/catalog.csv \
+        --equivalents kb/ru/bearings/datasets/equivalents.csv \
+        --output-dir kb/ru/bearings/cards \
+        --incremental --jobs 4
+    python scripts/generate_bearing_cards.py \
+        --catalog kb/ru/bearings/datasets/catalog.csv \
+        --equivalents kb/ru/bearings/datasets/equivalents.csv \
+        --output-dir kb/ru/bearings/cards \
+        --variants --incremental
 """
 from __future__ import annotations
 
 import argparse
 import csv
+import hashlib
+import json
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date
+from functools import lru_cache
 from pathlib import Path
 
+from bearing_catalog import NUMERIC_COLUMNS, CompiledCatalog
+from bearing_designation import designation_slug, format_designation
+from kb_frontmatter import read_front_matter
+from kb_ids import ID_REGISTRY, IdAllocator
+from kb_index import rebuild_indexes
+from kb_io import atomic_write_text
+from kb_template import Template, compile_template, load_template
+
 
 # ---------------------------------------------------------------------------
 # Bearing type metadata
@@ -119,6 +166,15 @@ SUFFIX_INFO = {
             "Пластичная смазка заложена на весь срок службы",
         ],
     },
+    "2Z": {
+        "label": "две металлические защитные шайбы (бесконтактные, с двух сторон)",
+        "tag": "shielded",
+        "details": [
+            "Защита от крупных частиц, но не от воды",
+            "Меньше трения и выше допустимые обороты, чем у 2RS",
+            "Пластичная смазка заложена на весь срок службы",
+        ],
+    },
     "C3": {
         "label": "увеличенный радиальный зазор группы C3",
         "tag": "c3",
@@ -146,6 +202,17 @@ WIDTH_SERIES_LABEL = {
     "4": "тяжёлая",
 }
 
+# Suffix combinations generated per bearing type with --variants
+VARIANT_MATRIX: dict[str, tuple[tuple[str, ...], ...]] = {
+    "ball_radial": ((), ("2RS",), ("2Z",), ("C3",), ("2RS", "C3")),
+    "ball_angular": (("B",),),
+    "roller_cylindrical": ((), ("C3",)),
+    "roller_tapered": ((),),
+}
+
+# Card layout; per-variant sections are inlined by compiled_card_template()
+CARD_TEMPLATE = Path(__file__).resolve().parents[1] / "_templates" / "bearing-card.generator.md"
+
 # Sealed bearings operate at ~80% of the grease-rated speed limit
 SEALED_RPM_FACTOR = 0.80
 
@@ -242,7 +309,10 @@ APPLICATION_EXAMPLES_ANGULAR = [
 
 
 def load_catalog(path: Path) -> list[dict]:
-    """Load bearing catalog CSV into list of dicts."""
+    """Load bearing catalog (CSV or compiled .bcat) into list of dicts."""
+    if path.suffix == ".bcat":
+        with CompiledCatalog.open(path) as catalog:
+            return list(catalog.rows())
     with open(path, newline="", encoding="utf-8") as f:
         return list(csv.DictReader(f))
 
@@ -289,26 +359,12 @@ def kn_to_kgf(kn: float) -> int:
 
 def folder_name(base: str, suffixes: list[str]) -> str:
     """Build the card folder name: lowercase, dash-separated."""
-    parts = [base.lower()]
-    for s in suffixes:
-        parts.append(s.lower())
-    return "-".join(parts)
+    return designation_slug(base, suffixes)
 
 
 def full_designation(base: str, suffixes: list[str]) -> str:
-    """Full designation string, e.g. '6205-2RS C3'."""
-    if not suffixes:
-        return base
-    result = base
-    for i, s in enumerate(suffixes):
-        if i == 0:
-            if s in ("2RS", "2Z", "B"):
-                result += "-" + s
-            else:
-                result += " " + s
-        else:
-            result += " " + s
-    return result
+    """Full designation string, e.g. '6205-2RS C3' (see bearing_designation.DASH_SUFFIXES)."""
+    return format_designation(base, suffixes)
 
 
 def get_equiv_row(equivalents: dict, base: str, suffixes: list[str]) -> dict | None:
@@ -358,146 +414,50 @@ def _equiv_table_rows(
 # ---------------------------------------------------------------------------
 
 
-def generate_card(  # noqa: C901 — intentionally long to produce full card content
-    row: dict,
-    suffixes: list[str],
-    equiv_row: dict | None,
-    card_id: str,
-) -> str:
-    """Generate the full README.md content for a bearing card."""
-    base = row["designation"]
-    btype = row["type"]
-    series = row["series"]
-    d = int(row["d_mm"])
-    D = int(row["D_mm"])
-    B = float(row["B_mm"])
-    C_kN = float(row["C_kN"])
-    C0_kN = float(row["C0_kN"])
-    rpm_grease = int(row["rpm_grease"])
+def card_partials(btype: str, suffixes: tuple[str, ...], bucket: str) -> dict[str, str]:
+    """
+    Card sections that depend only on bearing type, suffixes and size bucket.
 
+    They may reference per-card fields as ``{{name}}``; compiled_card_template()
+    inlines them once per variant.
+    """
     info = TYPE_INFO[btype]
-    full_desig = full_designation(base, suffixes)
-    today = date.today().isoformat()
-
-    # --- tags ---
-    bearing_element = "ball" if btype.startswith("ball_") else "roller"
-    tags = ["bearing", bearing_element]
-    tags.extend(info["tags_extra"])
-    tags.append(series)
-    for s in suffixes:
-        si = SUFFIX_INFO.get(s)
-        if si and si.get("tag"):
-            tags.append(si["tag"])
-    tags_str = ", ".join(f'"{t}"' for t in tags)
-
-    # --- aliases ---
-    aliases = [full_desig.replace("-", " ").lower()]
-    if equiv_row:
-        skf = equiv_row.get("SKF", "")
-        if skf and skf != base:
-            aliases.append(skf)
-        nsk = equiv_row.get("NSK", "")
-        if nsk and nsk != base:
-            aliases.append(nsk)
-    aliases_str = ", ".join(f'"{a}"' for a in aliases)
-
-    # --- equivalents yaml ---
-    equiv_rows = _equiv_table_rows(equiv_row, btype, suffixes)
-    equiv_yaml_lines = []
-    for mfr, code, _note in equiv_rows:
-        equiv_yaml_lines.append(f'  - {{manufacturer: "{mfr}", code: "{code}"}}')
-    equiv_yaml = "\n".join(equiv_yaml_lines) if equiv_yaml_lines else '  - {manufacturer: "generic", code: "' + base + '"}'
-
-    # --- suffixes yaml ---
-    suffixes_yaml = ", ".join(f'"{s}"' for s in suffixes) if suffixes else ""
-
-    # --- rpm limit (sealed bearings are ~80% of grease rating) ---
     has_seal = any(s in ("2RS", "2Z") for s in suffixes)
-    if has_seal:
-        rpm_limit = int(rpm_grease * SEALED_RPM_FACTOR)
-    else:
-        rpm_limit = rpm_grease
-
-    # --- series prefix ---
-    prefix_digit = base[0]
-    prefix_meaning = info["series_prefix_meaning"].get(
-        prefix_digit, f"серия {prefix_digit}xxx"
-    )
-    width_digit = base[1]
-    width_label = WIDTH_SERIES_LABEL.get(width_digit, "")
-    bore_code_str = base[2:]
+    is_angular = btype == "ball_angular"
 
     # --- description line ---
-    if has_seal:
+    if "2Z" in suffixes:
+        desc_suffix = " с двухсторонними металлическими защитными шайбами"
+    elif has_seal:
         desc_suffix = " с двухсторонним резиновым уплотнением"
     elif "B" in suffixes:
         desc_suffix = ". Предназначен для комбинированных радиально-осевых нагрузок, обеспечивает высокую жёсткость и точность вращения при правильном преднатяге"
     else:
         desc_suffix = ""
-    series_label = f"серии {series}"
-    description_line = f"{info['description']}{desc_suffix}. Подшипник {series_label}, применяемый в промышленном оборудовании и механизмах."
-
-    # --- equivalents table ---
-    equiv_table_lines = []
-    for mfr, code, note in equiv_rows:
-        equiv_table_lines.append(f"| {mfr} | {code} | {note} |")
-    equiv_table = "\n".join(equiv_table_lines)
 
     # --- functional analogues ---
-    if has_seal:
+    if "2Z" in suffixes:
         func_analogues = (
-            f"- **{base}-2RS C3**: увеличенный зазор — для работы при повышенных температурах\n"
-            f"- **{base}-2Z**: металлические шайбы вместо резины — меньшая защита, выше обороты\n"
-            f"- **{base}** (открытый): нет уплотнений — требуется внешняя защита, выше обороты"
+            "- **{{base}}-2RS**: контактные резиновые уплотнения — лучше защита от влаги, ниже обороты\n"
+            "- **{{base}}-2Z C3**: увеличенный зазор — для работы при повышенных температурах\n"
+            "- **{{base}}** (открытый): нет защиты — требуется внешнее уплотнение, выше обороты"
         )
-    elif btype == "ball_angular":
+    elif has_seal:
         func_analogues = (
-            f"- **{base}-B-2RS**: с уплотнениями — для загрязнённых условий, ниже обороты\n"
-            f"- **{base[0]}{base[1:]}** (угол 25°): меньше осевая, больше радиальная грузоподъёмность"
+            "- **{{base}}-2RS C3**: увеличенный зазор — для работы при повышенных температурах\n"
+            "- **{{base}}-2Z**: металлические шайбы вместо резины — меньшая защита, выше обороты\n"
+            "- **{{base}}** (открытый): нет уплотнений — требуется внешняя защита, выше обороты"
         )
-    else:
+    elif is_angular:
         func_analogues = (
-            f"- **{base}-2RS**: с уплотнениями — для загрязнённых условий\n"
-            f"- **{base}-2Z**: с защитными шайбами — компромисс между защитой и оборотами"
+            "- **{{base}}-B-2RS**: с уплотнениями — для загрязнённых условий, ниже обороты\n"
+            "- **{{base}}** (угол 25°): меньше осевая, больше радиальная грузоподъёмность"
         )
-
-    # --- replacement risks ---
-    d_prev = d - 5 if d >= 20 else d - 2
-    d_next = d + 5 if d >= 20 else d + 3
-    # Neighbouring series
-    if series.startswith("62"):
-        alt_series_prefix = "63"
-        alt_D = D + 10
-    elif series.startswith("63"):
-        alt_series_prefix = "62"
-        alt_D = D - 10
     else:
-        alt_series_prefix = "62"
-        alt_D = D
-
-    cannot_replace = []
-    # Different series
-    if series != "7xxx":
-        alt_desig = f"{alt_series_prefix}{base[2:]}"
-        sfx = ("-" + suffixes[0]) if suffixes and suffixes[0] in ("2RS", "2Z", "B") else ""
-        cannot_replace.append(
-            f"- {alt_desig}{sfx} — другой D ({alt_D} мм вместо {D} мм) — не войдёт в корпус"
-        )
-    # Smaller bore
-    prev_base = f"{base[0]}{base[1]}{bore_code(d_prev)}" if d_prev >= 10 else None
-    if prev_base:
-        sfx = ("-" + suffixes[0]) if suffixes and suffixes[0] in ("2RS", "2Z", "B") else ""
-        cannot_replace.append(
-            f"- {prev_base}{sfx} — другой d ({d_prev} мм вместо {d} мм) — не сядет на вал"
-        )
-    # Larger bore
-    next_base = f"{base[0]}{base[1]}{bore_code(d_next)}"
-    if next_base:
-        sfx = ("-" + suffixes[0]) if suffixes and suffixes[0] in ("2RS", "2Z", "B") else ""
-        cannot_replace.append(
-            f"- {next_base}{sfx} — другой d ({d_next} мм вместо {d} мм) — не сядет на вал"
+        func_analogues = (
+            "- **{{base}}-2RS**: с уплотнениями — для загрязнённых условий\n"
+            "- **{{base}}-2Z**: с защитными шайбами — компромисс между защитой и оборотами"
         )
-    cannot_replace_str = "\n".join(cannot_replace)
 
     # --- allowed replacements ---
     if has_seal:
@@ -507,9 +467,9 @@ def generate_card(  # noqa: C901 — intentionally long to produce full card con
             "- **CN → C3**: допустимо (C3 более универсален)\n"
             "- **2RS → 2Z**: допустимо, но снижается защита от влаги"
         )
-    elif btype == "ball_angular":
+    elif is_angular:
         allowed_replacements = (
-            f"- **{base}-A → {base}-B**: допустимо, но изменится распределение нагрузок\n"
+            "- **{{base}}-A → {{base}}-B**: допустимо, но изменится распределение нагрузок\n"
             "- **Одиночный → парный**: допустимо для повышения жёсткости (DB или DF схема)\n"
             "- **Стальной сепаратор → полиамидный**: допустимо, полиамидный легче и тише"
         )
@@ -521,12 +481,11 @@ def generate_card(  # noqa: C901 — intentionally long to produce full card con
         )
 
     # --- typical errors ---
-    if btype == "ball_angular":
+    if is_angular:
         typical_errors = (
             "- Монтаж без осевого преднатяга → повышенный люфт, вибрации, снижение ресурса\n"
             "- Неправильное направление установки → осевая нагрузка не воспринимается\n"
-            f"- Замена на радиальный подшипник {'6' if base[0] == '7' else base[0]}{base[1:]}"
-            " → отказ при осевых нагрузках\n"
+            "- Замена на радиальный подшипник {{radial_designation}} → отказ при осевых нагрузках\n"
             "- Чрезмерный преднатяг → перегрев, ускоренный износ"
         )
     else:
@@ -534,7 +493,7 @@ def generate_card(  # noqa: C901 — intentionally long to produce full card con
             "- Монтаж ударами по телам качения → вмятины, преждевременный отказ\n"
             "- Игнорирование зазора при замене → заклинивание или вибрации\n"
             "- Переизбыток смазки (>50% объёма) → перегрев\n"
-            f"- Применение на оборотах выше {rpm_limit} → перегрев"
+            "- Применение на оборотах выше {{rpm_limit}} → перегрев"
             + (" уплотнений" if has_seal else "")
         )
 
@@ -557,7 +516,7 @@ def generate_card(  # noqa: C901 — intentionally long to produce full card con
             "- Обязательно: усилие через торец внутреннего кольца (вращающееся)\n"
             "- Запрещено: удары молотком, передача усилия через тела качения"
         )
-    elif btype == "ball_angular":
+    elif is_angular:
         maintenance = (
             "**Рекомендуемая смазка**:\n"
             "- Тип: литиевая (Li) консистентная, NLGI 2 (или масляная для высоких оборотов)\n"
@@ -595,7 +554,7 @@ def generate_card(  # noqa: C901 — intentionally long to produce full card con
         )
 
     # --- replacement signs ---
-    if btype == "ball_angular":
+    if is_angular:
         replacement_signs = (
             "**Признаки необходимости замены**:\n"
             "- Повышенный шум (гул, скрежет)\n"
@@ -615,21 +574,17 @@ def generate_card(  # noqa: C901 — intentionally long to produce full card con
         )
 
     # --- application examples ---
-    if btype == "ball_angular":
+    if is_angular:
         examples = APPLICATION_EXAMPLES_ANGULAR
     else:
-        bucket = size_bucket(d)
         examples = APPLICATION_EXAMPLES_RADIAL.get(bucket, APPLICATION_EXAMPLES_RADIAL["medium"])
-
-    examples_text_parts = []
-    for i, ex in enumerate(examples, 1):
-        examples_text_parts.append(
-            f"**Пример {i}**: {ex['title']}\n"
-            f"- Условия: {ex['conditions']}\n"
-            f"- Ресурс: {ex['life']}\n"
-            f"- Особенности: {ex['notes']}"
-        )
-    examples_text = "\n\n".join(examples_text_parts)
+    examples_text = "\n\n".join(
+        f"**Пример {i}**: {ex['title']}\n"
+        f"- Условия: {ex['conditions']}\n"
+        f"- Ресурс: {ex['life']}\n"
+        f"- Особенности: {ex['notes']}"
+        for i, ex in enumerate(examples, 1)
+    )
 
     # --- suffix explanation ---
     suffix_explanation = ""
@@ -641,19 +596,26 @@ def generate_card(  # noqa: C901 — intentionally long to produce full card con
                 suffix_explanation += f"  - {detail}\n"
 
     # --- marking notes ---
-    if has_seal:
+    if "2Z" in suffixes:
+        marking_notes = (
+            "- SKF: {{base}}-2Z\n"
+            "- FAG: {{base}}.2ZR (точка вместо дефиса)\n"
+            "- NTN: {{base}}ZZ\n"
+            "- NSK: {{base}}ZZ"
+        )
+    elif has_seal:
         marking_notes = (
-            f"- SKF: {base}-2RSH (H = Heavy duty уплотнение)\n"
-            f"- FAG: {base}.2RSR (точка вместо дефиса)\n"
-            f"- NTN: {base}LLU (LLU = низкое трение)\n"
-            f"- NSK: {base}DDU (DDU = двойное уплотнение)"
+            "- SKF: {{base}}-2RSH (H = Heavy duty уплотнение)\n"
+            "- FAG: {{base}}.2RSR (точка вместо дефиса)\n"
+            "- NTN: {{base}}LLU (LLU = низкое трение)\n"
+            "- NSK: {{base}}DDU (DDU = двойное уплотнение)"
         )
-    elif btype == "ball_angular":
+    elif is_angular:
         marking_notes = (
-            f"- SKF: {base} BEP (BEP = полиамидный сепаратор, 40° контакт)\n"
-            f"- FAG: {base}-B-XL-TVP (B = 40°, XL = усиленный, TVP = полиамидный сепаратор)\n"
-            f"- NTN: {base}B (B = 40° угол контакта)\n"
-            f"- NSK: {base}B (B = 40° угол контакта)"
+            "- SKF: {{base}} BEP (BEP = полиамидный сепаратор, 40° контакт)\n"
+            "- FAG: {{base}}-B-XL-TVP (B = 40°, XL = усиленный, TVP = полиамидный сепаратор)\n"
+            "- NTN: {{base}}B (B = 40° угол контакта)\n"
+            "- NSK: {{base}}B (B = 40° угол контакта)"
         )
     else:
         marking_notes = (
@@ -662,11 +624,11 @@ def generate_card(  # noqa: C901 — intentionally long to produce full card con
         )
 
     # --- compatibility ---
-    if btype == "ball_angular":
+    if is_angular:
         compat_note = (
-            f"- Серия {series[:-1]}x: размеры могут совпадать с серией 62xx по ISO 15, "
+            "- Серия {{series_family}}: размеры могут совпадать с серией 62xx по ISO 15, "
             "но конструкция принципиально отличается\n"
-            f"- НЕ взаимозаменяем с 6{base[1:]} — другой тип нагрузки и требования к монтажу\n"
+            "- НЕ взаимозаменяем с 6{{base_tail}} — другой тип нагрузки и требования к монтажу\n"
             "- Парные установки: O-образная (DB), X-образная (DF), тандем (DT)"
         )
         fit_requirements = (
@@ -676,12 +638,9 @@ def generate_card(  # noqa: C901 — intentionally long to produce full card con
             "- Направление осевой нагрузки: от широкого торца наружного кольца"
         )
     else:
-        series_label_short = f"{series[:-1]}x"
-        width_label_text = WIDTH_SERIES_LABEL.get(base[1], "")
         compat_note = (
-            f"- Серия {series_label_short} ({width_label_text}): "
-            f"стандартная серия для d={d} мм\n"
-            f"- Другие зазоры: {base}-2RS C3 — размеры те же, но зазор увеличен"
+            "- Серия {{series_family}} ({{width_label}}): стандартная серия для d={{d}} мм\n"
+            "- Другие зазоры: {{base}}-2RS C3 — размеры те же, но зазор увеличен"
         )
         fit_requirements = (
             "- Вал: h6 или js6 (для вращающегося внутреннего кольца)\n"
@@ -690,9 +649,7 @@ def generate_card(  # noqa: C901 — intentionally long to produce full card con
         )
 
     # --- working conditions ---
-    optimal_low = max(100, rpm_limit // 10)
-    optimal_high = rpm_limit // 3
-    if btype == "ball_angular":
+    if is_angular:
         env_line = "- Среда: чистая или умеренно загрязнённая (открытая конструкция — требуется внешнее уплотнение)"
         temp_range = "–30…+120 °C (с учётом смазки)"
     elif has_seal:
@@ -703,49 +660,37 @@ def generate_card(  # noqa: C901 — intentionally long to produce full card con
         temp_range = "–30…+120 °C"
 
     # --- life calculation example ---
-    example_Fr = max(300, int(C_kN * 1000 * 0.05))  # ~5% of C
-    example_Fr = round(example_Fr / 100) * 100  # round to hundreds
-    example_n = 1500
-    P = example_Fr
-
-    # Roller bearings use 10/3 exponent, ball bearings use 3
-    life_exponent = 10/3 if btype.startswith("roller_") else 3
-    L10 = (C_kN * 1000 / P) ** life_exponent
-    L10h = L10 * 1e6 / (60 * example_n)
-
-    if btype == "ball_angular":
+    if is_angular:
         life_example = (
-            f"**Пример расчёта для комбинированной нагрузки**:\n"
-            f"- Радиальная нагрузка Fr = {example_Fr} Н\n"
-            f"- Осевая нагрузка Fa = {example_Fr // 2} Н\n"
-            f"- Частота вращения n = {example_n} об/мин\n"
-            f"- X = 0.57, Y = 0.93 (для угла 40°, Fa/Fr > e)\n"
-            f"- P = 0.57 × {example_Fr} + 0.93 × {example_Fr // 2} = "
-            f"{int(0.57 * example_Fr + 0.93 * (example_Fr // 2))} Н\n"
-            f"- L10 = (C / P)³ × 10⁶ оборотов\n"
-            f"- L10h = L10 / (60 × n)"
+            "**Пример расчёта для комбинированной нагрузки**:\n"
+            "- Радиальная нагрузка Fr = {{example_Fr}} Н\n"
+            "- Осевая нагрузка Fa = {{example_Fa}} Н\n"
+            "- Частота вращения n = {{example_n}} об/мин\n"
+            "- X = 0.57, Y = 0.93 (для угла 40°, Fa/Fr > e)\n"
+            "- P = 0.57 × {{example_Fr}} + 0.93 × {{example_Fa}} = {{example_P}} Н\n"
+            "- L10 = (C / P)³ × 10⁶ оборотов\n"
+            "- L10h = L10 / (60 × n)"
         )
     else:
         life_example = (
-            f"**Пример расчёта**:\n"
-            f"- Радиальная нагрузка Fr = {example_Fr} Н\n"
-            f"- Частота вращения n = {example_n} об/мин\n"
-            f"- Эквивалентная нагрузка P ≈ Fr = {example_Fr} Н (малая осевая)\n"
-            f"- L10 = ({int(C_kN * 1000)} / {example_Fr})³ × 10⁶ = {int(L10)} × 10⁶ оборотов\n"
-            f"- L10h = {int(L10)} × 10⁶ / (60 × {example_n}) ≈ {int(L10h)} часов"
+            "**Пример расчёта**:\n"
+            "- Радиальная нагрузка Fr = {{example_Fr}} Н\n"
+            "- Частота вращения n = {{example_n}} об/мин\n"
+            "- Эквивалентная нагрузка P ≈ Fr = {{example_Fr}} Н (малая осевая)\n"
+            "- L10 = ({{C_N}} / {{example_Fr}})³ × 10⁶ = {{example_L10}} × 10⁶ оборотов\n"
+            "- L10h = {{example_L10}} × 10⁶ / (60 × {{example_n}}) ≈ {{example_L10h}} часов"
         )
 
     # --- rpm note ---
-    rpm_oil = int(row["rpm_oil"])
     if has_seal:
-        rpm_note = f"{rpm_limit} об/мин (с уплотнениями; открытый: {rpm_grease} об/мин)"
-    elif btype == "ball_angular":
-        rpm_note = f"{rpm_limit} об/мин (с консистентной смазкой; масляная смазка: {rpm_oil} об/мин)"
+        rpm_note = "{{rpm_limit}} об/мин (с уплотнениями; открытый: {{rpm_grease}} об/мин)"
+    elif is_angular:
+        rpm_note = "{{rpm_limit}} об/мин (с консистентной смазкой; масляная смазка: {{rpm_oil}} об/мин)"
     else:
-        rpm_note = f"{rpm_limit} об/мин (с консистентной смазкой; масляная: {rpm_oil} об/мин)"
+        rpm_note = "{{rpm_limit}} об/мин (с консистентной смазкой; масляная: {{rpm_oil}} об/мин)"
 
     # --- angular-specific risk note ---
-    if btype == "ball_angular":
+    if is_angular:
         angular_risk_note = (
             "\n**Принципиальные отличия от радиальных подшипников**:\n"
             "- Требуется осевой преднатяг — без него подшипник будет работать некорректно\n"
@@ -756,161 +701,319 @@ def generate_card(  # noqa: C901 — intentionally long to produce full card con
     else:
         angular_risk_note = ""
 
-    # -----------------------------------------------------------------------
-    # Assemble the card
-    # -----------------------------------------------------------------------
-    card = f"""\
----
-id: {card_id}
-title: "{full_desig} — {info['title_ru']}"
-topic: bearings-card
-tags: [{tags_str}]
-status: draft
-source: "manufacturer_catalog"
-created: {today}
-updated: {today}
-aliases: [{aliases_str}]
-designation:
-  base: "{base}"
-  suffixes: [{suffixes_yaml}]
-dims: {{d: {d}, D: {D}, B: {B}, unit: "mm"}}
-standards: ["ISO 15", "ISO 281", "ГОСТ 520-2011"]
-equivalents:
-{equiv_yaml}
-load_capacity:
-  dynamic_C_kN: {C_kN}
-  static_C0_kN: {C0_kN}
-  rpm_limit: {rpm_limit}
----
-
-# {full_desig} — {info['title_ru']}
-
-{description_line}
-
-## Назначение и где применяется
-
-**Типовые применения**:
-"""
-    for app in info["applications"]:
-        card += f"- {app}\n"
-
-    card += f"""
-**Тип нагрузки**:
-- Радиальная: {info['load_type_radial']}
-- Осевая: {info['load_type_axial']}
-
-**Режимы работы**:
-- Обороты: {optimal_low}–{rpm_limit} об/мин (оптимум {optimal_low}–{optimal_high})
-- Температура: {temp_range}
-{env_line}
-
-## Расшифровка обозначения
-
-**Базовое обозначение**: {base}
-- **{prefix_digit}** — {prefix_meaning}
-- **{width_digit}** — серия ширины {width_label} (B = {B} мм для этого размера)
-- **{bore_code_str}** — {bore_explanation(d)}
-
-**Суффиксы**:
-{suffix_explanation}
-**Особенности маркировки**:
-{marking_notes}
-
-## Габариты и совместимость
-
-**Размеры** (ISO 15):
-- Внутренний диаметр d: {d} мм
-- Наружный диаметр D: {D} мм
-- Ширина B: {B} мм
-
-**Совместимость по ISO 15**:
-{compat_note}
-
-**Посадочные требования**:
-{fit_requirements}
-
-## Грузоподъёмность и ресурс
-
-**Динамическая грузоподъёмность** (C): {C_kN} кН (≈ {kn_to_kgf(C_kN)} кгс)
-**Статическая грузоподъёмность** (C0): {C0_kN} кН (≈ {kn_to_kgf(C0_kN)} кгс)
-**Предельные обороты**: {rpm_note}
-
-**Расчёт ресурса** (по ISO 281):
-
-{info['life_note']}
-```
-{info['life_formula']}
-L10h = L10 / (60 × n)
-```
-
-{life_example}
-
-**Реальный ресурс** зависит от:
-- Качества смазки и условий эксплуатации
-- Точности монтажа и центровки
-- Загрязнённости среды
-- Температурного режима
-
-## Эквиваленты и аналоги
-
-**Точные эквиваленты** (совпадают размеры{', угол контакта' if btype == 'ball_angular' else ' и уплотнения'}):
-
-| Производитель | Обозначение | Примечания |
-|---------------|-------------|------------|
-{equiv_table}
-
-**Функциональные аналоги** (допустимые отличия):
-{func_analogues}
-
-**Внимание**: проверяйте совпадение суффиксов (зазор, уплотнение) при замене между производителями.
+    return {
+        "title_ru": info["title_ru"],
+        "description_line": (
+            f"{info['description']}{desc_suffix}. "
+            "Подшипник серии {{series}}, применяемый в промышленном оборудовании и механизмах."
+        ),
+        "suffixes_yaml": ", ".join(f'"{s}"' for s in suffixes),
+        "applications": "".join(f"- {app}\n" for app in info["applications"]),
+        "load_type_radial": info["load_type_radial"],
+        "load_type_axial": info["load_type_axial"],
+        "temp_range": temp_range,
+        "env_line": env_line,
+        "suffix_explanation": suffix_explanation,
+        "marking_notes": marking_notes,
+        "compat_note": compat_note,
+        "fit_requirements": fit_requirements,
+        "rpm_note": rpm_note,
+        "life_note": info["life_note"],
+        "life_formula": info["life_formula"],
+        "life_example": life_example,
+        "exact_equiv_scope": ", угол контакта" if is_angular else " и уплотнения",
+        "func_analogues": func_analogues,
+        "allowed_replacements": allowed_replacements,
+        "angular_risk_note": angular_risk_note,
+        "typical_errors": typical_errors,
+        "maintenance": maintenance,
+        "replacement_signs": replacement_signs,
+        "examples": examples_text,
+    }
+
+
+@lru_cache(maxsize=None)
+def compiled_card_template(btype: str, suffixes: tuple[str, ...], bucket: str) -> Template:
+    """Card layout with the variant's static sections inlined, compiled once per variant."""
+    return compile_template(load_template(CARD_TEMPLATE), card_partials(btype, suffixes, bucket))
+
+
+def _cannot_replace(base: str, series: str, suffixes: list[str], d: int, D: int) -> str:
+    """Neighbouring sizes that must not be used as a replacement."""
+    d_prev = d - 5 if d >= 20 else d - 2
+    d_next = d + 5 if d >= 20 else d + 3
+    # Neighbouring series
+    if series.startswith("62"):
+        alt_series_prefix = "63"
+        alt_D = D + 10
+    elif series.startswith("63"):
+        alt_series_prefix = "62"
+        alt_D = D - 10
+    else:
+        alt_series_prefix = "62"
+        alt_D = D
 
-## Риски замены и ограничения
+    sfx = ("-" + suffixes[0]) if suffixes and suffixes[0] in ("2RS", "2Z", "B") else ""
+    cannot_replace = []
+    # Different series
+    if series != "7xxx":
+        cannot_replace.append(
+            f"- {alt_series_prefix}{base[2:]}{sfx} — другой D ({alt_D} мм вместо {D} мм) — не войдёт в корпус"
+        )
+    # Smaller bore
+    if d_prev >= 10:
+        cannot_replace.append(
+            f"- {base[0]}{base[1]}{bore_code(d_prev)}{sfx} — другой d ({d_prev} мм вместо {d} мм) — не сядет на вал"
+        )
+    # Larger bore
+    cannot_replace.append(
+        f"- {base[0]}{base[1]}{bore_code(d_next)}{sfx} — другой d ({d_next} мм вместо {d} мм) — не сядет на вал"
+    )
+    return "\n".join(cannot_replace)
 
-**Нельзя заменять на**:
-{cannot_replace_str}
 
-**Допустимые замены с оговорками**:
-{allowed_replacements}
-{angular_risk_note}
-**Типовые ошибки**:
-{typical_errors}
+def row_fields(row: dict) -> dict[str, object]:
+    """Template values that depend only on the catalog row, shared by all its suffix variants."""
+    base = row["designation"]
+    btype = row["type"]
+    series = row["series"]
+    d = int(row["d_mm"])
+    C_kN = float(row["C_kN"])
+    C0_kN = float(row["C0_kN"])
+    info = TYPE_INFO[btype]
 
-## Эксплуатация и обслуживание
+    # --- life calculation example ---
+    example_Fr = max(300, int(C_kN * 1000 * 0.05))  # ~5% of C
+    example_Fr = round(example_Fr / 100) * 100  # round to hundreds
+    example_n = 1500
+    P = example_Fr
 
-{maintenance}
+    # Roller bearings use 10/3 exponent, ball bearings use 3
+    life_exponent = 10/3 if btype.startswith("roller_") else 3
+    L10 = (C_kN * 1000 / P) ** life_exponent
+    L10h = L10 * 1e6 / (60 * example_n)
 
-{replacement_signs}
+    return {
+        "base": base,
+        "base_tail": base[1:],
+        "radial_designation": f"{'6' if base[0] == '7' else base[0]}{base[1:]}",
+        "series": series,
+        "series_family": f"{series[:-1]}x",
+        "d": d,
+        "D": int(row["D_mm"]),
+        "B": float(row["B_mm"]),
+        "C_kN": C_kN,
+        "C0_kN": C0_kN,
+        "C_kgf": kn_to_kgf(C_kN),
+        "C0_kgf": kn_to_kgf(C0_kN),
+        "rpm_grease": int(row["rpm_grease"]),
+        "rpm_oil": int(row["rpm_oil"]),
+        "prefix_digit": base[0],
+        "prefix_meaning": info["series_prefix_meaning"].get(base[0], f"серия {base[0]}xxx"),
+        "width_digit": base[1],
+        "width_label": WIDTH_SERIES_LABEL.get(base[1], ""),
+        "bore_code": base[2:],
+        "bore_explanation": bore_explanation(d),
+        "example_Fr": example_Fr,
+        "example_Fa": example_Fr // 2,
+        "example_n": example_n,
+        "example_P": int(0.57 * example_Fr + 0.93 * (example_Fr // 2)),
+        "C_N": int(C_kN * 1000),
+        "example_L10": int(L10),
+        "example_L10h": int(L10h),
+    }
+
+
+def card_fields(
+    row: dict,
+    suffixes: list[str],
+    equiv_row: dict | None,
+    card_id: str,
+    created: str | None = None,
+    updated: str | None = None,
+    shared: dict[str, object] | None = None,
+) -> dict[str, object]:
+    """
+    Per-card values substituted into the compiled card template (dates default to today).
+
+    `shared` is row_fields(row), passed in when several variants of one row are rendered.
+    """
+    if shared is None:
+        shared = row_fields(row)
+    base = row["designation"]
+    btype = row["type"]
+    series = row["series"]
 
-**См. подробнее**: [Эксплуатация и обслуживание](../../maintenance/README.md)
+    info = TYPE_INFO[btype]
+    full_desig = full_designation(base, suffixes)
+    today = date.today().isoformat()
 
-## Примеры применения
+    # --- tags ---
+    bearing_element = "ball" if btype.startswith("ball_") else "roller"
+    tags = ["bearing", bearing_element]
+    tags.extend(info["tags_extra"])
+    tags.append(series)
+    for s in suffixes:
+        si = SUFFIX_INFO.get(s)
+        if si and si.get("tag"):
+            tags.append(si["tag"])
 
-{examples_text}
+    # --- aliases ---
+    aliases = [full_desig.replace("-", " ").lower()]
+    if equiv_row:
+        skf = equiv_row.get("SKF", "")
+        if skf and skf != base:
+            aliases.append(skf)
+        nsk = equiv_row.get("NSK", "")
+        if nsk and nsk != base:
+            aliases.append(nsk)
 
-## См. также
+    # --- equivalents yaml and table ---
+    equiv_rows = _equiv_table_rows(equiv_row, btype, suffixes)
+    if equiv_rows:
+        equiv_yaml = "\n".join(f'  - {{manufacturer: "{mfr}", code: "{code}"}}' for mfr, code, _note in equiv_rows)
+    else:
+        equiv_yaml = '  - {manufacturer: "generic", code: "' + base + '"}'
+    equiv_table = "\n".join(f"| {mfr} | {code} | {note} |" for mfr, code, note in equiv_rows)
 
-- [Типы подшипников](../../types/README.md)
-- [Маркировка подшипников](../../designation/README.md)
-- [Размеры и серии](../../dimensions/README.md)
-- [Выбор подшипника](../../selection/README.md)
-- [Производители](../../manufacturers/README.md)
+    # --- rpm limit (sealed bearings are ~80% of grease rating) ---
+    rpm_grease = shared["rpm_grease"]
+    has_seal = any(s in ("2RS", "2Z") for s in suffixes)
+    if has_seal:
+        rpm_limit = int(rpm_grease * SEALED_RPM_FACTOR)
+    else:
+        rpm_limit = rpm_grease
 
-## Источники
+    return {
+        **shared,
+        "card_id": card_id,
+        "created": created or today,
+        "updated": updated or today,
+        "full_desig": full_desig,
+        "tags": ", ".join(f'"{t}"' for t in tags),
+        "aliases": ", ".join(f'"{a}"' for a in aliases),
+        "rpm_limit": rpm_limit,
+        "optimal_low": max(100, rpm_limit // 10),
+        "optimal_high": rpm_limit // 3,
+        "equiv_yaml": equiv_yaml,
+        "equiv_table": equiv_table,
+        "cannot_replace": _cannot_replace(base, series, suffixes, shared["d"], shared["D"]),
+    }
+
+
+def generate_card(
+    row: dict,
+    suffixes: list[str],
+    equiv_row: dict | None,
+    card_id: str,
+    created: str | None = None,
+    updated: str | None = None,
+    shared: dict[str, object] | None = None,
+) -> str:
+    """Generate the full README.md content for a bearing card."""
+    btype = row["type"]
+    bucket = "" if btype == "ball_angular" else size_bucket(int(row["d_mm"]))
+    template = compiled_card_template(btype, tuple(suffixes), bucket)
+    return template.render(card_fields(row, suffixes, equiv_row, card_id, created, updated, shared))
 
-- **Каталог производителя**: SKF General Catalogue 2020
-- **Стандарт**: ISO 15:2017 (размеры), ISO 281:2007 (грузоподъёмность)
-- **ГОСТ**: ГОСТ 520-2011 (общие технические условия)
 
-## Контроль качества
+# ---------------------------------------------------------------------------
+# Incremental regeneration
+# ---------------------------------------------------------------------------
 
-- [x] Есть метаданные (id/topic/status/source)
-- [x] Размеры и грузоподъёмность из каталога
-- [x] Эквиваленты проверены по кросс-справочнику
-- [x] Есть примеры применения
-- [x] Риски замены описаны
-- [ ] Для `status: verified` нет placeholder
-"""
-    return card
+MANIFEST_VERSION = 1
+# Bump when a change to this script, bearing_designation.py or kb_template.py
+# changes the text of generated cards; the template file is hashed as is.
+CARD_FORMAT_VERSION = 1
+DEFAULT_MANIFEST = Path("_meta/bearing_cards_manifest.json")
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def generator_fingerprint() -> str:
+    """Hash of what besides the row shapes a card: CARD_FORMAT_VERSION and the card template."""
+    return _sha256(f"{CARD_FORMAT_VERSION}\0".encode("utf-8") + CARD_TEMPLATE.read_bytes())
+
+
+def input_fingerprint(row: dict, suffixes: list[str], equiv_row: dict | None) -> str:
+    """
+    Hash of a card's inputs: catalog row, equivalents row, suffixes, generator.
+
+    Numeric columns are hashed as floats so a CSV row ("9") and the same row
+    from a compiled .bcat (9.0) give the same fingerprint.
+    """
+    payload = {
+        "row": {k: float(v) if k in NUMERIC_COLUMNS else str(v) for k, v in row.items()},
+        "equivalents": equiv_row,
+        "suffixes": list(suffixes),
+        "generator": generator_fingerprint(),
+    }
+    return _sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+
+
+def load_manifest(path: Path) -> dict:
+    """Load the card manifest: {"version", "cards": {folder: {"id", "base", "suffixes", "inputs", "output"}}}."""
+    if not path.exists():
+        return {"version": MANIFEST_VERSION, "cards": {}}
+    manifest = json.loads(path.read_text(encoding="utf-8"))
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"{path}: unsupported manifest version {manifest.get('version')!r}")
+    return manifest
+
+
+def save_manifest(path: Path, manifest: dict) -> None:
+    manifest["cards"] = dict(sorted(manifest["cards"].items()))
+    atomic_write_text(path, json.dumps(manifest, indent=2, ensure_ascii=False) + "\n")
+
+
+def load_variant_matrix(path: Path) -> dict[str, tuple[tuple[str, ...], ...]]:
+    """Read a JSON variant matrix: bearing type -> list of suffix lists."""
+    raw = json.loads(path.read_text(encoding="utf-8"))
+    matrix = {}
+    for btype, variants in raw.items():
+        if btype not in TYPE_INFO:
+            raise ValueError(f"{path}: unknown bearing type {btype!r}")
+        matrix[btype] = tuple(tuple(v) for v in variants)
+    return matrix
+
+
+def _file_sha(path: Path) -> str:
+    return _sha256(path.read_bytes())
+
+
+def render_card_job(job: tuple) -> tuple[str, str, bool]:
+    """
+    Process-pool worker: render one card and write it if it changed.
+
+    job = (card_path, row, suffixes, equiv_row, card_id, created, updated, write, shared),
+    where created/updated are the existing card's dates (None for a new card)
+    and shared is row_fields(row).
+    `updated` is moved to today only if the rendered text actually changes,
+    so a generator edit that does not touch a card leaves it as is.
+    Returns (card_path, sha256 of the content, whether the content changed).
+    """
+    card_path, row, suffixes, equiv_row, card_id, created, updated, write, shared = job
+    path = Path(card_path)
+    old = path.read_bytes() if path.exists() else None
+    content = generate_card(row, suffixes, equiv_row, card_id, created, updated, shared)
+    if old is not None and updated is not None and content.encode("utf-8") != old:
+        content = generate_card(row, suffixes, equiv_row, card_id, created, date.today().isoformat(), shared)
+    data = content.encode("utf-8")
+    changed = old != data
+    if write and changed:
+        atomic_write_text(path, content)
+    return card_path, _sha256(data), changed
+
+
+def run_jobs(jobs: list[tuple], workers: int) -> list[tuple[str, str, bool]]:
+    """Render jobs in a process pool (inline for a single worker or job)."""
+    if workers <= 1 or len(jobs) <= 1:
+        return [render_card_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(render_card_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
 
 
 # ---------------------------------------------------------------------------
@@ -926,7 +1029,7 @@ def main() -> int:
         "--catalog",
         type=Path,
         required=True,
-        help="Путь к CSV-каталогу подшипников",
+        help="Путь к CSV-каталогу подшипников (или скомпилированному .bcat)",
     )
     parser.add_argument(
         "--equivalents",
@@ -943,8 +1046,14 @@ def main() -> int:
     parser.add_argument(
         "--id-start",
         type=int,
-        default=30,
-        help="Начальный номер ID (KB-RU-NNNNNN)",
+        default=None,
+        help="Начальный номер ID (KB-RU-NNNNNN); по умолчанию ID выдаются из реестра --id-registry",
+    )
+    parser.add_argument(
+        "--id-registry",
+        type=Path,
+        default=ID_REGISTRY,
+        help=f"Центральный реестр ID (по умолчанию {ID_REGISTRY})",
     )
     parser.add_argument(
         "--suffixes",
@@ -952,67 +1061,205 @@ def main() -> int:
         default="",
         help='Суффиксы через запятую, напр. "2RS" или "2RS,C3"',
     )
+    parser.add_argument(
+        "--variants",
+        action="store_true",
+        help="Все варианты суффиксов за один проход по матрице VARIANT_MATRIX (или --variant-matrix)",
+    )
+    parser.add_argument(
+        "--variant-matrix",
+        type=Path,
+        help='JSON-матрица вариантов: {"ball_radial": [[], ["2RS"], ["2RS", "C3"]], ...}',
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
         help="Показать что будет сгенерировано, не записывая файлы",
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Перегенерировать существующие карточки, у которых изменились входные данные (по манифесту)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="С --incremental: перезаписывать и карточки, изменённые вручную",
+    )
+    parser.add_argument(
+        "--adopt",
+        action="store_true",
+        help="С --incremental: перегенерировать карточки, которых нет в манифесте (id и created сохраняются)",
+    )
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        default=DEFAULT_MANIFEST,
+        help=f"Манифест отпечатков входных данных карточек (по умолчанию {DEFAULT_MANIFEST})",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Число процессов для рендера карточек",
+    )
 
     args = parser.parse_args()
 
     # Parse suffixes
     suffixes = [s for s in (x.strip() for x in args.suffixes.split(",")) if s] if args.suffixes else []
+    if suffixes and (args.variants or args.variant_matrix):
+        print("ERROR: --suffixes and --variants are mutually exclusive", file=sys.stderr)
+        return 2
 
-    # Load data
+    # Load data once for all variants
     catalog = load_catalog(args.catalog)
     equivalents = load_equivalents(args.equivalents)
+    try:
+        manifest = load_manifest(args.manifest)
+        matrix = None
+        if args.variant_matrix:
+            matrix = load_variant_matrix(args.variant_matrix)
+        elif args.variants:
+            matrix = VARIANT_MATRIX
+        ids = IdAllocator(
+            args.id_registry, args.id_start, {entry["id"] for entry in manifest["cards"].values()}
+        )
+    except (OSError, ValueError) as exc:
+        print(f"ERROR: {exc}", file=sys.stderr)
+        return 2
+    tracked = manifest["cards"]
 
-    generated = []
+    # One scan of the output tree instead of a stat per card
+    existing = {p.parent.name for p in args.output_dir.glob("*/README.md")}
+
+    jobs = []  # (card_path, row, suffixes, equiv_row, card_id, created, updated, write, shared)
+    planned: dict[str, tuple[str, dict, bool]] = {}  # card_path -> (folder, manifest entry, existed)
     skipped = []
-    current_id = args.id_start
+    unchanged = []
+    edited = []
+    untracked = []
+    adopted = []
 
     for row in catalog:
         base = row["designation"]
+        shared = row_fields(row)
 
-        # Build the designation with suffixes
-        card_suffixes = list(suffixes)
-
-        # For angular contact bearings with no explicit suffix, add "B" by default
-        if row["type"] == "ball_angular" and not card_suffixes:
-            card_suffixes = ["B"]
-
-        fname = folder_name(base, card_suffixes)
-        card_dir = args.output_dir / fname
-        card_path = card_dir / "README.md"
-
-        # Skip existing cards
-        if card_path.exists():
-            skipped.append(fname)
-            continue
-
-        # Look up equivalents
-        equiv_row = get_equiv_row(equivalents, base, card_suffixes)
-
-        # Generate ID
-        card_id = f"KB-RU-{current_id:06d}"
-        current_id += 1
-
-        content = generate_card(row, card_suffixes, equiv_row, card_id)
-
-        if args.dry_run:
-            print(f"  [DRY-RUN] {card_path}")
+        if matrix is not None:
+            variants = [list(v) for v in matrix.get(row["type"], ())]
         else:
-            card_dir.mkdir(parents=True, exist_ok=True)
-            card_path.write_text(content, encoding="utf-8")
-            print(f"  [CREATED] {card_path}")
+            # Build the designation with suffixes
+            card_suffixes = list(suffixes)
+
+            # For angular contact bearings with no explicit suffix, add "B" by default
+            if row["type"] == "ball_angular" and not card_suffixes:
+                card_suffixes = ["B"]
+            variants = [card_suffixes]
+
+        for card_suffixes in variants:
+            fname = folder_name(base, card_suffixes)
+            card_path = args.output_dir / fname / "README.md"
+
+            # Look up equivalents
+            equiv_row = get_equiv_row(equivalents, base, card_suffixes)
+            inputs = input_fingerprint(row, card_suffixes, equiv_row)
+            entry = tracked.get(fname)
+            created = updated = None
+            exists = fname in existing
+
+            if not exists:
+                # New card, or a tracked one deleted from disk: keep its id
+                card_id = entry["id"] if entry else ids.allocate()
+            elif not args.incremental:
+                skipped.append(fname)
+                continue
+            elif entry is None:
+                # Untracked card: adopt it if the generator reproduces it exactly
+                fm = read_front_matter(card_path)
+                card_id, created, updated = fm.get("id"), fm.get("created"), fm.get("updated")
+                if not card_id:
+                    untracked.append(fname)
+                    continue
+                content = generate_card(row, card_suffixes, equiv_row, card_id, created, updated, shared)
+                if content == card_path.read_text(encoding="utf-8"):
+                    tracked[fname] = {
+                        "id": card_id, "base": base, "suffixes": card_suffixes,
+                        "inputs": inputs, "output": _sha256(content.encode("utf-8")),
+                    }
+                    adopted.append(fname)
+                    continue
+                if not args.adopt:
+                    untracked.append(fname)
+                    continue
+            else:
+                is_edited = _file_sha(card_path) != entry["output"]
+                if is_edited and not args.force:
+                    edited.append(fname)
+                    continue
+                if not is_edited and entry["inputs"] == inputs:
+                    unchanged.append(fname)
+                    continue
+                card_id = entry["id"]
+                fm = read_front_matter(card_path)
+                created, updated = fm.get("created"), fm.get("updated")
+
+            jobs.append(
+                (str(card_path), row, card_suffixes, equiv_row, card_id, created, updated, not args.dry_run, shared)
+            )
+            planned[str(card_path)] = (
+                fname, {"id": card_id, "base": base, "suffixes": card_suffixes, "inputs": inputs}, exists,
+            )
 
-        generated.append(fname)
+    generated = []
+    regenerated = []
+    indexes = []
+    if args.dry_run:
+        for job in jobs:
+            print(f"  [DRY-RUN] {job[0]}")
+            fname, _entry, existed = planned[job[0]]
+            (regenerated if existed else generated).append(fname)
+    else:
+        for card_path, output, changed in run_jobs(jobs, args.jobs):
+            fname, entry, existed = planned[card_path]
+            tracked[fname] = {**entry, "output": output}
+            if not existed:
+                print(f"  [CREATED] {card_path}")
+                generated.append(fname)
+            elif changed:
+                print(f"  [UPDATED] {card_path}")
+                regenerated.append(fname)
+            else:
+                unchanged.append(fname)
+        if jobs or adopted:
+            save_manifest(args.manifest, manifest)
+        # The registry goes last: after a crash ids may be skipped, never reused
+        ids.save()
+        if generated or regenerated:
+            # Card lists and counts in kb/ru indexes, so kb_index.py --check stays green
+            indexes = rebuild_indexes()
+
+    # Manifest entries whose catalog row is gone are reported, never deleted
+    designations = {row["designation"] for row in catalog}
+    orphans = sorted(f for f, entry in tracked.items() if entry["base"] not in designations)
 
     # Summary
     print()
     print(f"Generated: {len(generated)} card(s)")
     if skipped:
         print(f"Skipped (already exist): {len(skipped)} — {', '.join(skipped)}")
+    if args.incremental:
+        print(f"Regenerated (inputs changed): {len(regenerated)}")
+        print(f"Unchanged: {len(unchanged)}")
+        if adopted:
+            print(f"Adopted into manifest: {len(adopted)}")
+        if edited:
+            print(f"WARNING: edited by hand, not overwritten (use --force): {', '.join(edited)}", file=sys.stderr)
+        if untracked:
+            print(f"WARNING: not in manifest, not overwritten (use --adopt): {', '.join(untracked)}", file=sys.stderr)
+    if indexes:
+        print(f"Indexes updated: {len(indexes)}")
+    if orphans:
+        print(f"WARNING: manifest entries without a catalog row: {', '.join(orphans)}", file=sys.stderr)
     if generated:
         print("Cards:")
         for g in generated:
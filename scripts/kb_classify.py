@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Классификация статей по темам через автомат Ахо–Корасик.
+
+Ключевые слова и их веса по темам задаются таблицей `_meta/topic_keywords.json`
+(keyword -> {topic: weight}). Из таблицы один раз строится автомат, который
+находит все ключевые слова за один линейный проход по полному тексту,
+независимо от их числа. Ключевое слово — основа: совпадение засчитывается
+только с начала слова («смазк» находит «смазка», но не «высмазка»).
+
+Счёт темы — сумма weight × (1 + ln n) по её ключевым словам (n — число
+вхождений), совпадения в заголовке умножаются на `title_weight`. Подтема
+(`parents`) участвует, только если у родителя есть совпадения, и получает
+его счёт в добавку — так «подшипники + ГОСТ» уходит в podshipniki-standards.
+Результат не зависит от порядка ключевых слов в таблице.
+
+Использование:
+    from kb_classify import load_classifier
+    load_classifier().classify(text, title)   # [(topic, score), ...]
+"""
+from __future__ import annotations
+
+import json
+import math
+from collections import deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+KEYWORDS_JSON = Path("_meta/topic_keywords.json")
+
+
+def fold(text: str) -> str:
+    """Нормализация для сопоставления: нижний регистр, ё -> е."""
+    return text.lower().replace("ё", "е")
+
+
+class KeywordAutomaton:
+    """
+    Автомат Ахо–Корасик над множеством строк.
+
+    Переходы по несовпадению (failure links) сворачиваются в таблицу
+    переходов лениво, при первом обращении, поэтому на каждый символ текста
+    приходится один поиск в словаре.
+    """
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self.patterns: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._out: List[Tuple[int, ...]] = [()]
+        for pattern in patterns:
+            self._add(pattern)
+        self._fail = self._link()
+        self._delta: List[Dict[str, int]] = [dict(g) for g in self._goto]
+        self.alphabet = frozenset(ch for g in self._goto for ch in g)
+
+    def _add(self, pattern: str) -> None:
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._out.append(())
+            state = nxt
+        self._out[state] += (len(self.patterns),)
+        self.patterns.append(pattern)
+
+    def _link(self) -> List[int]:
+        """Failure links обходом в ширину; выходы наследуются по ним."""
+        fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())  # у состояний глубины 1 ссылка на корень
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in self._goto[f]:
+                    f = fail[f]
+                fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] += self._out[fail[nxt]]
+        return fail
+
+    def _step(self, state: int, ch: str) -> int:
+        delta = self._delta[state]
+        nxt = delta.get(ch)
+        if nxt is None:
+            nxt = self._step(self._fail[state], ch) if state else 0
+            delta[ch] = nxt
+        return nxt
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """(индекс начала, номер шаблона) для всех вхождений, за один проход по тексту."""
+        alphabet, delta, out, patterns = self.alphabet, self._delta, self._out, self.patterns
+        state = 0
+        for i, ch in enumerate(text):
+            if ch not in alphabet:
+                state = 0
+                continue
+            nxt = delta[state].get(ch)
+            state = self._step(state, ch) if nxt is None else nxt
+            for index in out[state]:
+                yield i + 1 - len(patterns[index]), index
+
+    def count_words(self, text: str) -> Dict[int, int]:
+        """Число вхождений каждого шаблона, начинающихся с начала слова."""
+        counts: Dict[int, int] = {}
+        for start, index in self.iter_matches(text):
+            if start == 0 or not text[start - 1].isalnum():
+                counts[index] = counts.get(index, 0) + 1
+        return counts
+
+
+@dataclass
+class TopicClassifier:
+    """Взвешенная таблица keyword -> {topic: weight} и построенный по ней автомат."""
+
+    keywords: Dict[str, Dict[str, float]]
+    parents: Dict[str, str] = field(default_factory=dict)
+    default_topic: str = "general"
+    min_score: float = 1.0
+    title_weight: float = 3.0
+
+    def __post_init__(self) -> None:
+        self.keywords = {fold(k): v for k, v in self.keywords.items()}
+        self.automaton = KeywordAutomaton(sorted(self.keywords))
+        self._weights = [self.keywords[p] for p in self.automaton.patterns]
+
+    @classmethod
+    def from_json(cls, path: Path) -> "TopicClassifier":
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return cls(
+            keywords=data["keywords"],
+            parents=data.get("parents", {}),
+            default_topic=data.get("default_topic", "general"),
+            min_score=float(data.get("min_score", 1.0)),
+            title_weight=float(data.get("title_weight", 3.0)),
+        )
+
+    @property
+    def topics(self) -> List[str]:
+        found = {topic for weights in self.keywords.values() for topic in weights}
+        return sorted(found | set(self.parents.values()) | {self.default_topic})
+
+    def _raw_scores(self, text: str, factor: float, scores: Dict[str, float]) -> None:
+        for index, n in self.automaton.count_words(fold(text)).items():
+            damped = factor * (1.0 + math.log(n))
+            for topic, weight in self._weights[index].items():
+                scores[topic] = scores.get(topic, 0.0) + weight * damped
+
+    def scores(self, text: str, title: str = "") -> List[Tuple[str, float]]:
+        """Кандидаты (тема, счёт) по убыванию счёта; пусто, если совпадений нет."""
+        raw: Dict[str, float] = {}
+        self._raw_scores(text, 1.0, raw)
+        if title:
+            self._raw_scores(title, self.title_weight, raw)
+
+        scored: Dict[str, float] = {}
+        for topic, score in raw.items():
+            parent = self.parents.get(topic)
+            if parent is None:
+                scored[topic] = score
+            elif raw.get(parent, 0.0) > 0:
+                scored[topic] = score + raw[parent]
+        return sorted(scored.items(), key=lambda item: (-item[1], item[0]))
+
+    def classify(self, text: str, title: str = "") -> List[Tuple[str, float]]:
+        """Кандидаты с счётом не ниже min_score, либо [(default_topic, 0.0)]."""
+        candidates = [(t, round(s, 3)) for t, s in self.scores(text, title) if s >= self.min_score]
+        return candidates or [(self.default_topic, 0.0)]
+
+    def best_topic(self, text: str, title: str = "") -> str:
+        return self.classify(text, title)[0][0]
+
+
+@lru_cache(maxsize=None)
+def load_classifier(path: Path = KEYWORDS_JSON) -> TopicClassifier:
+    """Классификатор по таблице ключевых слов (строится один раз на процесс)."""
+    return TopicClassifier.from_json(path)
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Общий читатель YAML front-matter для скриптов базы знаний.
+
+Читает файл построчно только до закрывающего `---`, тело статьи не загружается.
+Поддерживает подмножество YAML, используемое в статьях и карточках:
+
+- скаляры: строки (в кавычках и без), целые и дробные числа, true/false/null;
+- inline-списки `[a, "b"]` и inline-словари `{d: 25, unit: "mm"}` (с вложенностью);
+- блочные словари (`designation:` + строки `  base: "6205"`);
+- блочные списки, в том числе списки словарей (`equivalents:` + `  - {...}`);
+- комментарии: строки `# ...` целиком, ` # ...` после inline-коллекций,
+  строк в кавычках и значений служебных полей (COMMENTED_FIELDS:
+  `status: draft  # draft | verified`); в остальных строках без кавычек `#` —
+  часть значения (`title: Подшипник #6205`).
+
+Значения-заглушки вида `[[TBD]]` остаются строками.
+"""
+from __future__ import annotations
+
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Закрывающий `---` ищется не дальше этой строки (как в прежних парсерах)
+MAX_FRONT_MATTER_LINES = 200
+
+YAML_START = re.compile(r"^---\s*$")
+YAML_KV = re.compile(r"^([A-Za-z0-9_-]+)\s*:\s*(.*?)\s*$")
+# `- key: value` в блочном списке: пробел после двоеточия обязателен, чтобы `- http://...` остался строкой
+YAML_ITEM_KV = re.compile(r"^([A-Za-z0-9_-]+)\s*:(?:\s+(.*?))?\s*$")
+# Поля-перечисления и служебные поля, в значениях которых `#` не встречается
+COMMENTED_FIELDS = frozenset({"id", "status", "created", "updated"})
+INT_VALUE = re.compile(r"^[-+]?\d+$")
+FLOAT_VALUE = re.compile(r"^[-+]?(?:\d+\.\d*|\.\d+)(?:[eE][-+]?\d+)?$")
+
+
+def _strip_comment(raw: str) -> str:
+    """Убирает комментарий ` # ...`, если он вне кавычек и скобок."""
+    quote = None
+    for i, ch in enumerate(raw):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in "\"'":
+            quote = ch
+        elif ch == "#" and (i == 0 or raw[i - 1] in " \t"):
+            return raw[:i].rstrip()
+    return raw
+
+
+def _split_top_level(content: str) -> List[str]:
+    """Делит содержимое inline-коллекции по запятым верхнего уровня."""
+    items = []
+    depth = 0
+    quote = None
+    start = 0
+    for i, ch in enumerate(content):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in "\"'":
+            quote = ch
+        elif ch in "[{":
+            depth += 1
+        elif ch in "]}":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            items.append(content[start:i])
+            start = i + 1
+    items.append(content[start:])
+    return [item.strip() for item in items if item.strip()]
+
+
+def _value(raw: str, key: Optional[str] = None) -> Any:
+    """parse_value() без хвостового комментария у коллекций, строк в кавычках и COMMENTED_FIELDS."""
+    value = raw.strip()
+    if key in COMMENTED_FIELDS or (value[:1] in ("[", "{", "\"", "'") and not value.startswith("[[")):
+        value = _strip_comment(value)
+    return parse_value(value)
+
+
+def parse_value(raw: str) -> Any:
+    """Разбирает значение YAML (скаляр или inline-коллекцию)."""
+    value = raw.strip()
+    if not value:
+        return None
+
+    if value.startswith("[[") and value.endswith("]]"):
+        return value
+
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+
+    if value.startswith("[") and value.endswith("]"):
+        return [parse_value(item) for item in _split_top_level(value[1:-1])]
+
+    if value.startswith("{") and value.endswith("}"):
+        result: Dict[str, Any] = {}
+        for item in _split_top_level(value[1:-1]):
+            key, sep, val = item.partition(":")
+            if sep:
+                result[key.strip().strip("\"'")] = parse_value(val)
+        return result
+
+    if INT_VALUE.match(value):
+        return int(value)
+    if FLOAT_VALUE.match(value):
+        return float(value)
+    lowered = value.lower()
+    if lowered == "true":
+        return True
+    if lowered == "false":
+        return False
+    if lowered in ("null", "~"):
+        return None
+    return value
+
+
+def _parse_block(lines: List[Tuple[int, str]], pos: int, indent: int) -> Tuple[Any, int]:
+    """Разбирает блочный список или словарь с отступом indent, начиная с lines[pos]."""
+    if lines[pos][1].startswith("- ") or lines[pos][1] == "-":
+        items: List[Any] = []
+        while pos < len(lines) and lines[pos][0] == indent and lines[pos][1].startswith("-"):
+            item = lines[pos][1][1:].strip()
+            pos += 1
+            m = YAML_ITEM_KV.match(item)
+            if m and not item.startswith(("{", "[", "\"", "'")):
+                # `- key: value` — элемент-словарь, продолжающийся на следующих строках
+                entry = {m.group(1): _value(m.group(2) or "", m.group(1))}
+                while pos < len(lines) and lines[pos][0] > indent:
+                    sub = YAML_KV.match(lines[pos][1])
+                    if sub:
+                        entry[sub.group(1)] = _value(sub.group(2), sub.group(1))
+                    pos += 1
+                items.append(entry)
+            else:
+                items.append(_value(item))
+        return items, pos
+
+    mapping: Dict[str, Any] = {}
+    while pos < len(lines) and lines[pos][0] == indent:
+        m = YAML_KV.match(lines[pos][1])
+        pos += 1
+        if not m:
+            continue
+        key, raw = m.group(1), m.group(2)
+        if raw:
+            mapping[key] = _value(raw, key)
+        elif pos < len(lines) and lines[pos][0] > indent:
+            mapping[key], pos = _parse_block(lines, pos, lines[pos][0])
+        else:
+            mapping[key] = None
+    return mapping, pos
+
+
+def parse_front_matter_lines(fm_lines: Iterable[str]) -> Dict[str, Any]:
+    """Разбирает строки между `---` в словарь с типизированными значениями."""
+    lines: List[Tuple[int, str]] = []
+    for ln in fm_lines:
+        ln = ln.rstrip("\r\n")
+        stripped = ln.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        lines.append((len(ln) - len(ln.lstrip(" ")), stripped))
+
+    fm: Dict[str, Any] = {}
+    pos = 0
+    while pos < len(lines):
+        indent = lines[pos][0]
+        if indent:
+            # Строка с отступом без родительского ключа — пропускаем
+            pos += 1
+            continue
+        block, pos = _parse_block(lines, pos, 0)
+        if isinstance(block, dict):
+            fm.update(block)
+        # Список на верхнем уровне не является front-matter статьи — игнорируем
+    return fm
+
+
+def _collect_front_matter(lines: Iterator[str], max_lines: int) -> Optional[List[str]]:
+    """Возвращает строки front-matter или None, если его нет (итератор сдвигается за `---`)."""
+    first = next(lines, None)
+    if first is None or not YAML_START.match(first.rstrip("\r\n")):
+        return None
+    fm_lines = []
+    for _ in range(1, max_lines):
+        ln = next(lines, None)
+        if ln is None:
+            return None
+        if YAML_START.match(ln.rstrip("\r\n")):
+            return fm_lines
+        fm_lines.append(ln)
+    return None
+
+
+def read_front_matter(path: Path, max_lines: int = MAX_FRONT_MATTER_LINES) -> Dict[str, Any]:
+    """
+    Читает front-matter файла, не загружая тело статьи.
+
+    Возвращает пустой словарь, если front-matter отсутствует или не закрыт
+    в пределах max_lines строк.
+    """
+    with open(path, encoding="utf-8", errors="replace") as f:
+        fm_lines = _collect_front_matter(iter(f), max_lines)
+    if fm_lines is None:
+        return {}
+    return parse_front_matter_lines(fm_lines)
+
+
+def split_front_matter(text: str, max_lines: int = MAX_FRONT_MATTER_LINES) -> Tuple[Dict[str, Any], str]:
+    """Делит уже прочитанный текст на front-matter и тело (без ведущих пустых строк)."""
+    lines = iter(text.splitlines(keepends=True))
+    fm_lines = _collect_front_matter(lines, max_lines)
+    if fm_lines is None:
+        return {}, text
+    body = "".join(lines).lstrip("\n")
+    return parse_front_matter_lines(fm_lines), body
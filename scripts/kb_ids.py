@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Центральный реестр ID статей базы знаний (`_meta/id_registry.json`).
+
+Реестр хранит следующий номер, префикс и ширину номера:
+`{"next_id": 489, "prefix": "KB-RU-", "pad": 6}`. Его используют обработчик
+inbox, прайс-листы и генератор карточек подшипников — ID не пересекаются,
+какой бы скрипт их ни выдал.
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+from kb_io import atomic_write_text
+
+ID_REGISTRY = Path("_meta/id_registry.json")
+# Реестр по умолчанию, если файла ещё нет
+DEFAULT_REGISTRY = {"next_id": 202, "prefix": "KB-RU-", "pad": 6}
+
+
+def format_id(prefix: str, number: int, pad: int) -> str:
+    """KB-RU-000489 из префикса, номера и ширины."""
+    return f"{prefix}{str(number).zfill(pad)}"
+
+
+def load_id_registry(path: Path = ID_REGISTRY) -> Dict:
+    """Загружает реестр ID (реестр по умолчанию, если файла нет)."""
+    if not path.exists():
+        return dict(DEFAULT_REGISTRY)
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_id_registry(registry: Dict, path: Path = ID_REGISTRY) -> None:
+    """Атомарно сохраняет реестр ID (kb_io.atomic_write_text)."""
+    atomic_write_text(path, json.dumps(registry, indent=2, ensure_ascii=False))
+
+
+class IdAllocator:
+    """
+    Выдача ID новых статей: с номера start или из центрального реестра.
+
+    ID из used пропускаются. В режиме реестра next_id продвигается
+    и записывается обратно в save().
+    """
+
+    def __init__(self, registry_path: Path = ID_REGISTRY, start: Optional[int] = None, used: Optional[Set[str]] = None) -> None:
+        self.registry_path = registry_path
+        self.used = used if used is not None else set()
+        if start is None:
+            self.registry: Optional[Dict] = json.loads(registry_path.read_text(encoding="utf-8"))
+            self.next_id = self.registry["next_id"]
+            self.prefix, self.pad = self.registry["prefix"], self.registry["pad"]
+        else:
+            self.registry = None
+            self.next_id, self.prefix, self.pad = start, DEFAULT_REGISTRY["prefix"], DEFAULT_REGISTRY["pad"]
+
+    def allocate(self) -> str:
+        while True:
+            article_id = format_id(self.prefix, self.next_id, self.pad)
+            self.next_id += 1
+            if article_id not in self.used:
+                self.used.add(article_id)
+                return article_id
+
+    def save(self) -> None:
+        if self.registry is not None and self.next_id != self.registry["next_id"]:
+            self.registry["next_id"] = self.next_id
+            save_id_registry(self.registry, self.registry_path)
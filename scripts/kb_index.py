@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Пересборка списков статей и индексов базы знаний за один проход.
+
+Front-matter всех README.md в kb/ru читается один раз, после чего
+перестраиваются:
+
+- раздел `## Статьи` в каждом kb/ru/<тема>/README.md — статьи-подпапки
+  с `topic: <тема>` плюс уже перечисленные вручную ссылки, если их цель
+  существует; список сортируется по заголовку;
+- блок `<!-- kb-index:topics -->` в kb/ru/INDEX.md — все разделы
+  с числом статей;
+- блок `<!-- kb-index:cards -->` в kb/ru/bearings/INDEX.md — карточки
+  подшипников по сериям, и строка «Карточек подшипников» в подвале.
+
+Результат не зависит от порядка обхода и от прежнего содержимого
+блоков, поэтому повторный запуск ничего не меняет. Записываются только файлы,
+содержимое которых изменилось (у README темы при этом обновляется `updated`).
+
+Использование:
+    python scripts/kb_index.py
+    python scripts/kb_index.py --dry-run
+    python scripts/kb_index.py --check   # код 1, если индексы устарели
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import sys
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from kb_frontmatter import read_front_matter
+from kb_io import atomic_write_text
+
+KB_ROOT = Path("kb/ru")
+ROOT_INDEX = KB_ROOT / "INDEX.md"
+BEARINGS_INDEX = KB_ROOT / "bearings" / "INDEX.md"
+CARDS_DIR = KB_ROOT / "bearings" / "cards"
+
+ARTICLES_HEADING = "## Статьи"
+TOPICS_BLOCK = ("<!-- kb-index:topics -->", "<!-- /kb-index:topics -->")
+CARDS_BLOCK = ("<!-- kb-index:cards -->", "<!-- /kb-index:cards -->")
+
+ARTICLE_LINK = re.compile(r"^- \[(?P<title>.*)\]\(\./(?P<folder>[^/)]+)/README\.md\)\s*$")
+CARD_COUNT = re.compile(r"^(\*\*Карточек подшипников\*\*: )\d+$", re.MULTILINE)
+UPDATED_LINE = re.compile(r"^(updated:\s*)([\"']?)[^\"'\n]*\2[ \t]*$", re.MULTILINE)
+SERIES_TAG = re.compile(r"^[0-9A-Z]+x+$")
+
+# Порядок и подписи серий в индексе карточек; прочие серии идут следом по алфавиту
+CARD_SERIES = {
+    "62xx": "Серия 62xx (лёгкая)",
+    "63xx": "Серия 63xx (средняя)",
+    "7xxx": "Серия 7xxx (радиально-упорные)",
+    "NUxx": "Серия NU (роликовые цилиндрические)",
+    "NJxx": "Серия NJ (роликовые цилиндрические с бортом)",
+    "30xxx": "Серия 302xx (роликовые конические)",
+}
+
+
+@dataclass(frozen=True)
+class Article:
+    path: Path
+    title: str
+    topic: str
+    front_matter: dict
+
+
+def _title(fm: dict, path: Path) -> str:
+    title = str(fm.get("title") or "").strip().strip('"').strip("'")
+    return title or path.parent.name
+
+
+def scan_articles(root: Path = KB_ROOT) -> Dict[Path, Article]:
+    """Читает front-matter всех README.md под root (один раз за сборку)."""
+    articles: Dict[Path, Article] = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        if "README.md" in filenames:
+            path = Path(dirpath) / "README.md"
+            fm = read_front_matter(path)
+            articles[path] = Article(path, _title(fm, path), str(fm.get("topic") or ""), fm)
+    return articles
+
+
+def _sort_key(title: str, folder: str) -> Tuple[str, str]:
+    return title.casefold(), folder
+
+
+def _plural(n: int, one: str, few: str, many: str) -> str:
+    if n % 10 == 1 and n % 100 != 11:
+        return one
+    if 2 <= n % 10 <= 4 and not 12 <= n % 100 <= 14:
+        return few
+    return many
+
+
+def _section_bounds(text: str, heading: str) -> Optional[Tuple[int, int]]:
+    """(начало тела, конец) раздела heading — до следующего `## ` или конца файла."""
+    m = re.search(rf"^{re.escape(heading)}[ \t]*$", text, re.MULTILINE)
+    if not m:
+        return None
+    start = m.end() + 1 if m.end() < len(text) else m.end()
+    nxt = re.search(r"^## ", text[start:], re.MULTILINE)
+    return start, start + nxt.start() if nxt else len(text)
+
+
+def _replace_block(text: str, block: Tuple[str, str], body: str) -> Optional[str]:
+    begin, end = block
+    i = text.find(begin)
+    j = text.find(end, i + len(begin)) if i >= 0 else -1
+    if i < 0 or j < 0:
+        return None
+    return f"{text[:i + len(begin)]}\n{body}{text[j:]}"
+
+
+def article_list(topic_dir: Path, section: str, articles: Dict[Path, Article]) -> str:
+    """Новое тело раздела «Статьи»: ручной текст раздела + отсортированный список ссылок."""
+    entries: Dict[str, str] = {}
+    notes: List[str] = []
+    for line in section.splitlines():
+        m = ARTICLE_LINK.match(line)
+        if m:
+            if (topic_dir / m["folder"] / "README.md").exists():
+                entries[m["folder"]] = m["title"]
+        elif line.strip():
+            notes.append(line)
+
+    for path, article in articles.items():
+        if path.parent.parent == topic_dir and article.topic == topic_dir.name:
+            entries[path.parent.name] = article.title
+    for folder in entries:
+        article = articles.get(topic_dir / folder / "README.md")
+        if article is not None and article.front_matter.get("title"):
+            entries[folder] = article.title
+
+    lines = [""] + notes + ([""] if notes else [])
+    lines += [
+        f"- [{title}](./{folder}/README.md)"
+        for folder, title in sorted(entries.items(), key=lambda item: _sort_key(item[1], item[0]))
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def build_topic_readme(topic_readme: Path, text: str, articles: Dict[Path, Article]) -> str:
+    bounds = _section_bounds(text, ARTICLES_HEADING)
+    if bounds is None:
+        return text
+    start, end = bounds
+    body = article_list(topic_readme.parent, text[start:end], articles)
+    if end < len(text):
+        body += "\n"
+    new_text = text[:start] + body + text[end:]
+    if new_text != text:
+        new_text = UPDATED_LINE.sub(lambda m: f"{m[1]}{m[2]}{date.today().isoformat()}{m[2]}", new_text, count=1)
+    return new_text
+
+
+def topics_block(root: Path, articles: Dict[Path, Article]) -> str:
+    """Список разделов kb/ru с числом статей в каждом."""
+    rows = []
+    for topic_dir in sorted(p for p in root.iterdir() if p.is_dir()):
+        readme, index = topic_dir / "README.md", topic_dir / "INDEX.md"
+        if readme in articles:
+            link, title = readme, articles[readme].title
+        elif index.exists():
+            first = index.read_text(encoding="utf-8").split("\n", 1)[0]
+            link, title = index, first.lstrip("# ").split(": ", 1)[-1] or topic_dir.name
+        else:
+            continue
+        count = sum(1 for p in articles if topic_dir in p.parents and p != readme)
+        rows.append((title, topic_dir.name, link, count))
+    rows.sort(key=lambda row: _sort_key(row[0], row[1]))
+    return "".join(
+        f"- [{title}](./{link.relative_to(root).as_posix()}) — {count} {_plural(count, 'статья', 'статьи', 'статей')}\n"
+        for title, _name, link, count in rows
+    )
+
+
+def cards_block(cards_dir: Path, articles: Dict[Path, Article]) -> Tuple[str, int]:
+    """Карточки подшипников по сериям, внутри серии — по d и обозначению."""
+    by_series: Dict[str, List[Tuple[float, str, str, str]]] = {}
+    for path, article in articles.items():
+        if path.parent.parent != cards_dir:
+            continue
+        fm = article.front_matter
+        series = next((t for t in fm.get("tags") or [] if SERIES_TAG.match(str(t))), "")
+        designation, _, kind = article.title.partition(" — ")
+        kind = kind.removeprefix("подшипник ")
+        dims = fm.get("dims") if isinstance(fm.get("dims"), dict) else {}
+        d = dims.get("d")
+        note = f"{kind} d={d}мм" if d is not None else kind
+        by_series.setdefault(series, []).append((float(d or 0), designation, path.parent.name, note))
+
+    order = list(CARD_SERIES) + sorted(s for s in by_series if s not in CARD_SERIES)
+    parts = []
+    for series in order:
+        if series not in by_series:
+            continue
+        heading = CARD_SERIES.get(series) or (f"Серия {series}" if series else "Прочие")
+        lines = [f"### {heading}"] + [
+            f"- [{designation}](./cards/{folder}/README.md) — {note}"
+            for _d, designation, folder, note in sorted(by_series[series])
+        ]
+        parts.append("\n".join(lines) + "\n")
+    return "\n".join(parts), sum(len(v) for v in by_series.values())
+
+
+def build_indexes(root: Path = KB_ROOT) -> Dict[Path, str]:
+    """Новое содержимое всех индексов: {путь: текст} только для изменившихся файлов."""
+    articles = scan_articles(root)
+    changed: Dict[Path, str] = {}
+
+    for topic_readme in sorted(root.glob("*/README.md")):
+        text = topic_readme.read_text(encoding="utf-8")
+        new_text = build_topic_readme(topic_readme, text, articles)
+        if new_text != text:
+            changed[topic_readme] = new_text
+
+    root_index = root / ROOT_INDEX.relative_to(KB_ROOT)
+    if root_index.exists():
+        text = root_index.read_text(encoding="utf-8")
+        new_text = _replace_block(text, TOPICS_BLOCK, topics_block(root, articles))
+        if new_text is not None and new_text != text:
+            changed[root_index] = new_text
+
+    bearings_index = root / BEARINGS_INDEX.relative_to(KB_ROOT)
+    cards_dir = root / CARDS_DIR.relative_to(KB_ROOT)
+    if bearings_index.exists():
+        text = bearings_index.read_text(encoding="utf-8")
+        body, count = cards_block(cards_dir, articles)
+        new_text = _replace_block(text, CARDS_BLOCK, body)
+        if new_text is not None:
+            new_text = CARD_COUNT.sub(lambda m: f"{m[1]}{count}", new_text)
+            if new_text != text:
+                changed[bearings_index] = new_text
+    return changed
+
+
+def rebuild_indexes(root: Path = KB_ROOT, dry_run: bool = False) -> List[Path]:
+    """Пересобирает индексы и записывает изменившиеся файлы; возвращает их список."""
+    changed = build_indexes(root)
+    if not dry_run:
+        for path, text in changed.items():
+            atomic_write_text(path, text)
+    return sorted(changed)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Пересборка разделов «Статьи» и индексов базы знаний.")
+    parser.add_argument("--root", type=Path, default=KB_ROOT, help=f"Корень базы знаний (по умолчанию {KB_ROOT})")
+    parser.add_argument("--dry-run", action="store_true", help="Показать изменившиеся файлы, не записывая их")
+    parser.add_argument("--check", action="store_true", help="Только проверить: код 1, если индексы устарели")
+    args = parser.parse_args()
+
+    if not args.root.is_dir():
+        print(f"ERROR: {args.root} is not a directory", file=sys.stderr)
+        return 2
+    changed = rebuild_indexes(args.root, dry_run=args.dry_run or args.check)
+    for path in changed:
+        print(f"  [{'STALE' if args.check else 'DRY-RUN' if args.dry_run else 'UPDATED'}] {path}")
+    print(f"{len(changed)} index file(s) {'out of date' if args.check else 'changed'}")
+    return 1 if args.check and changed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
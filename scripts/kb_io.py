@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Атомарная запись файлов для скриптов базы знаний.
+
+Файл пишется во временный `.<имя>.*.tmp` в той же папке и подменяет
+целевой через os.replace: читатель видит либо старую версию, либо новую
+целиком, а прерванный запуск не оставляет обрезанного файла.
+
+- права существующего файла сохраняются, новый файл получает 0o644;
+- текст пишется в UTF-8 с `newline=""`: переводы строк не преобразуются,
+  в файл попадает ровно то, что передал вызывающий (завершающий `\\n`
+  добавляет он сам);
+- недостающие родительские папки создаются.
+"""
+from __future__ import annotations
+
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator
+
+DEFAULT_MODE = 0o644
+
+
+@contextmanager
+def atomic_path(path: Path) -> Iterator[Path]:
+    """
+    Временный путь рядом с path для записи любым способом (например, sqlite3.connect).
+
+    После выхода из блока без ошибок файл получает права и заменяет path;
+    при ошибке временный файл удаляется.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    mode = path.stat().st_mode & 0o777 if path.exists() else DEFAULT_MODE
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    os.close(fd)
+    tmp = Path(tmp_name)
+    try:
+        yield tmp
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+@contextmanager
+def atomic_open(path: Path, binary: bool = False) -> Iterator[IO]:
+    """Файл для потоковой записи вместо path: текст UTF-8 без перевода строк или байты (binary=True)."""
+    with atomic_path(path) as tmp:
+        if binary:
+            with open(tmp, "wb") as f:
+                yield f
+        else:
+            with open(tmp, "w", encoding="utf-8", newline="") as f:
+                yield f
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    """Атомарно записывает текст в path."""
+    with atomic_open(path) as f:
+        f.write(text)
@@ -1,18 +1,26 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import argparse
+import hashlib
+import json
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Any, Dict, List, Tuple
+
+from kb_frontmatter import split_front_matter
+from kb_io import atomic_open
 
 KB_ROOT = Path("kb")
 TEMPLATE = Path("_templates/article.md")
+CACHE_PATH = Path("_meta/quality_gate_cache.json")
+# Bump when validation rules change so stale verdicts are discarded.
+CACHE_VERSION = 5
 
 ALLOWED_STATUS = {"draft", "verified", "deprecated"}
 
-YAML_START = re.compile(r"^---\s*$")
-YAML_KV = re.compile(r"^([A-Za-z0-9_]+)\s*:\s*(.*)\s*$")
 ASCII_KEBAB = re.compile(r"^[a-z0-9]+(?:-[a-z0-9]+)*$")
 
 REQUIRED_KEYS = ["id", "title", "topic", "tags", "status", "source", "created", "updated"]
@@ -27,28 +35,11 @@ def warn(msg: str) -> None:
     print(f"WARN: {msg}")
 
 
-def parse_front_matter(text: str) -> Tuple[Dict[str, str], str]:
-    lines = text.splitlines()
-    if not lines or not YAML_START.match(lines[0]):
-        return {}, text
-
-    end = None
-    for i in range(1, min(len(lines), 200)):
-        if YAML_START.match(lines[i]):
-            end = i
-            break
-    if end is None:
-        return {}, text
-
-    fm_lines = lines[1:end]
-    body = "\n".join(lines[end + 1:]).lstrip("\n")
-
-    fm: Dict[str, str] = {}
-    for ln in fm_lines:
-        m = YAML_KV.match(ln)
-        if m:
-            fm[m.group(1)] = m.group(2).strip()
-    return fm, body
+def fm_str(value: Any) -> str:
+    """Front-matter scalar as a stripped string (typed values are stringified)."""
+    if value is None:
+        return ""
+    return str(value).strip().strip('"').strip("'")
 
 
 def collect_readmes() -> List[Path]:
@@ -57,60 +48,192 @@ def collect_readmes() -> List[Path]:
     return [p for p in KB_ROOT.rglob("README.md") if p.is_file()]
 
 
+def violation(p: Path, rule: str, message: str) -> Dict[str, str]:
+    return {"path": p.as_posix(), "rule": rule, "message": message}
+
+
+def path_violations(p: Path) -> List[Dict[str, str]]:
+    parts = p.parts
+    try:
+        kb_i = parts.index("kb")
+    except ValueError:
+        return []
+
+    folders = parts[kb_i + 1:-1]
+    for seg in folders:
+        if " " in seg:
+            return [violation(p, "path-space", f"Space in path: {p}")]
+    if not folders:
+        return []
+    # ASCII and kebab-case are checked on the article folder (last segment) only
+    seg = folders[-1]
+    try:
+        seg.encode("ascii")
+    except UnicodeEncodeError:
+        return [violation(p, "path-ascii", f"Non-ASCII folder in path: {p} (segment: {seg})")]
+    if not ASCII_KEBAB.match(seg):
+        return [violation(p, "path-kebab", f"Folder must be ASCII kebab-case: {p} (segment: {seg})")]
+    return []
+
+
 def validate_paths(files: List[Path]) -> None:
     for p in files:
-        parts = p.parts
-        try:
-            kb_i = parts.index("kb")
-        except ValueError:
-            continue
-
-        for seg in parts[kb_i + 1:-1]:
-            if " " in seg:
-                die(f"Space in path: {p}")
-        try:
-            seg.encode("ascii")
-        except UnicodeEncodeError:
-            die(f"Non-ASCII folder in path: {p} (segment: {seg})")
-        if not ASCII_KEBAB.match(seg):
-            die(f"Folder must be ASCII kebab-case: {p} (segment: {seg})")
-
-
-def validate_readme(p: Path, ids: Dict[str, Path]) -> None:
-    text = p.read_text(encoding="utf-8", errors="replace")
-    fm, body = parse_front_matter(text)
+        for v in path_violations(p):
+            die(v["message"])
+
+
+def check_readme(p: Path, text: str) -> Tuple[Dict[str, Any], List[Dict[str, str]]]:
+    """Per-file checks. Returns front-matter and violations (cross-file checks excluded)."""
+    fm, body = split_front_matter(text)
 
     if not fm:
-        die(f"Missing YAML front-matter: {p}")
+        return fm, [violation(p, "front-matter", f"Missing YAML front-matter: {p}")]
 
     missing = [k for k in REQUIRED_KEYS if k not in fm]
     if missing:
-        die(f"Missing keys {missing} in front-matter: {p}")
+        return fm, [violation(p, "required-keys", f"Missing keys {missing} in front-matter: {p}")]
 
-    status = fm["status"].strip().strip('"').strip("'")
+    errors: List[Dict[str, str]] = []
+    status = fm_str(fm["status"])
     if status not in ALLOWED_STATUS:
-        die(f"Invalid status '{status}' in {p}. Allowed: {sorted(ALLOWED_STATUS)}")
+        errors.append(violation(
+            p, "status", f"Invalid status '{status}' in {p}. Allowed: {sorted(ALLOWED_STATUS)}"
+        ))
 
-    _id = fm["id"].strip().strip('"').strip("'")
+    _id = fm_str(fm["id"])
     if not _id:
-        die(f"Empty id in {p}")
-    if _id in ids and ids[_id] != p:
-        die(f"Duplicate id '{_id}' in {p} and {ids[_id]}")
-    ids[_id] = p
+        errors.append(violation(p, "empty-id", f"Empty id in {p}"))
 
-    topic = fm["topic"].strip().strip('"').strip("'")
+    topic = fm_str(fm["topic"])
     if topic and topic != "[[TBD]]" and not ASCII_KEBAB.match(topic):
-        die(f"topic must be kebab-case ASCII: '{topic}' in {p}")
+        errors.append(violation(p, "topic-kebab", f"topic must be kebab-case ASCII: '{topic}' in {p}"))
 
     if status == "verified":
         if "[[TBD]]" in text or "[[TBD]]" in body:
-            die(f"Verified article contains [[TBD]]: {p}")
+            errors.append(violation(p, "verified-tbd", f"Verified article contains [[TBD]]: {p}"))
 
+    return fm, errors
 
-def validate_required_files() -> None:
+
+def article_id(fm: Dict[str, Any]) -> str:
+    return fm_str(fm.get("id"))
+
+
+def register_id(p: Path, _id: str, ids: Dict[str, Path]) -> None:
+    if _id in ids and ids[_id] != p:
+        die(f"Duplicate id '{_id}' in {p} and {ids[_id]}")
+    ids[_id] = p
+
+
+def load_cache() -> Dict[str, Any]:
+    if not CACHE_PATH.exists():
+        return {}
+    try:
+        data = json.loads(CACHE_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != CACHE_VERSION:
+        return {}
+    return data.get("entries", {})
+
+
+def write_json_atomic(path: Path, data: Any, indent: int | None = None) -> None:
+    with atomic_open(path) as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent)
+
+
+def save_cache(entries: Dict[str, Any]) -> None:
+    write_json_atomic(CACHE_PATH, {"version": CACHE_VERSION, "entries": entries})
+
+
+def check_file(p: Path, cache: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the cache entry for p, re-validating only if its content changed.
+
+    A matching (mtime_ns, size) pair trusts the cached content hash without
+    reading the file; otherwise the file is read and its sha256 compared.
+    """
+    key = p.as_posix()
+    st = p.stat()
+    entry = cache.get(key)
+    if entry and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+        return entry
+
+    raw = p.read_bytes()
+    digest = hashlib.sha256(raw).hexdigest()
+    if entry and entry["sha256"] == digest:
+        return {**entry, "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+
+    fm, errors = check_readme(p, raw.decode("utf-8", errors="replace"))
+    return {
+        "sha256": digest,
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "front_matter": fm,
+        "errors": errors,
+    }
+
+
+def check_chunk(
+    paths: List[Path], cache: Dict[str, Any]
+) -> Tuple[Dict[str, Any], Dict[str, List[str]]]:
+    """Worker: validate a chunk of files, returning cache entries and the chunk's id -> paths map."""
+    entries: Dict[str, Any] = {}
+    ids: Dict[str, List[str]] = {}
+    for p in paths:
+        entry = check_file(p, cache)
+        entries[p.as_posix()] = entry
+        _id = article_id(entry["front_matter"])
+        if _id:
+            ids.setdefault(_id, []).append(p.as_posix())
+    return entries, ids
+
+
+def check_files(
+    readmes: List[Path], cache: Dict[str, Any], jobs: int
+) -> Tuple[Dict[str, Any], Dict[str, List[str]]]:
+    """Validate all files (in a process pool if jobs > 1) and merge per-worker id maps."""
+    if jobs <= 1:
+        return check_chunk(readmes, cache)
+
+    chunk_size = max(1, -(-len(readmes) // (jobs * 4)))
+    chunks = [readmes[i:i + chunk_size] for i in range(0, len(readmes), chunk_size)]
+    entries: Dict[str, Any] = {}
+    ids: Dict[str, List[str]] = {}
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [
+            pool.submit(check_chunk, chunk, {k: cache[k] for k in map(Path.as_posix, chunk) if k in cache})
+            for chunk in chunks
+        ]
+        # Chunks are contiguous and merged in submission order, so each id's
+        # path list keeps the original file order.
+        for future in futures:
+            chunk_entries, chunk_ids = future.result()
+            entries.update(chunk_entries)
+            for _id, paths in chunk_ids.items():
+                ids.setdefault(_id, []).extend(paths)
+    return entries, ids
+
+
+def duplicate_id_violations(ids: Dict[str, List[str]]) -> List[Dict[str, str]]:
+    result = []
+    for _id, paths in ids.items():
+        for dup in paths[1:]:
+            result.append(violation(
+                Path(dup), "duplicate-id", f"Duplicate id '{_id}' in {dup} and {paths[0]}"
+            ))
+    return result
+
+
+def required_file_violations() -> List[Dict[str, str]]:
     idx = Path("kb/ru/INDEX.md")
     if not idx.exists():
-        die("Missing kb/ru/INDEX.md")
+        return [violation(idx, "required-file", "Missing kb/ru/INDEX.md")]
+    return []
+
+
+def validate_required_files() -> None:
+    for v in required_file_violations():
+        die(v["message"])
     inbox = Path("inbox/README.md")
     if not inbox.exists():
         warn("Missing inbox/README.md (recommended)")
@@ -118,15 +241,87 @@ def validate_required_files() -> None:
         warn("Missing _templates/article.md")
 
 
-def main() -> None:
-    validate_required_files()
+def write_report(path: Path, readmes: List[Path], violations: List[Dict[str, str]]) -> None:
+    by_rule: Dict[str, int] = {}
+    for v in violations:
+        by_rule[v["rule"]] = by_rule.get(v["rule"], 0) + 1
+    write_json_atomic(path, {
+        "summary": {
+            "files": len(readmes),
+            "violations": len(violations),
+            "files_with_violations": len({v["path"] for v in violations}),
+            "by_rule": dict(sorted(by_rule.items())),
+        },
+        "violations": violations,
+    }, indent=2)
+
 
-    readmes = collect_readmes()
-    validate_paths(readmes)
+def main() -> None:
+    parser = argparse.ArgumentParser(description="KB quality gate")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Re-validate every file and do not read/write {CACHE_PATH}",
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Collect every violation instead of stopping at the first one",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Validate files in a pool of N processes",
+    )
+    parser.add_argument(
+        "--report",
+        type=Path,
+        help="Write a JSON report of all violations to this path (implies --all)",
+    )
+    args = parser.parse_args()
+    collect_all = args.all or args.report is not None
+
+    if collect_all:
+        violations = required_file_violations()
+    else:
+        validate_required_files()
+
+    readmes = sorted(collect_readmes())
+    if collect_all:
+        for p in readmes:
+            violations.extend(path_violations(p))
+    else:
+        validate_paths(readmes)
+
+    cache = {} if args.no_cache else load_cache()
+    entries, ids = check_files(readmes, cache, args.jobs)
+    if not args.no_cache and entries != cache:
+        save_cache(entries)
+
+    if not collect_all:
+        seen: Dict[str, Path] = {}
+        for p in readmes:
+            entry = entries[p.as_posix()]
+            if entry["errors"]:
+                die(entry["errors"][0]["message"])
+            register_id(p, article_id(entry["front_matter"]), seen)
+        print(f"OK: validated {len(readmes)} README.md files in kb/. Unique ids: {len(seen)}")
+        return
 
-    ids: Dict[str, Path] = {}
     for p in readmes:
-        validate_readme(p, ids)
+        violations.extend(entries[p.as_posix()]["errors"])
+    violations.extend(duplicate_id_violations(ids))
+
+    if args.report:
+        write_report(args.report, readmes, violations)
+
+    if violations:
+        for v in violations:
+            print(f"ERROR [{v['rule']}]: {v['message']}")
+        n_files = len({v["path"] for v in violations})
+        print(f"FAILED: {len(violations)} violation(s) in {n_files} file(s) out of {len(readmes)} README.md files")
+        sys.exit(1)
 
     print(f"OK: validated {len(readmes)} README.md files in kb/. Unique ids: {len(ids)}")
 
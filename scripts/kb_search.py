@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+Полнотекстовый поиск по базе знаний kb/ru.
+
+Строит на диске инвертированный индекс (SQLite: постинги с позициями слов)
+по всем README.md в kb/ru и ранжирует результаты по BM25. Слова приводятся
+к основе лёгким стеммером для русского языка (Snowball), поэтому
+«подшипника» и «подшипники» совпадают. Фраза в кавычках ищется по позициям.
+
+Переиндексируются только изменившиеся файлы (mtime/размер, затем SHA256).
+Пустой индекс — новый или сброшенный после смены INDEX_VERSION — строится
+перед поиском автоматически.
+
+Использование:
+    python scripts/kb_search.py index [--full]
+    python scripts/kb_search.py search "радиальный зазор" [-k 10] [--refresh]
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import heapq
+import math
+import re
+import sqlite3
+import sys
+from array import array
+from collections import defaultdict
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from kb_frontmatter import split_front_matter
+
+KB_ROOT = Path("kb/ru")
+INDEX_PATH = Path("_meta/search_index.sqlite")
+# Увеличивать при изменении токенизации/стемминга: индекс будет перестроен
+INDEX_VERSION = 1
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+TOKEN = re.compile(r"\w+")
+PHRASE = re.compile(r'"([^"]+)"')
+
+# ---------------------------------------------------------------------------
+# Стеммер (Snowball Russian)
+# ---------------------------------------------------------------------------
+
+VOWELS = set("аеиоуыэюя")
+
+PERFECTIVE_GERUND_1 = ("вшись", "вши", "в")  # после а/я
+PERFECTIVE_GERUND_2 = ("ившись", "ывшись", "ивши", "ывши", "ив", "ыв")
+REFLEXIVE = ("ся", "сь")
+ADJECTIVE = (
+    "ими", "ыми", "его", "ого", "ему", "ому", "ее", "ие", "ые", "ое", "ей", "ий",
+    "ый", "ой", "ем", "им", "ым", "ом", "их", "ых", "ую", "юю", "ая", "яя", "ою", "ею",
+)
+PARTICIPLE_1 = ("ем", "нн", "вш", "ющ", "щ")  # после а/я
+PARTICIPLE_2 = ("ивш", "ывш", "ующ")
+VERB_1 = (  # после а/я
+    "ете", "йте", "ешь", "нно", "ла", "на", "ли", "ем", "ло", "но", "ет", "ют", "ны", "ть", "й", "л", "н",
+)
+VERB_2 = (
+    "ейте", "уйте", "ила", "ыла", "ена", "ите", "или", "ыли", "ило", "ыло", "ено", "ует", "уют",
+    "ены", "ить", "ыть", "ишь", "ей", "уй", "ил", "ыл", "им", "ым", "ен", "ят", "ит", "ыт", "ую", "ю",
+)
+NOUN = (
+    "иями", "ями", "ами", "ией", "иям", "ием", "иях", "ев", "ов", "ие", "ье", "еи", "ии", "ей", "ой",
+    "ий", "ям", "ем", "ам", "ом", "ах", "ях", "ию", "ью", "ия", "ья", "а", "е", "и", "й", "о", "у",
+    "ы", "ь", "ю", "я",
+)
+SUPERLATIVE = ("ейше", "ейш")
+DERIVATIONAL = ("ость", "ост")
+
+
+def _regions(word: str) -> Tuple[int, int]:
+    """Возвращает начала областей RV и R2."""
+    rv = len(word)
+    for i, ch in enumerate(word):
+        if ch in VOWELS:
+            rv = i + 1
+            break
+
+    def next_region(start: int) -> int:
+        for i in range(start + 1, len(word)):
+            if word[i] not in VOWELS and word[i - 1] in VOWELS:
+                return i + 1
+        return len(word)
+
+    r1 = next_region(0)
+    return rv, next_region(r1)
+
+
+def _strip(word: str, start: int, endings: Iterable[str], after_a: bool = False) -> Optional[str]:
+    """Отрезает самое длинное окончание в области [start:]; для after_a — только после а/я."""
+    for ending in sorted(endings, key=len, reverse=True):
+        if word.endswith(ending) and len(word) - len(ending) >= start:
+            if after_a:
+                pos = len(word) - len(ending) - 1
+                if pos < start or word[pos] not in "ая":
+                    continue
+            return word[: len(word) - len(ending)]
+    return None
+
+
+def _strip_any(word: str, start: int, group_1: Iterable[str], group_2: Iterable[str]) -> Optional[str]:
+    """Отрезает окончание из группы 1 (после а/я) или группы 2, выбирая самое длинное."""
+    candidates = [
+        r for r in (_strip(word, start, group_1, after_a=True), _strip(word, start, group_2))
+        if r is not None
+    ]
+    return min(candidates, key=len) if candidates else None
+
+
+@lru_cache(maxsize=65536)
+def stem(word: str) -> str:
+    """Приводит русское слово к основе; латиница и числа возвращаются как есть."""
+    word = word.lower().replace("ё", "е")
+    if not any(ch in VOWELS for ch in word):
+        return word
+    rv, r2 = _regions(word)
+
+    # Шаг 1
+    result = _strip_any(word, rv, PERFECTIVE_GERUND_1, PERFECTIVE_GERUND_2)
+    if result is not None:
+        word = result
+    else:
+        word = _strip(word, rv, REFLEXIVE) or word
+        adjective = _strip(word, rv, ADJECTIVE)
+        if adjective is not None:
+            word = _strip_any(adjective, rv, PARTICIPLE_1, PARTICIPLE_2) or adjective
+        else:
+            result = _strip_any(word, rv, VERB_1, VERB_2)
+            if result is None:
+                result = _strip(word, rv, NOUN)
+            if result is not None:
+                word = result
+
+    # Шаг 2
+    if word.endswith("и") and len(word) - 1 >= rv:
+        word = word[:-1]
+
+    # Шаг 3
+    word = _strip(word, r2, DERIVATIONAL) or word
+
+    # Шаг 4
+    result = _strip(word, rv, SUPERLATIVE)
+    if result is not None:
+        word = result
+    if word.endswith("нн") and len(word) - 1 >= rv:
+        word = word[:-1]
+    elif word.endswith("ь") and len(word) - 1 >= rv:
+        word = word[:-1]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Разбивает текст на основы слов (с повторами, в порядке следования)."""
+    return [stem(tok) for tok in TOKEN.findall(text.lower())]
+
+
+# ---------------------------------------------------------------------------
+# Индекс
+# ---------------------------------------------------------------------------
+
+
+def open_index(path: Path = INDEX_PATH) -> sqlite3.Connection:
+    """Открывает (и при необходимости создаёт или пересоздаёт) индекс."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version != INDEX_VERSION:
+        conn.executescript(
+            """
+            DROP TABLE IF EXISTS postings;
+            DROP TABLE IF EXISTS docs;
+            """
+        )
+    conn.executescript(
+        f"""
+        PRAGMA user_version = {INDEX_VERSION};
+        CREATE TABLE IF NOT EXISTS docs (
+            doc_id INTEGER PRIMARY KEY,
+            path TEXT UNIQUE NOT NULL,
+            title TEXT NOT NULL,
+            length INTEGER NOT NULL,
+            sha256 TEXT NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            size INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS postings (
+            term TEXT NOT NULL,
+            doc_id INTEGER NOT NULL,
+            tf INTEGER NOT NULL,
+            positions BLOB NOT NULL,
+            PRIMARY KEY (term, doc_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id);
+        """
+    )
+    return conn
+
+
+def document_text(raw: str) -> Tuple[str, str]:
+    """Возвращает (заголовок, индексируемый текст) статьи."""
+    fm, body = split_front_matter(raw)
+    title = str(fm.get("title") or "").strip()
+    if not title:
+        for line in body.splitlines():
+            if line.startswith("# "):
+                title = line[2:].strip()
+                break
+    return title, f"{title}\n{body}"
+
+
+def _index_document(conn: sqlite3.Connection, doc_id: int, text: str) -> int:
+    positions: Dict[str, array] = defaultdict(lambda: array("I"))
+    tokens = tokenize(text)
+    for pos, term in enumerate(tokens):
+        positions[term].append(pos)
+    conn.executemany(
+        "INSERT INTO postings (term, doc_id, tf, positions) VALUES (?, ?, ?, ?)",
+        ((term, doc_id, len(pos), pos.tobytes()) for term, pos in positions.items()),
+    )
+    return len(tokens)
+
+
+def update_index(conn: sqlite3.Connection, root: Path = KB_ROOT, full: bool = False) -> Tuple[int, int, int]:
+    """
+    Синхронизирует индекс с файлами в root.
+
+    Returns:
+        (добавлено/обновлено, удалено, без изменений)
+    """
+    if full:
+        conn.execute("DELETE FROM postings")
+        conn.execute("DELETE FROM docs")
+
+    known = {
+        path: (doc_id, sha256, mtime_ns, size)
+        for doc_id, path, sha256, mtime_ns, size in conn.execute(
+            "SELECT doc_id, path, sha256, mtime_ns, size FROM docs"
+        )
+    }
+    updated = unchanged = 0
+    seen = set()
+
+    with conn:
+        for p in sorted(root.rglob("README.md")):
+            key = p.as_posix()
+            seen.add(key)
+            st = p.stat()
+            old = known.get(key)
+            if old and old[2] == st.st_mtime_ns and old[3] == st.st_size:
+                unchanged += 1
+                continue
+
+            raw = p.read_bytes()
+            digest = hashlib.sha256(raw).hexdigest()
+            if old and old[1] == digest:
+                conn.execute(
+                    "UPDATE docs SET mtime_ns = ?, size = ? WHERE doc_id = ?",
+                    (st.st_mtime_ns, st.st_size, old[0]),
+                )
+                unchanged += 1
+                continue
+
+            if old:
+                conn.execute("DELETE FROM postings WHERE doc_id = ?", (old[0],))
+                conn.execute("DELETE FROM docs WHERE doc_id = ?", (old[0],))
+            title, text = document_text(raw.decode("utf-8", errors="replace"))
+            cur = conn.execute(
+                "INSERT INTO docs (path, title, length, sha256, mtime_ns, size) VALUES (?, ?, 0, ?, ?, ?)",
+                (key, title, digest, st.st_mtime_ns, st.st_size),
+            )
+            doc_id = cur.lastrowid
+            length = _index_document(conn, doc_id, text)
+            conn.execute("UPDATE docs SET length = ? WHERE doc_id = ?", (length, doc_id))
+            updated += 1
+
+        removed = [known[path][0] for path in known.keys() - seen]
+        for doc_id in removed:
+            conn.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+            conn.execute("DELETE FROM docs WHERE doc_id = ?", (doc_id,))
+
+    return updated, len(removed), unchanged
+
+
+# ---------------------------------------------------------------------------
+# Поиск
+# ---------------------------------------------------------------------------
+
+
+def _phrase_docs(conn: sqlite3.Connection, terms: List[str]) -> set:
+    """Документы, где terms встречаются подряд."""
+    per_term: List[Dict[int, array]] = []
+    for term in terms:
+        rows = conn.execute("SELECT doc_id, positions FROM postings WHERE term = ?", (term,))
+        postings = {}
+        for doc_id, blob in rows:
+            pos = array("I")
+            pos.frombytes(blob)
+            postings[doc_id] = pos
+        per_term.append(postings)
+
+    if not per_term:
+        return set()
+    candidates = set(per_term[0])
+    for postings in per_term[1:]:
+        candidates &= postings.keys()
+
+    result = set()
+    for doc_id in candidates:
+        starts = set(per_term[0][doc_id])
+        for offset, postings in enumerate(per_term[1:], 1):
+            starts &= {p - offset for p in postings[doc_id]}
+            if not starts:
+                break
+        if starts:
+            result.add(doc_id)
+    return result
+
+
+def search(conn: sqlite3.Connection, query: str, limit: int = 10) -> List[Tuple[float, str, str]]:
+    """
+    Ищет по индексу. Фразы в кавычках должны встречаться подряд.
+
+    Returns:
+        Список (score, path, title), по убыванию score.
+    """
+    phrases = [tokenize(ph) for ph in PHRASE.findall(query)]
+    terms = list(dict.fromkeys(tokenize(PHRASE.sub(" ", query)) + [t for ph in phrases for t in ph]))
+    if not terms:
+        return []
+
+    n_docs, total_len = conn.execute("SELECT COUNT(*), COALESCE(SUM(length), 0) FROM docs").fetchone()
+    if not n_docs:
+        return []
+    avgdl = total_len / n_docs or 1.0
+
+    allowed: Optional[set] = None
+    for ph in phrases:
+        if len(ph) > 1:
+            docs = _phrase_docs(conn, ph)
+            allowed = docs if allowed is None else allowed & docs
+
+    scores: Dict[int, float] = defaultdict(float)
+    for term in terms:
+        rows = conn.execute(
+            "SELECT p.doc_id, p.tf, d.length FROM postings p JOIN docs d USING (doc_id) WHERE p.term = ?",
+            (term,),
+        ).fetchall()
+        if not rows:
+            continue
+        idf = math.log(1 + (n_docs - len(rows) + 0.5) / (len(rows) + 0.5))
+        for doc_id, tf, length in rows:
+            if allowed is not None and doc_id not in allowed:
+                continue
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avgdl)
+            scores[doc_id] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+    top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+    results = []
+    for doc_id, score in top:
+        path, title = conn.execute("SELECT path, title FROM docs WHERE doc_id = ?", (doc_id,)).fetchone()
+        results.append((score, path, title))
+    return results
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Полнотекстовый поиск по kb/ru")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_index = sub.add_parser("index", help="Обновить индекс (только изменившиеся файлы)")
+    p_index.add_argument("--full", action="store_true", help="Перестроить индекс целиком")
+
+    p_search = sub.add_parser("search", help="Искать по индексу")
+    p_search.add_argument("query", help='Запрос; фраза в кавычках ищется целиком: \'"радиальный зазор"\'')
+    p_search.add_argument("-k", "--limit", type=int, default=10, help="Число результатов")
+    p_search.add_argument("--refresh", action="store_true", help="Перед поиском обновить индекс")
+
+    args = parser.parse_args()
+    conn = open_index()
+
+    if args.command == "index":
+        updated, removed, unchanged = update_index(conn, full=args.full)
+        print(f"OK: indexed {updated}, removed {removed}, unchanged {unchanged}")
+        return 0
+
+    empty = conn.execute("SELECT 1 FROM docs LIMIT 1").fetchone() is None
+    if args.refresh or empty:
+        update_index(conn)
+    results = search(conn, args.query, args.limit)
+    if not results:
+        print("Ничего не найдено")
+        return 1
+    for score, path, title in results:
+        print(f"{score:7.3f}  {path}  {title}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
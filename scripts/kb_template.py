@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Минимальный компилируемый шаблонизатор для генераторов базы знаний.
+
+Шаблон — обычный текст с подстановками `{{name}}`. При компиляции
+подстановки, для которых передан статический текст (partial), встраиваются
+сразу (рекурсивно: partial тоже может содержать `{{name}}`), а остальные
+становятся полями, которые заполняются при каждом рендере:
+
+    tpl = compile_template("# {{title}}\\n{{body}}", {"body": "Серия {{series}}"})
+    tpl.render({"title": "6205", "series": "62xx"})
+
+Скомпилированный шаблон — чередование готовых литералов и имён полей,
+а рендер — один `"".join(...)` в функции, сгенерированной при компиляции.
+Одинарные фигурные скобки (`{d: 25}` во front-matter) выводятся как есть.
+"""
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Mapping, Optional, Tuple
+
+PLACEHOLDER = re.compile(r"\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}")
+
+
+class Template:
+    """Скомпилированный шаблон: literals[0] field[0] literals[1] ... literals[-1]."""
+
+    __slots__ = ("literals", "fields", "render")
+
+    def __init__(self, literals: Tuple[str, ...], fields: Tuple[str, ...]) -> None:
+        assert len(literals) == len(fields) + 1
+        self.literals = literals
+        self.fields = fields
+        # Рендер — сгенерированная функция с литералами-константами: один
+        # "".join без цикла и разбора шаблона на каждый вызов.
+        parts = [repr(literals[0])]
+        for name, literal in zip(fields, literals[1:]):
+            parts.append(f"str(v[{name!r}])")
+            parts.append(repr(literal))
+        self.render = eval(f"lambda v: ''.join(({', '.join(parts)},))", {"__builtins__": {"str": str}})
+        self.render.__doc__ = "Подставляет значения полей (как str()); отсутствующее поле — KeyError."
+
+
+def _expand(text: str, partials: Mapping[str, str], stack: Tuple[str, ...], literals: List[str], fields: List[str]) -> None:
+    pos = 0
+    for m in PLACEHOLDER.finditer(text):
+        literals[-1] += text[pos : m.start()]
+        name = m.group(1)
+        if name in partials:
+            if name in stack:
+                raise ValueError(f"recursive partial: {' -> '.join(stack + (name,))}")
+            _expand(partials[name], partials, stack + (name,), literals, fields)
+        else:
+            fields.append(name)
+            literals.append("")
+        pos = m.end()
+    literals[-1] += text[pos:]
+
+
+def compile_template(text: str, partials: Optional[Mapping[str, str]] = None) -> Template:
+    """Компилирует шаблон, встраивая partials; прочие `{{name}}` становятся полями."""
+    literals: List[str] = [""]
+    fields: List[str] = []
+    _expand(text, partials or {}, (), literals, fields)
+    return Template(tuple(literals), tuple(fields))
+
+
+@lru_cache(maxsize=None)
+def load_template(path: Path) -> str:
+    """Читает файл шаблона один раз за процесс."""
+    return path.read_text(encoding="utf-8")
+
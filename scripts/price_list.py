@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""
+Прайс-лист XLSX -> типизированная таблица цен и постраничные статьи.
+
+Строки листов читаются потоково (xlsx_reader) и сразу раскладываются:
+- `prices.csv` — типизированная таблица (designation, variant, brand,
+  note, qty, price_rub, sheet, row) пишется построчно;
+- `page-NNN/README.md` — страницы по PAGE_ROWS позиций в markdown;
+- `README.md` — паспорт прайс-листа: сводка, колонки и оглавление страниц.
+
+В памяти держатся не больше двух страниц и счётчики сводки, поэтому память не
+зависит от размера книги. Колонки находятся по заголовкам (COLUMN_ALIASES);
+если заголовок сдвинут относительно данных, колонки задаются явно
+(`--columns brand=A,designation=C`) или в `_meta/price_list_columns.json`
+по имени файла — оттуда их берёт и обработчик inbox.
+
+При повторной генерации ID и дата created паспорта и страниц сохраняются,
+`updated` меняется только у изменившихся файлов, лишние страницы удаляются.
+
+Использование:
+    python scripts/price_list.py "inbox/processed/2026-02/Прайс.xlsx" kb/ru/bearings-price-list/price-list-2025
+    python scripts/price_list.py book.xlsx out/ --columns brand=A --page-rows 500
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import re
+import shutil
+import sys
+from dataclasses import astuple, dataclass, field, fields
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from kb_frontmatter import read_front_matter
+from kb_ids import ID_REGISTRY, IdAllocator
+from kb_io import atomic_open, atomic_write_text
+from xlsx_reader import READ_ERRORS, Cell, XlsxReader, column_index, column_letters
+
+TOPIC = "bearings-price-list"
+PAGE_ROWS = 1000
+PRICES_CSV = "prices.csv"
+COLUMNS_CONFIG = Path("_meta/price_list_columns.json")  # имя файла .xlsx -> "brand=A,..."
+
+# Поле таблицы -> начала заголовков колонок (без учёта регистра)
+COLUMN_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "designation": ("основное", "обозначение", "наименование", "артикул", "designation", "part"),
+    "variant": ("вид", "исполнение", "суффикс", "variant"),
+    "brand": ("класс", "бренд", "производитель", "марка", "завод", "brand", "manufacturer"),
+    "note": ("примечан", "комментар", "note"),
+    "qty": ("кол-во", "количество", "остаток", "наличие", "qty", "quantity"),
+    "price": ("цена", "стоимость", "price"),
+}
+REQUIRED_COLUMNS = ("designation", "price")
+PAGE_DIR = re.compile(r"^page-(\d+)$")
+NUMBER = re.compile(r"^-?\d+(?:[.,]\d+)?$")
+
+Number = Union[int, float]
+
+
+class PriceListError(ValueError):
+    """Книга не похожа на прайс-лист: ни на одном листе нет строки заголовков."""
+
+
+NO_HEADER = f"no header row with {' and '.join(REQUIRED_COLUMNS)} columns"
+# Ошибки, из-за которых книга пропускается целиком
+WORKBOOK_ERRORS = READ_ERRORS + (PriceListError,)
+
+
+@dataclass
+class PriceRow:
+    designation: str
+    variant: str
+    brand: str
+    note: str
+    qty: Optional[Number]
+    price_rub: Optional[Number]
+    sheet: str
+    row: int
+
+
+@dataclass
+class PriceListSummary:
+    rows: int = 0
+    pages: int = 0
+    brands: set = field(default_factory=set)
+    min_price: Optional[Number] = None
+    max_price: Optional[Number] = None
+    columns: Dict[str, str] = field(default_factory=dict)  # поле -> "A (класс)"
+    index_id: str = ""  # ID паспорта
+
+    def add(self, row: PriceRow) -> None:
+        self.rows += 1
+        if row.brand:
+            self.brands.add(row.brand.upper())
+        if row.price_rub is not None:
+            self.min_price = row.price_rub if self.min_price is None else min(self.min_price, row.price_rub)
+            self.max_price = row.price_rub if self.max_price is None else max(self.max_price, row.price_rub)
+
+
+def _text(value: Cell) -> str:
+    if value is None or isinstance(value, bool):
+        return ""
+    return " ".join(str(value).split())
+
+
+def _number(value: Cell) -> Optional[Number]:
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    text = str(value).replace(" ", "").replace(" ", "")
+    if not NUMBER.match(text):
+        return None
+    number = float(text.replace(",", "."))
+    return int(number) if number.is_integer() else number
+
+
+def detect_columns(cells: Sequence[Cell]) -> Optional[Dict[str, int]]:
+    """Поле -> индекс колонки по строке заголовков; None, если это не заголовок."""
+    columns: Dict[str, int] = {}
+    for index, cell in enumerate(cells):
+        header = _text(cell).casefold()
+        if not header:
+            continue
+        for name, aliases in COLUMN_ALIASES.items():
+            if name not in columns and header.startswith(aliases):
+                columns[name] = index
+                break
+    return columns if all(name in columns for name in REQUIRED_COLUMNS) else None
+
+
+def parse_columns_spec(spec: str) -> Dict[str, int]:
+    """"brand=A,designation=C" (буквы или номера с 1) -> {поле: индекс}."""
+    columns = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, ref = part.partition("=")
+        name, ref = name.strip(), ref.strip().upper()
+        if name not in COLUMN_ALIASES:
+            raise ValueError(f"unknown column {name!r} (expected one of {', '.join(COLUMN_ALIASES)})")
+        if ref.isdigit() and int(ref) > 0:
+            columns[name] = int(ref) - 1
+        elif ref.isalpha():
+            columns[name] = column_index(ref)
+        else:
+            raise ValueError(f"bad column reference {ref!r} for {name}")
+    return columns
+
+
+def find_header(xlsx_path: Path) -> Dict[str, int]:
+    """
+    Колонки первой строки заголовков книги (читается только до неё).
+
+    PriceListError, если заголовка нет ни на одном листе; повреждённая книга —
+    одна из READ_ERRORS.
+    """
+    with XlsxReader(xlsx_path) as book:
+        for sheet in book.sheets():
+            for _row_number, cells in book.iter_rows(sheet):
+                columns = detect_columns(cells)
+                if columns is not None:
+                    return columns
+    raise PriceListError(NO_HEADER)
+
+
+def configured_columns(file_name: str, config: Path = COLUMNS_CONFIG) -> Dict[str, int]:
+    """Явные колонки книги из config (по имени файла); {} если их нет."""
+    if not config.exists():
+        return {}
+    specs = json.loads(config.read_text(encoding="utf-8"))
+    return parse_columns_spec(specs.get(file_name, ""))
+
+
+def _pick(cells: Sequence[Cell], columns: Dict[str, int], name: str) -> Cell:
+    index = columns.get(name)
+    return cells[index] if index is not None and index < len(cells) else None
+
+
+def iter_price_rows(
+    book: XlsxReader,
+    overrides: Optional[Dict[str, int]] = None,
+    summary: Optional[PriceListSummary] = None,
+) -> Iterator[PriceRow]:
+    """
+    Позиции всех листов книги.
+
+    На каждом листе строки до строки заголовков пропускаются; колонки из
+    overrides заменяют найденные по заголовкам. Строки без обозначения и
+    цены пропускаются.
+    """
+    for sheet in book.sheets():
+        columns: Optional[Dict[str, int]] = None
+        header: Sequence[Cell] = ()
+        for row_number, cells in book.iter_rows(sheet):
+            if columns is None:
+                detected = detect_columns(cells)
+                if detected is None:
+                    continue
+                columns, header = {**detected, **(overrides or {})}, cells
+                if summary is not None and not summary.columns:
+                    summary.columns = {
+                        name: f"{column_letters(index)}"
+                        + (f" ({_text(header[index])})" if index < len(header) and _text(header[index]) else "")
+                        for name, index in columns.items()
+                    }
+                continue
+            row = PriceRow(
+                designation=_text(_pick(cells, columns, "designation")),
+                variant=_text(_pick(cells, columns, "variant")),
+                brand=_text(_pick(cells, columns, "brand")),
+                note=_text(_pick(cells, columns, "note")),
+                qty=_number(_pick(cells, columns, "qty")),
+                price_rub=_number(_pick(cells, columns, "price")),
+                sheet=sheet,
+                row=row_number,
+            )
+            if row.designation or row.price_rub is not None:
+                yield row
+
+
+def _cell_md(value: object) -> str:
+    return "" if value is None else str(value).replace("|", "\\|")
+
+
+def _quote(value: str) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _front_matter(meta: Dict[str, str], tags: Sequence[str]) -> str:
+    return (
+        "---\n"
+        f"id: {meta['id']}\n"
+        f"title: {_quote(meta['title'])}\n"
+        f"topic: \"{TOPIC}\"\n"
+        f"tags: {json.dumps(list(tags), ensure_ascii=False)}\n"
+        "status: draft\n"
+        f"source: {_quote(meta['source'])}\n"
+        f"created: \"{meta['created']}\"\n"
+        f"updated: \"{meta['updated']}\"\n"
+        "---\n\n"
+    )
+
+
+class ArticleWriter:
+    """Пишет статьи, сохраняя id/created существующих и обновляя `updated` только при изменении."""
+
+    def __init__(self, allocate_id: Callable[[], str]) -> None:
+        self.allocate_id = allocate_id
+        self.today = date.today().isoformat()
+
+    def write(self, path: Path, title: str, source: str, tags: Sequence[str], body: str, keep_title: bool = False) -> str:
+        old = read_front_matter(path) if path.exists() else {}
+        meta = {
+            "id": str(old.get("id") or "") or self.allocate_id(),
+            "title": str(old.get("title") or title) if keep_title else title,
+            "source": source,
+            "created": str(old.get("created") or self.today),
+            "updated": str(old.get("updated") or self.today),
+        }
+        tags = old.get("tags") if keep_title and isinstance(old.get("tags"), list) else tags
+        text = _front_matter(meta, tags) + body
+        if path.exists() and path.read_text(encoding="utf-8") == text:
+            return meta["id"]
+        meta["updated"] = self.today
+        atomic_write_text(path, _front_matter(meta, tags) + body)
+        return meta["id"]
+
+
+def _page_name(number: int) -> str:
+    return f"page-{number:03d}"
+
+
+def _page_body(title: str, number: int, rows: List[PriceRow], first: int, has_next: bool) -> str:
+    nav = ["[Оглавление](../README.md)"]
+    if number > 1:
+        nav.insert(0, f"[← Стр. {number - 1}](../{_page_name(number - 1)}/README.md)")
+    if has_next:
+        nav.append(f"[Стр. {number + 1} →](../{_page_name(number + 1)}/README.md)")
+    lines = [
+        f"# {title} — стр. {number}",
+        "",
+        f"Позиции {first}–{first + len(rows) - 1}. " + " · ".join(nav),
+        "",
+        "| Бренд | Обозначение | Вид | Примечание | Кол-во | Цена, руб. |",
+        "|---|---|---|---|---|---|",
+    ]
+    lines += [
+        f"| {_cell_md(r.brand)} | {_cell_md(r.designation)} | {_cell_md(r.variant)} | {_cell_md(r.note)} "
+        f"| {_cell_md(r.qty)} | {_cell_md(r.price_rub)} |"
+        for r in rows
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def _index_body(title: str, source_name: str, summary: PriceListSummary, pages: List[Tuple[str, str, int]]) -> str:
+    price_range = (
+        f", цены от {summary.min_price} до {summary.max_price} руб."
+        if summary.min_price is not None else ""
+    )
+    lines = [
+        f"# {title}",
+        "",
+        "## Краткое содержание",
+        "",
+        f"Прайс-лист из `{source_name}`: {summary.rows} позиций, {len(summary.brands)} брендов/заводов{price_range}",
+        "",
+        "## Данные",
+        "",
+        f"Типизированная таблица: [{PRICES_CSV}](./{PRICES_CSV}) — колонки "
+        + ", ".join(f"`{f.name}`" for f in fields(PriceRow)) + ".",
+        "",
+        "| Поле | Колонка листа |",
+        "|---|---|",
+    ]
+    lines += [f"| `{name}` | {ref} |" for name, ref in summary.columns.items()]
+    lines += ["", "## Страницы", ""]
+    lines += [f"- [Стр. {n}: {span}](./{name}/README.md) — {count} позиций" for n, (name, span, count) in enumerate(pages, 1)]
+    lines += ["", "## См. также", "", "- [Прайс-листы подшипников](../README.md)"]
+    return "\n".join(lines) + "\n"
+
+
+def write_price_list(
+    xlsx_path: Path,
+    out_dir: Path,
+    title: str,
+    source: str,
+    allocate_id: Callable[[], str],
+    page_rows: int = PAGE_ROWS,
+    overrides: Optional[Dict[str, int]] = None,
+) -> PriceListSummary:
+    """
+    Генерирует prices.csv, страницы и паспорт в out_dir; возвращает сводку.
+
+    Повреждённая книга или книга без строки заголовков поднимает одну из
+    WORKBOOK_ERRORS; созданная для неё папка удаляется.
+    """
+    writer = ArticleWriter(allocate_id)
+    index_path = out_dir / "README.md"
+    old_index = read_front_matter(index_path) if index_path.exists() else {}
+    index_title = str(old_index.get("title") or title)
+    summary = PriceListSummary()
+    pages: List[Tuple[str, str, int]] = []
+    created = not out_dir.exists()
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    def flush(page: List[PriceRow], has_next: bool) -> None:
+        number = len(pages) + 1
+        name = _page_name(number)
+        first = sum(count for _name, _span, count in pages) + 1
+        writer.write(
+            out_dir / name / "README.md",
+            f"{index_title} — стр. {number}",
+            source,
+            ["подшипники", "прайс-лист"],
+            _page_body(index_title, number, page, first, has_next),
+        )
+        pages.append((name, f"{page[0].designation} — {page[-1].designation}", len(page)))
+
+    try:
+        with atomic_open(out_dir / PRICES_CSV) as f, XlsxReader(xlsx_path) as book:
+            table = csv.writer(f, lineterminator="\n")
+            table.writerow([f.name for f in fields(PriceRow)])
+            # Заполненная страница пишется, когда известно, будет ли следующая
+            page: List[PriceRow] = []
+            full: List[PriceRow] = []
+            for row in iter_price_rows(book, overrides, summary):
+                table.writerow(["" if v is None else v for v in astuple(row)])
+                summary.add(row)
+                page.append(row)
+                if len(page) == page_rows:
+                    if full:
+                        flush(full, has_next=True)
+                    full, page = page, []
+            if full:
+                flush(full, has_next=bool(page))
+            if page:
+                flush(page, has_next=False)
+            if not summary.columns:
+                raise PriceListError(NO_HEADER)
+    except BaseException:
+        if created:
+            # Папка только что создана: без паспорта её не должно остаться
+            shutil.rmtree(out_dir, ignore_errors=True)
+        raise
+    summary.pages = len(pages)
+
+    for stale in out_dir.iterdir():
+        m = PAGE_DIR.match(stale.name)
+        if m and stale.is_dir() and int(m.group(1)) > len(pages):
+            shutil.rmtree(stale)
+
+    summary.index_id = writer.write(
+        index_path,
+        title,
+        source,
+        ["подшипники", "прайс-лист", "цены"],
+        _index_body(index_title, Path(source).name, summary, pages),
+        keep_title=True,
+    )
+    return summary
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Прайс-лист XLSX -> prices.csv и постраничные статьи.")
+    parser.add_argument("xlsx", type=Path, help="Файл .xlsx")
+    parser.add_argument("out_dir", type=Path, help="Папка прайс-листа, напр. kb/ru/bearings-price-list/<slug>")
+    parser.add_argument("--title", help="Заголовок (по умолчанию — имя файла или заголовок существующего паспорта)")
+    parser.add_argument("--source", help="Поле source (по умолчанию inbox/<имя файла>)")
+    parser.add_argument(
+        "--columns",
+        help=f"Явные колонки: brand=A,designation=C,... (по умолчанию — из {COLUMNS_CONFIG} по имени файла)",
+    )
+    parser.add_argument("--page-rows", type=int, default=PAGE_ROWS, help=f"Позиций на страницу (по умолчанию {PAGE_ROWS})")
+    parser.add_argument("--id-registry", type=Path, default=ID_REGISTRY, help="Реестр ID для новых статей")
+    args = parser.parse_args()
+
+    if not args.xlsx.is_file():
+        print(f"ERROR: {args.xlsx} not found", file=sys.stderr)
+        return 2
+    if args.page_rows < 1:
+        print("ERROR: --page-rows must be positive", file=sys.stderr)
+        return 2
+    try:
+        if args.columns is None:
+            overrides = configured_columns(args.xlsx.name)
+        else:
+            overrides = parse_columns_spec(args.columns)
+    except ValueError as exc:
+        print(f"ERROR: {exc}", file=sys.stderr)
+        return 2
+
+    ids = IdAllocator(args.id_registry, None, set())
+    try:
+        summary = write_price_list(
+            args.xlsx,
+            args.out_dir,
+            args.title or args.xlsx.stem,
+            args.source or f"inbox/{args.xlsx.name}",
+            ids.allocate,
+            args.page_rows,
+            overrides,
+        )
+    except WORKBOOK_ERRORS as exc:
+        print(f"ERROR: {args.xlsx}: {exc}", file=sys.stderr)
+        return 2
+    ids.save()
+    print(f"{summary.rows} row(s), {summary.pages} page(s) -> {args.out_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
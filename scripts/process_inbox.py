@@ -6,19 +6,38 @@
 обновляет индексы и перемещает обработанные файлы в inbox/processed/YYYY-MM/.
 
 Использование:
-    python scripts/process_inbox.py [--dry-run]
+    python scripts/process_inbox.py [--dry-run] [--jobs N]
+    python scripts/process_inbox.py --reclassify   # пересчитать темы всей базы (отчёт)
 """
 from __future__ import annotations
 
 import argparse
 import hashlib
 import json
+import os
+import random
 import re
 import shutil
 import sys
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date, datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from kb_classify import load_classifier
+from kb_frontmatter import read_front_matter, split_front_matter
+from kb_ids import DEFAULT_REGISTRY, format_id, load_id_registry, save_id_registry
+from kb_index import rebuild_indexes
+from kb_io import atomic_write_text
+from price_list import TOPIC as PRICE_LIST_TOPIC, WORKBOOK_ERRORS, configured_columns, find_header, write_price_list
+
+try:
+    import numpy as np
+except ImportError:  # необязательно: сигнатуры MinHash считаются на чистом Python
+    np = None
 
 # Константы
 INBOX_DIR = Path("inbox")
@@ -30,10 +49,32 @@ ID_REGISTRY = META_DIR / "id_registry.json"
 DEDUP_INDEX = META_DIR / "dedup_index.json"
 DEDUP_LOG = META_DIR / "dedup_log.md"
 TOPICS_JSON = META_DIR / "topics.json"
+INGESTION_REGISTRY = META_DIR / "ingestion" / "registry.jsonl"
+MINHASH_INDEX = META_DIR / "minhash_index.json"
+
+# Параметры MinHash/LSH для поиска почти-дубликатов
+MINHASH_PERMUTATIONS = 128
+MINHASH_BANDS = 32  # 32 полосы × 4 строки: кандидаты от сходства ~0.4
+SHINGLE_SIZE = 5  # слов в шингле
+NEAR_DUP_THRESHOLD = 0.9
+# Перестановки (a·h + b) mod p над 32-битным хешем шингла: a·h + b < 2^64,
+# поэтому NumPy считает их в uint64 точно так же, как чистый Python
+MINHASH_PRIME = (1 << 31) - 1
+MINHASH_CHUNK = 4096  # шинглов за один шаг NumPy (память ~ 128 × 4096 × 8 байт)
+_rng = random.Random(20260207)  # фиксированное зерно: сигнатуры стабильны между запусками
+MINHASH_PARAMS = [
+    (_rng.randrange(1, MINHASH_PRIME), _rng.randrange(0, MINHASH_PRIME))
+    for _ in range(MINHASH_PERMUTATIONS)
+]
+if np is not None:
+    # Столбцы a и b перестановок, строятся один раз на процесс
+    MINHASH_A = np.array([a for a, _b in MINHASH_PARAMS], dtype=np.uint64)[:, np.newaxis]
+    MINHASH_B = np.array([b for _a, b in MINHASH_PARAMS], dtype=np.uint64)[:, np.newaxis]
 
 # Регулярные выражения
 CYRILLIC_ONLY = re.compile(r"[А-Яа-яЁё]+")
-YAML_FRONTMATTER = re.compile(r"^---\s*\n.*?\n---\s*\n", re.DOTALL | re.MULTILINE)
+AUTOSAVE_SUFFIX = re.compile(r"\s*\((?:Автосохраненный|Автосохранённый|\d+)\)", re.IGNORECASE)
+WORD = re.compile(r"\w+")
 
 
 def die(msg: str) -> None:
@@ -57,11 +98,7 @@ def ensure_meta_files() -> None:
     META_DIR.mkdir(parents=True, exist_ok=True)
     
     if not ID_REGISTRY.exists():
-        ID_REGISTRY.write_text(json.dumps({
-            "next_id": 202,
-            "prefix": "KB-RU-",
-            "pad": 6
-        }, indent=2, ensure_ascii=False))
+        save_id_registry(dict(DEFAULT_REGISTRY), ID_REGISTRY)
     
     if not DEDUP_INDEX.exists():
         DEDUP_INDEX.write_text(json.dumps({}, indent=2, ensure_ascii=False))
@@ -73,32 +110,6 @@ def ensure_meta_files() -> None:
         TOPICS_JSON.write_text(json.dumps({}, indent=2, ensure_ascii=False))
 
 
-def load_id_registry() -> Dict:
-    """Загружает реестр ID."""
-    if not ID_REGISTRY.exists():
-        return {"next_id": 202, "prefix": "KB-RU-", "pad": 6}
-    return json.loads(ID_REGISTRY.read_text())
-
-
-def save_id_registry(registry: Dict) -> None:
-    """Сохраняет реестр ID."""
-    ID_REGISTRY.write_text(json.dumps(registry, indent=2, ensure_ascii=False))
-
-
-def allocate_id() -> str:
-    """Выделяет новый уникальный ID для статьи."""
-    registry = load_id_registry()
-    next_id = registry["next_id"]
-    prefix = registry["prefix"]
-    pad = registry["pad"]
-    
-    article_id = f"{prefix}{str(next_id).zfill(pad)}"
-    registry["next_id"] = next_id + 1
-    save_id_registry(registry)
-    
-    return article_id
-
-
 def load_dedup_index() -> Dict[str, str]:
     """Загружает индекс дедупликации."""
     if not DEDUP_INDEX.exists():
@@ -108,7 +119,7 @@ def load_dedup_index() -> Dict[str, str]:
 
 def save_dedup_index(index: Dict[str, str]) -> None:
     """Сохраняет индекс дедупликации."""
-    DEDUP_INDEX.write_text(json.dumps(index, indent=2, ensure_ascii=False))
+    atomic_write_text(DEDUP_INDEX, json.dumps(index, indent=2, ensure_ascii=False))
 
 
 def compute_sha256(text: str) -> str:
@@ -116,11 +127,316 @@ def compute_sha256(text: str) -> str:
     return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
 
-def log_duplicate(inbox_file: str, canonical_path: str, reason: str) -> None:
-    """Логирует дубликат в dedup_log.md."""
-    log_entry = f"- {date.today()}: {inbox_file} -> {canonical_path} ({reason})\n"
-    with open(DEDUP_LOG, "a", encoding="utf-8") as f:
-        f.write(log_entry)
+def compute_file_hashes(file_path: Path) -> Tuple[str, str]:
+    """SHA256 и SHA1 содержимого файла (читается блоками, без загрузки целиком)."""
+    sha256, sha1 = hashlib.sha256(), hashlib.sha1()
+    with file_path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha256.update(block)
+            sha1.update(block)
+    return sha256.hexdigest(), sha1.hexdigest()
+
+
+def compute_minhash(text: str) -> List[int]:
+    """
+    Вычисляет MinHash-сигнатуру текста по шинглам из SHINGLE_SIZE слов.
+    
+    Регистр, пунктуация и пробелы не влияют на сигнатуру. Каждый шингл
+    хешируется один раз; MINHASH_PERMUTATIONS значений получаются из хеша
+    перестановками MINHASH_PARAMS (с NumPy — матрицей по MINHASH_CHUNK шинглов).
+    """
+    words = WORD.findall(text.lower())
+    if len(words) <= SHINGLE_SIZE:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {
+            " ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)
+        }
+    
+    hashes = [
+        int.from_bytes(hashlib.blake2b(sh.encode("utf-8"), digest_size=4).digest(), "big")
+        for sh in shingles
+    ]
+    if np is not None:
+        values = np.array(hashes, dtype=np.uint64)
+        signature = np.full(MINHASH_PERMUTATIONS, MINHASH_PRIME, dtype=np.uint64)
+        for start in range(0, len(values), MINHASH_CHUNK):
+            chunk = values[np.newaxis, start:start + MINHASH_CHUNK]
+            signature = np.minimum(signature, ((MINHASH_A * chunk + MINHASH_B) % MINHASH_PRIME).min(axis=1))
+        return [int(v) for v in signature]
+    return [
+        min([(a * h + b) % MINHASH_PRIME for h in hashes])
+        for a, b in MINHASH_PARAMS
+    ]
+
+
+def minhash_similarity(sig_a: List[int], sig_b: List[int]) -> float:
+    """Оценка сходства Жаккара по двум MinHash-сигнатурам."""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+class LshIndex:
+    """
+    LSH-индекс MinHash-сигнатур (banding) для поиска почти-дубликатов.
+    
+    Сигнатура делится на MINHASH_BANDS полос; статьи с совпадающей полосой
+    становятся кандидатами, сходство которых проверяется по полной сигнатуре.
+    """
+    
+    def __init__(self, signatures: Optional[Dict[str, List[int]]] = None) -> None:
+        self.signatures: Dict[str, List[int]] = {}
+        self.buckets: Dict[str, List[str]] = {}
+        for path, signature in (signatures or {}).items():
+            self.add(path, signature)
+    
+    @staticmethod
+    def band_keys(signature: List[int]) -> List[str]:
+        rows = len(signature) // MINHASH_BANDS
+        keys = []
+        for band in range(MINHASH_BANDS):
+            chunk = ",".join(str(v) for v in signature[band * rows:(band + 1) * rows])
+            digest = hashlib.blake2b(chunk.encode("ascii"), digest_size=8).hexdigest()
+            keys.append(f"{band}:{digest}")
+        return keys
+    
+    def add(self, path: str, signature: List[int]) -> None:
+        if path in self.signatures:
+            return
+        self.signatures[path] = signature
+        for key in self.band_keys(signature):
+            self.buckets.setdefault(key, []).append(path)
+    
+    def remove(self, path: str) -> None:
+        signature = self.signatures.pop(path, None)
+        if signature is None:
+            return
+        for key in self.band_keys(signature):
+            bucket = self.buckets.get(key, [])
+            if path in bucket:
+                bucket.remove(path)
+            if not bucket:
+                self.buckets.pop(key, None)
+    
+    def query(self, signature: List[int], threshold: float) -> Optional[Tuple[str, float]]:
+        """Возвращает (путь, сходство) самой похожей статьи не ниже threshold."""
+        candidates: Set[str] = set()
+        for key in self.band_keys(signature):
+            candidates.update(self.buckets.get(key, ()))
+        
+        best: Optional[Tuple[str, float]] = None
+        for path in sorted(candidates):
+            score = minhash_similarity(signature, self.signatures[path])
+            if score >= threshold and (best is None or score > best[1]):
+                best = (path, score)
+        return best
+    
+    def to_json(self) -> str:
+        return json.dumps({
+            "permutations": MINHASH_PERMUTATIONS,
+            "prime": MINHASH_PRIME,
+            "bands": MINHASH_BANDS,
+            "shingle_size": SHINGLE_SIZE,
+            "signatures": self.signatures,
+            "buckets": self.buckets,
+        }, ensure_ascii=False)
+
+
+def load_lsh_index(dedup_index: Dict[str, str]) -> LshIndex:
+    """
+    Загружает LSH-индекс; при отсутствии или смене параметров строит его
+    по статьям из индекса дедупликации.
+    """
+    if MINHASH_INDEX.exists():
+        data = json.loads(MINHASH_INDEX.read_text(encoding="utf-8"))
+        if (
+            data.get("permutations") == MINHASH_PERMUTATIONS
+            and data.get("prime") == MINHASH_PRIME
+            and data.get("bands") == MINHASH_BANDS
+            and data.get("shingle_size") == SHINGLE_SIZE
+        ):
+            index = LshIndex()
+            index.signatures = data["signatures"]
+            index.buckets = data["buckets"]
+            return index
+    
+    index = LshIndex()
+    for article_path in sorted(set(dedup_index.values())):
+        path = Path(article_path)
+        if path.exists():
+            index.add(article_path, compute_minhash(extract_text_from_md(path)))
+    return index
+
+
+class IngestionRegistry:
+    """
+    Журнал загрузки _meta/ingestion/registry.jsonl — только дозапись.
+
+    Каждый документ проходит состояния queued -> parsed -> written -> moved;
+    каждый переход дописывается отдельной строкой, а строки с хешем сразу
+    сбрасываются на диск (fsync), поэтому журнал — точка восстановления
+    после сбоя (строки queued без хеша для восстановления не нужны). Ключ
+    документа — sha256 байтов источника (файла или члена архива), как и в
+    записях ingested. При загрузке строится индекс sha256 -> последняя
+    запись: проверка «документ уже обработан» — один поиск в словаре.
+    Оборванная последняя строка (сбой посреди записи) пропускается.
+    """
+    
+    DONE = frozenset({"moved", "ingested"})  # ingested — записи до появления состояний
+    
+    def __init__(self, path: Path = INGESTION_REGISTRY, dry_run: bool = False) -> None:
+        self.path = path
+        self.dry_run = dry_run
+        self.latest: Dict[str, Dict] = {}
+        self._needs_newline = False
+        if path.exists():
+            text = path.read_text(encoding="utf-8")
+            self._needs_newline = bool(text) and not text.endswith("\n")
+            for line in text.splitlines():
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(entry, dict) and entry.get("sha256"):
+                    self.latest[entry["sha256"]] = entry
+    
+    def state(self, sha256: str) -> Optional[Dict]:
+        """Последняя запись документа с таким хешем байтов источника или None."""
+        return self.latest.get(sha256)
+    
+    def max_id_number(self, prefix: str) -> int:
+        """Наибольший номер ID статей, записанных в журнал."""
+        numbers = [
+            int(entry["id"][len(prefix):]) for entry in self.latest.values()
+            if str(entry.get("id", "")).startswith(prefix) and entry["id"][len(prefix):].isdigit()
+        ]
+        return max(numbers, default=0)
+    
+    def record(self, entry: Dict) -> None:
+        """Дописывает запись и сбрасывает на диск строку с хешем (в dry-run — только в память)."""
+        entry = {**entry, "recorded_at": datetime.now().isoformat(timespec="seconds")}
+        if entry.get("sha256"):
+            self.latest[entry["sha256"]] = entry
+        if self.dry_run:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with open(self.path, "a", encoding="utf-8") as f:
+            if self._needs_newline:
+                f.write("\n")
+                self._needs_newline = False
+            f.write(line)
+            if entry.get("sha256"):
+                f.flush()
+                os.fsync(f.fileno())
+
+
+class MetaSession:
+    """
+    Сессия метаданных пакетной обработки.
+    
+    Загружает id_registry.json, dedup_index.json и dedup_log.md один раз,
+    накапливает изменения в памяти и атомарно сохраняет их в commit() —
+    в конце пакета или каждые flush_every файлов. Журнал загрузки
+    (ingestion/registry.jsonl) дописывается сразу, при каждом переходе
+    состояния документа. В режиме dry-run изменения никогда не сохраняются.
+    """
+    
+    def __init__(self, dry_run: bool = False, flush_every: int = 0) -> None:
+        self.dry_run = dry_run
+        self.flush_every = flush_every
+        self.id_registry = load_id_registry(ID_REGISTRY)
+        self.dedup_index = load_dedup_index()
+        self.dedup_log = DEDUP_LOG.read_text(encoding="utf-8") if DEDUP_LOG.exists() else ""
+        self.ingestion = IngestionRegistry(INGESTION_REGISTRY, dry_run)
+        self.lsh_index = load_lsh_index(self.dedup_index)
+        self._dirty = not MINHASH_INDEX.exists() and bool(self.lsh_index.signatures)
+        self._files_since_commit = 0
+        self._archive_entries: Dict[Path, List[Dict]] = {}
+        # Пути статей, занятых в этом пакете (в dry-run файлы не пишутся)
+        self.claimed_paths: Set[str] = set()
+        
+        # ID статей, записанных до сбоя, но не попавших в id_registry.json,
+        # повторно не выдаются
+        last_logged = self.ingestion.max_id_number(self.id_registry["prefix"])
+        if last_logged >= self.id_registry["next_id"]:
+            self.id_registry["next_id"] = last_logged + 1
+            self._dirty = True
+    
+    def __enter__(self) -> "MetaSession":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        # Изменения в памяти относятся только к полностью обработанным файлам,
+        # поэтому сохраняем их и при аварийном выходе.
+        self.commit()
+    
+    def allocate_id(self) -> str:
+        """Выделяет новый уникальный ID для статьи."""
+        next_id = self.id_registry["next_id"]
+        article_id = format_id(self.id_registry["prefix"], next_id, self.id_registry["pad"])
+        self.id_registry["next_id"] = next_id + 1
+        self._dirty = True
+        return article_id
+    
+    def find_duplicate(self, text_hash: str) -> Optional[str]:
+        """Возвращает путь канонической статьи с таким же хешем."""
+        return self.dedup_index.get(text_hash)
+    
+    def find_near_duplicate(self, signature: List[int], threshold: float) -> Optional[Tuple[str, float]]:
+        """Возвращает (путь, сходство) почти-дубликата или None."""
+        return self.lsh_index.query(signature, threshold)
+    
+    def add_article(self, text_hash: str, article_path: str, signature: Optional[List[int]] = None) -> None:
+        """Регистрирует статью в индексах дедупликации."""
+        self.dedup_index[text_hash] = article_path
+        self.claimed_paths.add(article_path)
+        if signature is not None:
+            # Статья, обновлённая на месте, получает сигнатуру нового текста
+            self.lsh_index.remove(article_path)
+            self.lsh_index.add(article_path, signature)
+        self._dirty = True
+    
+    def log_duplicate(self, inbox_file: str, canonical_path: str, reason: str) -> None:
+        """Добавляет запись о дубликате в dedup_log.md."""
+        if self.dedup_log and not self.dedup_log.endswith("\n"):
+            self.dedup_log += "\n"
+        self.dedup_log += f"- {date.today()}: {inbox_file} -> {canonical_path} ({reason})\n"
+        self._dirty = True
+    
+    def record_ingestion(self, entry: Dict, status: str, **fields) -> Dict:
+        """Дописывает в журнал загрузки новое состояние документа; возвращает запись."""
+        entry = {**entry, **fields, "status": status}
+        entry.pop("recorded_at", None)
+        self.ingestion.record(entry)
+        return entry
+    
+    def defer_archive_move(self, archive_path: Path, entry: Dict) -> None:
+        """Член архива переходит в moved, когда перенесён весь архив."""
+        self._archive_entries.setdefault(archive_path, []).append(entry)
+    
+    def archive_moved(self, archive_path: Path, processed_path: Path) -> None:
+        for entry in self._archive_entries.pop(archive_path, []):
+            self.record_ingestion(entry, "moved", processed_path=str(processed_path))
+    
+    def file_done(self) -> None:
+        """Отмечает завершение обработки файла; при необходимости сохраняет пакет."""
+        self._files_since_commit += 1
+        if self.flush_every and self._files_since_commit >= self.flush_every:
+            self.commit()
+    
+    def commit(self) -> None:
+        """Атомарно сохраняет накопленные изменения."""
+        self._files_since_commit = 0
+        if self.dry_run or not self._dirty:
+            return
+        
+        save_dedup_index(self.dedup_index)
+        atomic_write_text(MINHASH_INDEX, self.lsh_index.to_json())
+        atomic_write_text(DEDUP_LOG, self.dedup_log)
+        # Реестр ID сохраняется последним: после сбоя ID могут пропуститься,
+        # но никогда не будут выданы повторно.
+        save_id_registry(self.id_registry, ID_REGISTRY)
+        self._dirty = False
 
 
 def to_kebab_case(text: str) -> str:
@@ -158,12 +474,73 @@ def to_kebab_case(text: str) -> str:
     return result
 
 
+def strip_front_matter(text: str) -> str:
+    """Убирает существующий YAML front-matter в начале текста, если он есть."""
+    return split_front_matter(text)[1].strip()
+
+
 def extract_text_from_md(file_path: Path) -> str:
     """Извлекает текст из markdown файла, убирая YAML front-matter."""
     text = file_path.read_text(encoding="utf-8", errors="replace")
-    # Убираем существующий front-matter, если есть
-    text = YAML_FRONTMATTER.sub("", text).strip()
-    return text
+    return strip_front_matter(text)
+
+
+def read_archive_member(archive_path: Path, member: str) -> bytes:
+    """
+    Читает байты markdown-файла из ZIP-архива, не распаковывая архив на диск.
+    
+    Читается только центральный каталог архива и один член.
+    """
+    with zipfile.ZipFile(archive_path) as zf:
+        with zf.open(member) as f:
+            return f.read()
+
+
+def is_archive(file_path: Path) -> bool:
+    """Проверяет, является ли файл ZIP-архивом."""
+    return file_path.suffix.lower() == ".zip"
+
+
+def is_price_list(file_path: Path) -> bool:
+    """Проверяет, является ли файл прайс-листом XLSX."""
+    return file_path.suffix.lower() == ".xlsx"
+
+
+def price_list_title(filename: str) -> str:
+    """Заголовок прайс-листа из имени файла без пометок «(Автосохраненный)» и «(1)»."""
+    return " ".join(AUTOSAVE_SUFFIX.sub("", Path(filename).stem).split()) or "Прайс-лист"
+
+
+def list_archive_members(archive_path: Path) -> List[str]:
+    """Возвращает .md-файлы архива в порядке центрального каталога."""
+    with zipfile.ZipFile(archive_path) as zf:
+        return [
+            item.filename for item in zf.infolist()
+            if not item.is_dir() and item.filename.lower().endswith(".md")
+        ]
+
+
+def source_name(file_path: Path, member: Optional[str] = None) -> str:
+    """Имя источника относительно inbox/ (для архива — путь члена внутри архива)."""
+    if member is None:
+        return file_path.name
+    return f"{file_path.name}/{member}"
+
+
+def expand_work_items(files: List[Path]) -> List[Tuple[Path, Optional[str]]]:
+    """Разворачивает архивы в список (архив, член); обычные файлы — (файл, None)."""
+    items: List[Tuple[Path, Optional[str]]] = []
+    for file_path in files:
+        if is_archive(file_path):
+            try:
+                members = list_archive_members(file_path)
+            except zipfile.BadZipFile:
+                warn(f"Пропуск {file_path.name}: повреждённый ZIP-архив")
+                continue
+            items.extend((file_path, member) for member in members)
+        else:
+            items.append((file_path, None))
+    return items
 
 
 def get_unprocessed_files() -> List[Path]:
@@ -176,64 +553,41 @@ def get_unprocessed_files() -> List[Path]:
         if item.is_file() and item.name != "README.md":
             files.append(item)
     
-    return files
+    # Стабильный порядок: от него зависят выделяемые ID и пути статей
+    return sorted(files, key=lambda p: p.name)
 
 
 def classify_topic(text: str, title: str) -> str:
     """
     Классифицирует контент по теме.
-    Возвращает topic slug (kebab-case).
-    """
-    # Простая классификация по ключевым словам
-    text_lower = text.lower()
-    title_lower = title.lower()
-    
-    # Подшипники
-    bearing_keywords = [
-        "подшипник", "bearing", "шариковый", "роликовый", "радиальный",
-        "упорный", "конический", "цилиндрический", "сферический",
-        "skf", "fag", "nsk", "koyo", "timken", "гост", "iso", "маркировка",
-        "обозначение", "аналог", "эквивалент", "ступиц", "нагрузк",
-    ]
-    
-    # Смазка и уплотнения
-    lubrication_keywords = ["смазк", "масл", "консистент", "сальник", "манжет", "уплотнени"]
-    
-    # Цепи и ремни
-    drive_keywords = ["ремень", "цепь", "звездочк", "привод", "шкив"]
-    
-    # Стандарты и документация
-    standards_keywords = ["гост", "стандарт", "iso", "din", "термин", "определени", "classification"]
-    
-    # Монтаж и обслуживание
-    maintenance_keywords = ["монтаж", "демонтаж", "установк", "ревизи", "обслуживан", "ремонт"]
-    
-    combined = title_lower + " " + text_lower[:1000]
-    
-    if any(kw in combined for kw in bearing_keywords):
-        # Дополнительная детализация
-        if any(kw in combined for kw in standards_keywords):
-            return "podshipniki-standards"
-        elif any(kw in combined for kw in maintenance_keywords):
-            return "podshipniki-maintenance"
-        elif "аналог" in combined or "эквивалент" in combined or "equivalent" in combined:
-            return "podshipniki-equivalents"
-        elif "маркировка" in combined or "обозначение" in combined or "designation" in combined:
-            return "podshipniki-designation"
-        else:
-            return "podshipniki"
-    
-    elif any(kw in combined for kw in lubrication_keywords):
-        return "lubrication-seals"
-    
-    elif any(kw in combined for kw in drive_keywords):
-        return "drive-systems"
-    
-    elif any(kw in combined for kw in standards_keywords):
-        return "standards"
-    
-    else:
-        return "general"
+    Возвращает topic slug (kebab-case) с наибольшим счётом (см. kb_classify).
+    """
+    return load_classifier().best_topic(text, title)
+
+
+def reclassify_kb(root: Path = KB_ROOT) -> List[Dict]:
+    """
+    Пересчитывает темы всех статей в папках тем классификатора.
+
+    Возвращает статьи, для которых лучшая тема отличается от текущей
+    и счёт которой строго выше (статьи не перемещаются — только отчёт).
+    """
+    classifier = load_classifier()
+    changes = []
+    for topic in classifier.topics:
+        for readme in sorted((root / topic).glob("*/README.md")):
+            fm, body = split_front_matter(readme.read_text(encoding="utf-8"))
+            candidates = classifier.classify(body, str(fm.get("title") or ""))
+            current = str(fm.get("topic") or topic)
+            current_score = dict(candidates).get(current, 0.0)
+            if candidates[0][0] != current and candidates[0][1] > current_score:
+                changes.append({
+                    "path": str(readme),
+                    "topic": current,
+                    "current_score": current_score,
+                    "candidates": candidates[:3],
+                })
+    return changes
 
 
 def extract_title_from_content(text: str, filename: str) -> str:
@@ -258,8 +612,9 @@ def create_article_from_content(
     topic: str,
     source_file: str,
     article_id: str,
+    created: Optional[str] = None,
 ) -> str:
-    """Создаёт README.md с YAML front-matter и контентом."""
+    """Создаёт README.md с YAML front-matter и контентом (created — дата исходной статьи при обновлении)."""
     today = date.today().isoformat()
     
     # Генерируем теги на основе темы
@@ -281,7 +636,7 @@ topic: {topic}
 tags: {tags_str}
 status: draft
 source: inbox/{source_file}
-created: {today}
+created: {created or today}
 updated: {today}
 ---
 
@@ -320,19 +675,19 @@ def move_to_processed(file_path: Path, dry_run: bool = False) -> Path:
         return target_dir / file_path.name
 
 
-def update_topic_readme(topic: str, article_path: Path, article_title: str, dry_run: bool = False) -> None:
-    """Обновляет README.md темы, добавляя ссылку на новую статью."""
+def ensure_topic_readme(topic: str, topic_id: str) -> Path:
+    """
+    Создаёт README.md темы с пустым разделом «Статьи», если его ещё нет.
+
+    Сам список статей заполняет kb_index.rebuild_indexes() после пакета.
+    """
     topic_dir = KB_ROOT / topic
     topic_readme = topic_dir / "README.md"
-    
-    if not dry_run:
-        topic_dir.mkdir(parents=True, exist_ok=True)
-        
-        if not topic_readme.exists():
-            # Создаём новый README для темы
-            topic_title = topic.replace("-", " ").title()
-            content = f"""---
-id: TBD
+    topic_dir.mkdir(parents=True, exist_ok=True)
+    if not topic_readme.exists():
+        topic_title = topic.replace("-", " ").title()
+        content = f"""---
+id: {topic_id}
 title: {topic_title}
 topic: {topic}
 tags: ["topic-index"]
@@ -346,97 +701,326 @@ updated: {date.today().isoformat()}
 
 ## Статьи
 
-- [{article_title}](./{article_path.parent.name}/README.md)
-
 """
-            topic_readme.write_text(content, encoding="utf-8")
-        else:
-            # Добавляем ссылку в существующий README
-            content = topic_readme.read_text(encoding="utf-8")
-            
-            # Ищем секцию со статьями
-            if "## Статьи" in content:
-                # Добавляем после заголовка "## Статьи"
-                article_link = f"- [{article_title}](./{article_path.parent.name}/README.md)\n"
-                content = content.replace(
-                    "## Статьи\n",
-                    f"## Статьи\n\n{article_link}"
-                )
-            else:
-                # Добавляем секцию в конец
-                article_link = f"\n## Статьи\n\n- [{article_title}](./{article_path.parent.name}/README.md)\n"
-                content += article_link
-            
-            topic_readme.write_text(content, encoding="utf-8")
-
-
-def process_file(file_path: Path, dry_run: bool = False) -> Optional[Dict]:
-    """
-    Обрабатывает один файл из inbox.
+        topic_readme.write_text(content, encoding="utf-8")
+    return topic_readme
+
+
+def analyze_file(file_path: Path, member: Optional[str] = None) -> Optional[Dict]:
+    """
+    Извлекает текст, хеш, заголовок и тему файла (или члена ZIP-архива).
+    
+    Не имеет побочных эффектов, поэтому может выполняться в пуле процессов.
     
     Returns:
-        Dict с информацией о созданной статье или None, если файл был пропущен.
+        Dict с результатами анализа ({"skip": причина} для книги, которую
+        нельзя прочитать) или None, если формат не поддерживается.
     """
-    info(f"Обработка: {file_path.name}")
-    
-    # Извлекаем текст
-    if file_path.suffix.lower() == ".md":
+    # sha256/sha1 — байты источника (ключ журнала загрузки), text_hash — текст без
+    # front-matter (ключ индекса дедупликации)
+    if member is not None:
+        raw = read_archive_member(file_path, member)
+        sha256, sha1 = hashlib.sha256(raw).hexdigest(), hashlib.sha1(raw).hexdigest()
+        text = strip_front_matter(raw.decode("utf-8", errors="replace"))
+        filename = Path(member).name
+    elif file_path.suffix.lower() == ".md":
+        sha256, sha1 = compute_file_hashes(file_path)
         text = extract_text_from_md(file_path)
+        filename = file_path.name
+    elif is_price_list(file_path):
+        # Книга не читается здесь целиком: только до строки заголовков; хеш по байтам файла,
+        # строки — потоково при записи
+        try:
+            find_header(file_path)
+        except WORKBOOK_ERRORS as exc:
+            return {"file_path": file_path, "skip": f"повреждённый или не прайс-лист XLSX ({exc})"}
+        sha256, sha1 = compute_file_hashes(file_path)
+        return {
+            "file_path": file_path,
+            "kind": "price_list",
+            "text": "",
+            "sha256": sha256,
+            "sha1": sha1,
+            "text_hash": sha256,
+            "minhash": None,
+            "title": price_list_title(file_path.name),
+            "topic": PRICE_LIST_TOPIC,
+            "topic_candidates": [(PRICE_LIST_TOPIC, 0.0)],
+        }
     else:
-        warn(f"Пропуск {file_path.name}: неподдерживаемый формат (пока поддерживаются только .md)")
         return None
     
+    title = extract_title_from_content(text, filename)
+    candidates = load_classifier().classify(text, title)
+    
+    return {
+        "file_path": file_path,
+        "kind": "article",
+        "text": text,
+        "sha256": sha256,
+        "sha1": sha1,
+        "text_hash": compute_sha256(text),
+        "minhash": compute_minhash(text),
+        "title": title,
+        "topic": candidates[0][0],
+        "topic_candidates": candidates[:3],
+    }
+
+
+def iter_analyzed_files(
+    items: List[Tuple[Path, Optional[str]]],
+    jobs: int = 1,
+) -> Iterator[Tuple[Tuple[Path, Optional[str]], Optional[Dict]]]:
+    """
+    Анализирует файлы и члены архивов (последовательно или в пуле из jobs процессов).
+    
+    Результаты отдаются строго в порядке items, чтобы фаза записи
+    выделяла ID детерминированно. В пуле одновременно находится не более
+    jobs * 4 задач, поэтому память не растёт с размером пакета.
+    """
+    if jobs <= 1 or len(items) <= 1:
+        for item in items:
+            yield item, analyze_file(*item)
+        return
+    
+    window = jobs * 4
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending: deque = deque()
+        for item in items:
+            pending.append((item, pool.submit(analyze_file, *item)))
+            if len(pending) >= window:
+                done_item, future = pending.popleft()
+                yield done_item, future.result()
+        while pending:
+            done_item, future = pending.popleft()
+            yield done_item, future.result()
+
+
+def resolve_article_dir(
+    topic: str,
+    article_slug: str,
+    source: str,
+    session: MetaSession,
+    allow_update: bool = True,
+) -> Tuple[Path, Optional[Dict]]:
+    """
+    Выбирает папку статьи, не затирая существующие README.md.
+    
+    Если по слагу уже есть статья из того же источника (полный путь
+    inbox/<файл> или inbox/<архив>.zip/<член>, не только имя файла) и
+    allow_update, она обновляется на месте: возвращается её front-matter
+    (id и created сохраняются). Иначе к слагу добавляется -2, -3, ...
+    Папки, занятые в этом же пакете, не переиспользуются.
+    """
+    source_path = f"inbox/{source}"
+    suffix = 1
+    while True:
+        slug = article_slug if suffix == 1 else f"{article_slug[:50 - len(str(suffix)) - 1].rstrip('-')}-{suffix}"
+        article_dir = KB_ROOT / topic / slug
+        article_readme = article_dir / "README.md"
+        if str(article_readme) not in session.claimed_paths:
+            if not article_readme.exists():
+                return article_dir, None
+            existing = read_front_matter(article_readme)
+            if allow_update and existing.get("source") == source_path and existing.get("id"):
+                return article_dir, existing
+        suffix += 1
+
+
+def commit_file(
+    file_path: Path,
+    analysis: Optional[Dict],
+    session: MetaSession,
+    dry_run: bool = False,
+    near_dup_threshold: float = NEAR_DUP_THRESHOLD,
+    member: Optional[str] = None,
+    skip_near_duplicates: bool = False,
+) -> Optional[Dict]:
+    """
+    Фиксирует результат анализа: проверка дубликата, ID, запись статьи, перемещение.
+    
+    Выполняется только последовательно; метаданные накапливаются в session.
+    Члены архива (member) не перемещаются — архив переносится целиком
+    после обработки всех его членов. Почти-дубликат (возможно, исправленная
+    версия статьи) записывается и отмечается в dedup_log со сходством;
+    с skip_near_duplicates он пропускается, как точный дубликат.
+    
+    Returns:
+        Dict с информацией о созданной статье или None, если файл был пропущен.
+    """
+    source = source_name(file_path, member)
+    info(f"Обработка: {source}")
+    
+    if analysis is None:
+        warn(f"Пропуск {source}: неподдерживаемый формат (поддерживаются .md, .xlsx и .zip с .md)")
+        return None
+    if "skip" in analysis:
+        # Источник остаётся в inbox, журнал загрузки не трогается
+        warn(f"Пропуск {source}: {analysis['skip']}")
+        return None
+    
+    text = analysis["text"]
+    text_hash = analysis["text_hash"]
+    title = analysis["title"]
+    topic = analysis["topic"]
+    
+    # Журнал загрузки: документ уже доведён до конца или прерван после записи статьи
+    previous = session.ingestion.state(analysis["sha256"])
+    if previous is not None and previous["status"] in IngestionRegistry.DONE:
+        # Статья не пишется заново; отдельный файл сразу уходит в processed, член архива — с архивом
+        info(f"  Уже загружен: {previous.get('article_path') or previous.get('duplicate_of')}")
+        finish_source(file_path, previous, session, dry_run, member)
+        session.file_done()
+        return None
+    if previous is not None and previous["status"] == "written" and Path(previous["article_path"]).exists():
+        return resume_written(file_path, analysis, previous, session, dry_run, member)
+    
+    article_slug = to_kebab_case(title)[:50].rstrip("-")  # Ограничиваем длину
+    entry = session.record_ingestion({
+        "document_id": article_slug,
+        "source_path": f"inbox/{source}",
+        "sha1": analysis["sha1"],
+        "sha256": analysis["sha256"],
+    }, "parsed")
+    
     # Проверка на дубликат
-    text_hash = compute_sha256(text)
-    dedup_index = load_dedup_index()
+    canonical_path = session.find_duplicate(text_hash)
     
-    if text_hash in dedup_index:
-        canonical_path = dedup_index[text_hash]
-        warn(f"Дубликат обнаружен: {file_path.name} -> {canonical_path}")
-        log_duplicate(file_path.name, canonical_path, f"sha256={text_hash[:8]}...")
-        
-        if not dry_run:
-            move_to_processed(file_path)
-        
+    if canonical_path is not None:
+        warn(f"Дубликат обнаружен: {source} -> {canonical_path}")
+        session.log_duplicate(source, canonical_path, f"sha256={text_hash[:8]}...")
+        finish_source(file_path, {**entry, "duplicate_of": canonical_path}, session, dry_run, member)
+        session.file_done()
         return None
     
-    # Извлекаем заголовок
-    title = extract_title_from_content(text, file_path.name)
+    if analysis.get("kind") == "price_list":
+        return commit_price_list(file_path, analysis, entry, article_slug, session, dry_run)
+    
+    # Проверка на почти-дубликат (MinHash/LSH)
+    near_dup = session.find_near_duplicate(analysis["minhash"], near_dup_threshold)
+    
+    if near_dup is not None and skip_near_duplicates:
+        canonical_path, similarity = near_dup
+        warn(f"Почти-дубликат пропущен: {source} -> {canonical_path} (сходство {similarity:.2f})")
+        session.log_duplicate(source, canonical_path, f"minhash similarity={similarity:.2f}")
+        finish_source(file_path, {**entry, "duplicate_of": canonical_path}, session, dry_run, member)
+        session.file_done()
+        return None
     
-    # Классифицируем тему
-    topic = classify_topic(text, title)
-    info(f"  Тема: {topic}")
+    info(f"  Тема: {topic} ({', '.join(f'{t}={s:g}' for t, s in analysis['topic_candidates'])})")
     info(f"  Заголовок: {title}")
     
-    # Выделяем ID
-    article_id = allocate_id()
+    # Путь статьи: существующий README.md той же статьи обновляется, чужой — не затирается
+    article_dir, existing = resolve_article_dir(topic, article_slug, source, session)
+    article_readme = article_dir / "README.md"
+    
+    if existing is not None:
+        article_id = str(existing["id"])
+        created = str(existing.get("created") or "") or None
+        warn(f"Статья из того же источника уже есть: {article_readme} — обновляется, ID {article_id} сохранён")
+        session.log_duplicate(source, str(article_readme), f"updated in place, id={article_id}")
+    else:
+        # Выделяем ID
+        article_id = session.allocate_id()
+        created = None
+        if article_dir.name != article_slug:
+            # Статья с тем же слагом из другого источника не затирается; совпадение — в журнал для разбора
+            taken = KB_ROOT / topic / article_slug / "README.md"
+            warn(f"Папка {taken.parent} занята статьёй из другого источника, используется {article_dir.name}")
+            session.log_duplicate(source, str(taken), f"slug collision, written to {article_dir.name}")
     info(f"  ID: {article_id}")
     
-    # Создаём путь для статьи
-    article_slug = to_kebab_case(title)[:50]  # Ограничиваем длину
-    article_dir = KB_ROOT / topic / article_slug
-    article_readme = article_dir / "README.md"
+    flags = {}
+    if near_dup is not None and near_dup[0] != str(article_readme):
+        canonical_path, similarity = near_dup
+        warn(f"Почти-дубликат: {source} -> {canonical_path} (сходство {similarity:.2f}), статья записывается")
+        session.log_duplicate(
+            source, canonical_path, f"minhash similarity={similarity:.2f}, flagged, written to {article_readme}"
+        )
+        flags = {"near_duplicate_of": canonical_path, "similarity": round(similarity, 2)}
     
     # Создаём статью
     article_content = create_article_from_content(
-        text, title, topic, file_path.name, article_id
+        text, title, topic, source, article_id, created
     )
     
     if not dry_run:
-        article_dir.mkdir(parents=True, exist_ok=True)
-        article_readme.write_text(article_content, encoding="utf-8")
-        info(f"  Создано: {article_readme}")
+        atomic_write_text(article_readme, article_content)
+        info(f"  {'Обновлено' if existing is not None else 'Создано'}: {article_readme}")
         
-        # Обновляем индекс дедупликации
-        dedup_index[text_hash] = str(article_readme)
-        save_dedup_index(dedup_index)
-        
-        # Обновляем README темы
-        update_topic_readme(topic, article_readme, title)
-        
-        # Перемещаем в processed
-        processed_path = move_to_processed(file_path)
-        info(f"  Перемещено в: {processed_path}")
+        # README темы (список статей пересобирается после пакета)
+        if not (KB_ROOT / topic / "README.md").exists():
+            ensure_topic_readme(topic, session.allocate_id())
+    
+    # Обновляем индекс дедупликации и журнал загрузки
+    session.add_article(text_hash, str(article_readme), analysis["minhash"])
+    entry = session.record_ingestion(entry, "written", id=article_id, article_path=str(article_readme), **flags)
+    finish_source(file_path, entry, session, dry_run, member)
+    session.file_done()
+    
+    return {
+        "id": article_id,
+        "title": title,
+        "topic": topic,
+        "path": str(article_readme),
+        "source": source,
+        **flags,
+    }
+
+
+def commit_price_list(
+    file_path: Path,
+    analysis: Dict,
+    entry: Dict,
+    article_slug: str,
+    session: MetaSession,
+    dry_run: bool = False,
+) -> Optional[Dict]:
+    """
+    Прайс-лист XLSX: вместо одной статьи — prices.csv, страницы и паспорт (см. price_list).
+    
+    Строки книги читаются потоково, поэтому память не зависит от размера прайса.
+    ID паспорта и страниц выделяются из той же сессии, что и у статей.
+    Книга, повреждённая дальше строки заголовков, пропускается (состояние
+    skipped, источник остаётся в inbox); None в этом случае.
+    """
+    title = analysis["title"]
+    topic = analysis["topic"]
+    # Страницы прайса получают новые ID, поэтому существующая папка не обновляется, а обходится
+    article_dir, _ = resolve_article_dir(topic, article_slug, file_path.name, session, allow_update=False)
+    article_readme = article_dir / "README.md"
+    info(f"  Прайс-лист: {title}")
+    try:
+        overrides = configured_columns(file_path.name)
+    except ValueError as exc:
+        warn(f"Колонки прайс-листа из конфигурации не применены ({exc}), используются заголовки")
+        overrides = {}
+    if overrides:
+        info(f"  Колонки из конфигурации: {', '.join(sorted(overrides))}")
+    
+    if dry_run:
+        article_id = session.allocate_id()
+        info(f"  ID паспорта: {article_id} (страницы получат ID при записи)")
+    else:
+        try:
+            summary = write_price_list(
+                file_path, article_dir, title, f"inbox/{file_path.name}", session.allocate_id, overrides=overrides
+            )
+        except WORKBOOK_ERRORS as exc:
+            warn(f"Пропуск {file_path.name}: повреждённый прайс-лист XLSX ({exc})")
+            session.record_ingestion(entry, "skipped", reason=str(exc))
+            session.file_done()
+            return None
+        article_id = summary.index_id
+        info(f"  ID: {article_id}")
+        info(f"  Создано: {article_readme} ({summary.rows} позиций, {summary.pages} стр.)")
+        if not (KB_ROOT / topic / "README.md").exists():
+            ensure_topic_readme(topic, session.allocate_id())
+    
+    session.add_article(analysis["text_hash"], str(article_readme))
+    entry = session.record_ingestion(entry, "written", id=article_id, article_path=str(article_readme))
+    finish_source(file_path, entry, session, dry_run)
+    session.file_done()
     
     return {
         "id": article_id,
@@ -447,6 +1031,82 @@ def process_file(file_path: Path, dry_run: bool = False) -> Optional[Dict]:
     }
 
 
+def finish_source(
+    file_path: Path,
+    entry: Dict,
+    session: MetaSession,
+    dry_run: bool = False,
+    member: Optional[str] = None,
+) -> None:
+    """Переносит источник в processed и отмечает документ как moved (член архива — позже, с архивом)."""
+    if member is not None:
+        session.defer_archive_move(file_path, entry)
+        return
+    processed_path = move_to_processed(file_path, dry_run)
+    if not dry_run:
+        info(f"  Перемещено в: {processed_path}")
+    session.record_ingestion(entry, "moved", processed_path=str(processed_path))
+
+
+def resume_written(
+    file_path: Path,
+    analysis: Dict,
+    entry: Dict,
+    session: MetaSession,
+    dry_run: bool = False,
+    member: Optional[str] = None,
+) -> Dict:
+    """
+    Досрочно завершает документ, статья которого записана до сбоя.
+    
+    Статья и её ID не создаются заново: индексы дедупликации дополняются
+    (если сбой был до сохранения метаданных), источник переносится.
+    """
+    article_path = entry["article_path"]
+    info(f"  Продолжение после сбоя: статья уже записана ({article_path})")
+    if session.find_duplicate(analysis["text_hash"]) is None:
+        session.add_article(analysis["text_hash"], article_path, analysis["minhash"])
+    finish_source(file_path, entry, session, dry_run, member)
+    session.file_done()
+    return {
+        "id": entry.get("id", ""),
+        "title": analysis["title"],
+        "topic": Path(article_path).parent.parent.name,
+        "path": article_path,
+        "source": source_name(file_path, member),
+    }
+
+
+def process_file(
+    file_path: Path,
+    dry_run: bool = False,
+    session: Optional[MetaSession] = None,
+    near_dup_threshold: float = NEAR_DUP_THRESHOLD,
+    skip_near_duplicates: bool = False,
+) -> Optional[Dict]:
+    """
+    Обрабатывает один файл из inbox (архивы — через main()).
+    
+    Без session метаданные сохраняются сразу после обработки файла.
+    
+    Returns:
+        Dict с информацией о созданной статье или None, если файл был пропущен.
+    """
+    analysis = analyze_file(file_path)
+    if session is None:
+        with MetaSession(dry_run=dry_run) as own_session:
+            result = commit_file(
+                file_path, analysis, own_session, dry_run, near_dup_threshold,
+                skip_near_duplicates=skip_near_duplicates,
+            )
+        if result and not dry_run:
+            rebuild_indexes(KB_ROOT)
+        return result
+    return commit_file(
+        file_path, analysis, session, dry_run, near_dup_threshold, skip_near_duplicates=skip_near_duplicates
+    )
+
+
 def main() -> None:
     """Главная функция."""
     parser = argparse.ArgumentParser(
@@ -457,8 +1117,45 @@ def main() -> None:
         action="store_true",
         help="Только показать, что будет сделано, без изменений"
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Число процессов для извлечения и классификации (запись всегда последовательная)"
+    )
+    parser.add_argument(
+        "--flush-every",
+        type=int,
+        default=0,
+        help="Сохранять метаданные каждые N файлов (по умолчанию — один раз в конце пакета)"
+    )
+    parser.add_argument(
+        "--near-dup-threshold",
+        type=float,
+        default=NEAR_DUP_THRESHOLD,
+        help=f"Порог сходства MinHash для почти-дубликатов (по умолчанию {NEAR_DUP_THRESHOLD}; > 1 отключает)"
+    )
+    parser.add_argument(
+        "--skip-near-duplicates",
+        action="store_true",
+        help="Пропускать почти-дубликаты, как точные (по умолчанию статья записывается и отмечается в dedup_log)"
+    )
+    parser.add_argument(
+        "--reclassify",
+        action="store_true",
+        help="Пересчитать темы всех статей kb/ru и показать расхождения (без изменений)"
+    )
     args = parser.parse_args()
     
+    if args.reclassify:
+        started = time.perf_counter()
+        changes = reclassify_kb()
+        for change in changes:
+            proposed = ", ".join(f"{t}={s:g}" for t, s in change["candidates"])
+            info(f"{change['path']}: {change['topic']}={change['current_score']:g} -> {proposed}")
+        info(f"Статей с другой лучшей темой: {len(changes)} ({time.perf_counter() - started:.2f} с)")
+        return
+    
     info("=== Обработчик inbox ===")
     if args.dry_run:
         info("РЕЖИМ: dry-run (без изменений)")
@@ -474,12 +1171,33 @@ def main() -> None:
         info("Нет файлов для обработки")
         return
     
+    items = expand_work_items(files)
+    archives = sorted({file_path for file_path, member in items if member is not None})
+    
     # Обрабатываем файлы
     processed_articles = []
-    for file_path in files:
-        result = process_file(file_path, dry_run=args.dry_run)
-        if result:
-            processed_articles.append(result)
+    with MetaSession(dry_run=args.dry_run, flush_every=args.flush_every) as session:
+        for file_path, member in items:
+            session.record_ingestion({"source_path": f"inbox/{source_name(file_path, member)}"}, "queued")
+        for (file_path, member), analysis in iter_analyzed_files(items, jobs=args.jobs):
+            result = commit_file(
+                file_path, analysis, session, args.dry_run, args.near_dup_threshold, member,
+                args.skip_near_duplicates,
+            )
+            if result:
+                processed_articles.append(result)
+        
+        # Архивы переносятся только после обработки всех членов
+        for archive_path in archives:
+            processed_path = move_to_processed(archive_path, args.dry_run)
+            if not args.dry_run:
+                info(f"Архив перемещён в: {processed_path}")
+            session.archive_moved(archive_path, processed_path)
+    
+    # Списки статей тем и индексы — один проход после всего пакета
+    if processed_articles and not args.dry_run:
+        for index_path in rebuild_indexes(KB_ROOT):
+            info(f"Индекс обновлён: {index_path}")
     
     # Итоговый отчёт
     info("\n=== Итоги ===")
@@ -492,6 +1210,8 @@ def main() -> None:
             info(f"  - {article['id']}: {article['title']}")
             info(f"    Путь: {article['path']}")
             info(f"    Источник: {article['source']}")
+            if "near_duplicate_of" in article:
+                info(f"    Почти-дубликат: {article['near_duplicate_of']} (сходство {article['similarity']:.2f})")
 
 
 if __name__ == "__main__":
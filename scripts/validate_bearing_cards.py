@@ -10,104 +10,20 @@
 """
 from __future__ import annotations
 
-import re
 import sys
 from pathlib import Path
-from typing import Any, Dict
+
+from kb_frontmatter import read_front_matter
 
 # Путь к карточкам подшипников
 BEARING_CARDS_ROOT = Path("kb/ru/bearings/cards")
 
-YAML_START = re.compile(r"^---\s*$")
-
-
-def parse_yaml_value(value: str) -> Any:
-    """Простой парсер YAML значений."""
-    value = value.strip()
-    
-    # Списки
-    if value.startswith("[") and value.endswith("]"):
-        content = value[1:-1].strip()
-        if not content:
-            return []
-        # Простой парсинг списка (без вложенных структур)
-        items = []
-        for item in content.split(","):
-            item = item.strip().strip('"').strip("'")
-            items.append(item)
-        return items
-    
-    # Словари (упрощённо)
-    if value.startswith("{") and value.endswith("}"):
-        return value  # Возвращаем как строку для дальнейшего разбора
-    
-    # Числа
-    try:
-        if "." in value:
-            return float(value)
-        return int(value)
-    except ValueError:
-        pass
-    
-    # Строки
-    return value.strip('"').strip("'")
-
-
-def parse_front_matter(text: str) -> Dict[str, Any]:
-    """Извлекает YAML front-matter из текста."""
-    lines = text.splitlines()
-    if not lines or not YAML_START.match(lines[0]):
-        return {}
-
-    end = None
-    for i in range(1, min(len(lines), 200)):
-        if YAML_START.match(lines[i]):
-            end = i
-            break
-    if end is None:
-        return {}
-
-    fm_lines = lines[1:end]
-    fm: Dict[str, Any] = {}
-    current_key = None
-    
-    for ln in fm_lines:
-        # Пропускаем пустые строки и комментарии
-        if not ln.strip() or ln.strip().startswith("#"):
-            continue
-            
-        # Ключ-значение
-        if ":" in ln and not ln.startswith(" "):
-            key, _, value = ln.partition(":")
-            key = key.strip()
-            value = value.strip()
-            current_key = key
-            
-            if value:
-                fm[key] = parse_yaml_value(value)
-            else:
-                fm[key] = None
-        # Продолжение значения (например, в списках)
-        elif ln.startswith(" ") and current_key:
-            if ln.strip().startswith("-"):
-                # Элемент списка
-                if fm[current_key] is None:
-                    fm[current_key] = []
-                item = ln.strip()[1:].strip()
-                if item.startswith("{"):
-                    fm[current_key].append(item)
-                else:
-                    fm[current_key].append(parse_yaml_value(item))
-    
-    return fm
-
 
 def validate_bearing_card(path: Path) -> list[str]:
     """Валидация карточки подшипника. Возвращает список ошибок."""
     errors = []
     
-    text = path.read_text(encoding="utf-8", errors="replace")
-    fm = parse_front_matter(text)
+    fm = read_front_matter(path)
     
     if not fm:
         return [f"{path}: отсутствует YAML front-matter"]
@@ -119,7 +35,7 @@ def validate_bearing_card(path: Path) -> list[str]:
             errors.append(f"{path}: отсутствует поле 'designation'")
         else:
             desig = fm["designation"]
-            if isinstance(desig, str):
+            if not isinstance(desig, dict) or "base" not in desig or "suffixes" not in desig:
                 errors.append(f"{path}: 'designation' должен быть словарём с 'base' и 'suffixes'")
         
         # dims
@@ -127,18 +43,15 @@ def validate_bearing_card(path: Path) -> list[str]:
             errors.append(f"{path}: отсутствует поле 'dims' (размеры)")
         else:
             dims = fm["dims"]
-            if isinstance(dims, str) and "{" in dims:
-                # Простая проверка наличия d, D, B
-                if "d:" not in dims or "D:" not in dims or "B:" not in dims:
-                    errors.append(f"{path}: 'dims' должен содержать d, D, B")
+            if not isinstance(dims, dict) or not {"d", "D", "B"} <= dims.keys():
+                errors.append(f"{path}: 'dims' должен содержать d, D, B")
         
         # load_capacity
         if "load_capacity" in fm:
             lc = fm["load_capacity"]
-            if isinstance(lc, str) and "{" in lc:
-                # Проверка наличия динамической грузоподъёмности
-                if "dynamic_C_kN" not in lc and "C_kN" not in lc:
-                    errors.append(f"{path}: 'load_capacity' должен содержать dynamic_C_kN")
+            # Проверка наличия динамической грузоподъёмности
+            if not isinstance(lc, dict) or ("dynamic_C_kN" not in lc and "C_kN" not in lc):
+                errors.append(f"{path}: 'load_capacity' должен содержать dynamic_C_kN")
         
         # equivalents
         if "equivalents" in fm:
@@ -147,6 +60,8 @@ def validate_bearing_card(path: Path) -> list[str]:
                 errors.append(f"{path}: 'equivalents' должен быть списком")
             elif len(equivs) == 0:
                 errors.append(f"{path}: 'equivalents' пуст, добавьте хотя бы один эквивалент")
+            elif not all(isinstance(e, dict) and "manufacturer" in e and "code" in e for e in equivs):
+                errors.append(f"{path}: элементы 'equivalents' должны содержать manufacturer и code")
     
     return errors
 
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Потоковое чтение XLSX только средствами стандартной библиотеки (zipfile + iterparse).
+
+Лист читается прямо из ZIP-члена через `xml.etree.ElementTree.iterparse`:
+каждая строка `<row>` разбирается и сразу удаляется из дерева, поэтому
+память не растёт с числом строк. Таблица общих строк (sharedStrings.xml)
+читается так же потоково и хранится списком — её размер ограничен числом
+уникальных строк, а не строк листа.
+
+Типы ячеек: общие и inline-строки -> str, числа -> int (если целое) или
+float, логические -> bool, ошибки (#N/A) -> None. Стили не читаются,
+поэтому даты остаются серийными числами Excel. Повреждённая книга
+поднимает одно из READ_ERRORS.
+
+Использование:
+    from xlsx_reader import XlsxReader
+    with XlsxReader(path) as book:
+        for row_number, cells in book.iter_rows("Лист1"):
+            ...
+"""
+from __future__ import annotations
+
+import posixpath
+import re
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from xml.etree.ElementTree import ParseError, iterparse
+
+Cell = Union[str, int, float, bool, None]
+
+NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+CELL_REF = re.compile(r"([A-Z]+)(\d+)")
+# Ошибки повреждённой книги: не ZIP, нет нужного члена, битый XML, неверное число
+READ_ERRORS = (zipfile.BadZipFile, KeyError, ParseError, ValueError)
+
+
+def column_index(letters: str) -> int:
+    """A -> 0, Z -> 25, AA -> 26."""
+    index = 0
+    for ch in letters:
+        index = index * 26 + ord(ch) - 64
+    return index - 1
+
+
+def column_letters(index: int) -> str:
+    """0 -> A, 26 -> AA."""
+    letters = ""
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _number(text: str) -> Union[int, float]:
+    try:
+        return int(text)
+    except ValueError:
+        value = float(text)
+        return int(value) if value.is_integer() and abs(value) < 2**53 else value
+
+
+def _rich_text(elem) -> str:
+    """Текст <si>/<is>: простой <t> или runs <r><t>; фонетика <rPh> пропускается."""
+    parts = []
+    for child in elem:
+        if child.tag == f"{NS}t":
+            parts.append(child.text or "")
+        elif child.tag == f"{NS}r":
+            t = child.find(f"{NS}t")
+            if t is not None:
+                parts.append(t.text or "")
+    return "".join(parts)
+
+
+class XlsxReader:
+    """Книга XLSX: список листов и потоковые строки листа."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._zip = zipfile.ZipFile(path)
+        self._shared: Optional[List[str]] = None
+        self._sheets: Optional[Dict[str, str]] = None
+
+    def __enter__(self) -> "XlsxReader":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._zip.close()
+
+    def sheets(self) -> Dict[str, str]:
+        """Имя листа -> путь XML-члена, в порядке книги."""
+        if self._sheets is None:
+            rels = {}
+            with self._zip.open("xl/_rels/workbook.xml.rels") as f:
+                for _event, elem in iterparse(f):
+                    if elem.tag == f"{PKG_REL_NS}Relationship":
+                        target = elem.get("Target", "")
+                        target = target.lstrip("/") if target.startswith("/") else posixpath.join("xl", target)
+                        rels[elem.get("Id")] = posixpath.normpath(target)
+            self._sheets = {}
+            with self._zip.open("xl/workbook.xml") as f:
+                for _event, elem in iterparse(f):
+                    if elem.tag == f"{NS}sheet":
+                        self._sheets[elem.get("name", "")] = rels[elem.get(f"{REL_NS}id")]
+        return self._sheets
+
+    def shared_strings(self) -> List[str]:
+        if self._shared is None:
+            self._shared = []
+            if "xl/sharedStrings.xml" in self._zip.NameToInfo:
+                with self._zip.open("xl/sharedStrings.xml") as f:
+                    for event, elem in iterparse(f, events=("start", "end")):
+                        if event == "start" and elem.tag == f"{NS}sst":
+                            root = elem
+                        elif event == "end" and elem.tag == f"{NS}si":
+                            self._shared.append(_rich_text(elem))
+                            root.clear()
+        return self._shared
+
+    def _cell_value(self, cell) -> Cell:
+        kind = cell.get("t", "n")
+        if kind == "inlineStr":
+            inline = cell.find(f"{NS}is")
+            return _rich_text(inline) if inline is not None else None
+        v = cell.find(f"{NS}v")
+        if v is None or v.text is None:
+            return None
+        if kind == "s":
+            return self.shared_strings()[int(v.text)]
+        if kind in ("str", "d"):
+            return v.text
+        if kind == "b":
+            return v.text == "1"
+        if kind == "e":
+            return None
+        return _number(v.text)
+
+    def iter_rows(self, sheet: Optional[str] = None) -> Iterator[Tuple[int, List[Cell]]]:
+        """
+        (номер строки с 1, значения ячеек от колонки A) для непустых строк листа.
+
+        Пропущенные ячейки заполняются None; без sheet читается первый лист.
+        """
+        sheets = self.sheets()
+        member = sheets[sheet] if sheet is not None else next(iter(sheets.values()))
+        self.shared_strings()
+        sheet_data = None
+        row_number = 0
+        with self._zip.open(member) as f:
+            for event, elem in iterparse(f, events=("start", "end")):
+                if event == "start":
+                    if elem.tag == f"{NS}sheetData":
+                        sheet_data = elem
+                    continue
+                if elem.tag != f"{NS}row":
+                    continue
+                row_number = int(elem.get("r") or row_number + 1)
+                cells: List[Cell] = []
+                for cell in elem.iter(f"{NS}c"):
+                    ref = CELL_REF.match(cell.get("r") or "")
+                    col = column_index(ref.group(1)) if ref else len(cells)
+                    if col >= len(cells):
+                        cells.extend([None] * (col + 1 - len(cells)))
+                    cells[col] = self._cell_value(cell)
+                if sheet_data is not None:
+                    sheet_data.clear()  # разобранные строки не копятся в дереве
+                while cells and cells[-1] is None:
+                    cells.pop()
+                if cells:
+                    yield row_number, cells
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Check that axial loads a bearing cannot carry are rejected, not rated on Fr.
+
+Runs bearing_life.evaluate() and bearing_select over the whole catalog (NumPy or pure Python,
+whichever is installed):
+
+- Fr = 0, Fa > 0: every cylindrical roller row (NU/N and NJ/NUP alike) gets
+  L10h = s0 = 0 and is dropped by a min_life_h requirement; no row of any
+  type gets an infinite or zero-load rating;
+- Fa/Fr within FA_FR_MAX: NJ/NUP rows are still rated, NU/N rows are not;
+- bearing_select: with Fr = 0, Fa > 0 no cylindrical roller is feasible and
+  every candidate has a finite L10h, with or without a life target.
+
+Usage:
+    python tests/check_bearing_axial_load.py
+"""
+from __future__ import annotations
+
+import math
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from bearing_catalog import DEFAULT_CATALOG  # noqa: E402
+from bearing_life import FA_FR_MAX, NO_AXIAL_SERIES, LoadCase, evaluate  # noqa: E402
+from bearing_query import CatalogIndex  # noqa: E402
+from bearing_select import Requirement, SelectionEngine  # noqa: E402
+
+
+def main() -> int:
+    index = CatalogIndex.from_path(ROOT / DEFAULT_CATALOG)
+    columns = index.columns
+    names, types, series = columns["designation"], columns["type"], columns["series"]
+    cylindrical = {i for i, t in enumerate(types) if t == "roller_cylindrical"}
+    errors = []
+
+    pure_axial = LoadCase("pure-axial", 0.0, 1000.0, 1000.0, False)
+    result = next(evaluate(columns, [pure_axial]))
+    for i, P, L10h, s0 in zip(result.rows, result.P, result.L10h, result.s0):
+        if i in cylindrical and (L10h != 0 or s0 != 0):
+            errors.append(f"{names[i]}: Fr=0, Fa>0 rated L10h={L10h}, s0={s0}")
+        if P == 0 or math.isinf(L10h):
+            errors.append(f"{names[i]}: Fr=0, Fa>0 gives P={P}, L10h={L10h}")
+    kept = next(evaluate(columns, [pure_axial], min_life_h=1.0)).rows
+    errors += [f"{names[i]}: Fr=0, Fa>0 passes min_life_h" for i in kept if i in cylindrical]
+
+    light_axial = LoadCase("light-axial", 2000.0, 2000.0 * FA_FR_MAX, 1000.0, False)
+    result = next(evaluate(columns, [light_axial], rows=sorted(cylindrical)))
+    for i, L10h in zip(result.rows, result.L10h):
+        rated = L10h > 0
+        if rated == (series[i] in NO_AXIAL_SERIES):
+            errors.append(f"{names[i]}: Fa/Fr={FA_FR_MAX} {'rated' if rated else 'rejected'} for series {series[i]}")
+
+    engine = SelectionEngine(index)
+    for life_h in (20000.0, 0.0):
+        req = Requirement(d_mm=25.0, Fr=0.0, Fa=3000.0, rpm=3000.0, life_h=life_h)
+        for c in engine.feasible(req):
+            if c.row in cylindrical or not 0 < c.L10h < math.inf:
+                errors.append(f"{names[c.row]}: selected for Fr=0, Fa>0 (life_h={life_h:g}, L10h={c.L10h})")
+
+    if errors:
+        print("Axial load check failed:")
+        for error in errors:
+            print(f"- {error}")
+        return 1
+    print(f"OK: axial load checked on {len(names)} catalog row(s), {len(cylindrical)} cylindrical roller(s).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
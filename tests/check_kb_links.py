@@ -1,54 +1,238 @@
 #!/usr/bin/env python3
+"""
+Check relative links and anchors in every markdown file under kb/.
+
+Files are scanned in a process pool: each worker extracts the links of its
+chunk (outside fenced code blocks and inline code) together with the
+heading slugs of every file, so anchors (`page.md#heading`, `#heading`) are
+checked against precomputed slugs. Link targets are resolved once per
+(directory, target) pair and existence is checked once per resolved path —
+most articles point at the same handful of topic READMEs.
+
+Usage:
+    python tests/check_kb_links.py
+    python tests/check_kb_links.py --jobs 8 kb/ru/bearings
+"""
 from __future__ import annotations
 
-from dataclasses import dataclass
-from pathlib import Path
+import argparse
+import os
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+from urllib.parse import unquote
 
 
 ROOT = Path(__file__).resolve().parents[1]
-KB_FILES = [
-    ROOT / "kb" / "ru" / "INDEX.md",
-    ROOT / "kb" / "ru" / "overview" / "README.md",
-]
-LINK_PATTERN = re.compile(r"\[[^]]+]\(([^)]+)\)")
+KB_ROOT = ROOT / "kb"
+# Line-start patterns begin with a literal "\n" (the text gets one prepended):
+# the regex engine then jumps between newlines instead of trying "^" at every
+# offset, which is most of the scan time on large trees.
+LINK_PATTERN = re.compile(r"\[[^]\n]*]\(\s*(<[^>\n]*>|[^)\s]+)(?:[ \t]+[\"'(][^)\n]*)?\)")
+REFERENCE_PATTERN = re.compile(r"\n {0,3}\[[^]\n]+]:[ \t]*(<[^>\n]*>|\S+)")
+HEADING_PATTERN = re.compile(r"\n {0,3}#{1,6}[ \t]+([^\n]*?)(?:[ \t]+#+)?[ \t]*(?=\n|\Z)")
+FENCED_BLOCK = re.compile(
+    r"^ {0,3}(?P<fence>(?P<char>[`~])(?P=char){2,})[^\n]*\n.*?(?:^ {0,3}(?P=fence)(?P=char)*[ \t]*$|\Z)",
+    re.MULTILINE | re.DOTALL,
+)
+INLINE_CODE = re.compile(r"(`+)[^\n]+?\1")
+SCHEME = re.compile(r"^[A-Za-z][A-Za-z0-9+.-]*:")
+EXPLICIT_ANCHOR = re.compile(r"\{#([^}\s]+)\}\s*$")
+HTML_ANCHOR = re.compile(r"<a\s+(?:name|id)=[\"']([^\"']+)[\"']", re.IGNORECASE)
+
+Link = Tuple[int, str]  # (line number, raw target)
 
 
 @dataclass(frozen=True)
 class MissingLink:
     source: Path
-    target: Path
+    line: int
+    target: str
+    reason: str
+
+
+@lru_cache(maxsize=65536)
+def slugify(heading: str) -> str:
+    """GitHub-style heading anchor: lowercase, markup and punctuation dropped, spaces to dashes."""
+    text = re.sub(r"!?\[([^]]*)]\([^)]*\)", r"\1", heading)  # links -> their text
+    text = re.sub(r"<[^>]+>", "", text).lower()
+    return "".join(ch for ch in text if ch.isalnum() or ch in "-_ ").replace(" ", "-")
+
+
+def scan_markdown(text: str) -> Tuple[List[str], List[Link]]:
+    """
+    Heading slugs (with GitHub's -1, -2 suffixes for repeats) and links of one document.
+
+    Fenced blocks are blanked to newlines and inline code to spaces first, so
+    whole-text regexes skip code while offsets and line numbers stay intact.
+    """
+    if "`" in text or "~~~" in text:
+        text = FENCED_BLOCK.sub(lambda m: "\n" * m.group().count("\n"), text)
+        text = INLINE_CODE.sub(lambda m: " " * len(m.group()), text)
+    text = "\n" + text
+
+    slugs: List[str] = HTML_ANCHOR.findall(text) if "<a" in text else []
+    seen: Dict[str, int] = {}
+    for heading in HEADING_PATTERN.finditer(text):
+        title = heading.group(1)
+        explicit = EXPLICIT_ANCHOR.search(title)
+        if explicit:
+            slugs.append(explicit.group(1))
+            title = title[: explicit.start()].rstrip()
+        slug = slugify(title)
+        count = seen.get(slug, 0)
+        seen[slug] = count + 1
+        slugs.append(slug if count == 0 else f"{slug}-{count}")
+
+    matches = list(LINK_PATTERN.finditer(text))
+    if "]:" in text:
+        matches.extend(REFERENCE_PATTERN.finditer(text))
+        matches.sort(key=lambda m: m.start(1))
+    links: List[Link] = []
+    lineno, pos = 0, 0  # the prepended "\n" is counted as well
+    for match in matches:
+        lineno += text.count("\n", pos, match.start(1))
+        pos = match.start(1)
+        links.append((lineno, match.group(1).strip("<>")))
+    return slugs, links
+
+
+def scan_chunk(paths: Sequence[str]) -> List[Tuple[str, List[str], List[Link]]]:
+    """Worker: (path, heading slugs, links) for each file of a chunk."""
+    result = []
+    for path in paths:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            slugs, links = scan_markdown(f.read())
+        result.append((path, slugs, links))
+    return result
 
 
-def collect_links(markdown_path: Path) -> list[Path]:
-    content = markdown_path.read_text(encoding="utf-8")
-    links = []
-    for match in LINK_PATTERN.finditer(content):
-        target = match.group(1).strip()
-        if target.startswith(("http://", "https://", "mailto:", "#")):
+def scan_files(paths: List[str], jobs: int) -> Iterator[Tuple[str, List[str], List[Link]]]:
+    """Scan all files, in a process pool if jobs > 1."""
+    if jobs <= 1 or len(paths) < 2:
+        yield from scan_chunk(paths)
+        return
+    chunk_size = max(1, -(-len(paths) // (jobs * 4)))
+    chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for chunk_result in pool.map(scan_chunk, chunks):
+            yield from chunk_result
+
+
+def collect_markdown(roots: Sequence[Path]) -> List[str]:
+    files: List[str] = []
+    for root in roots:
+        if root.is_file():
+            files.append(str(root.resolve()))
             continue
-        links.append((markdown_path.parent / target).resolve())
-    return links
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            files.extend(os.path.join(dirpath, name) for name in sorted(filenames) if name.endswith(".md"))
+    return [os.path.abspath(f) for f in files]
+
+
+class LinkResolver:
+    """Resolves link targets with memoized path resolution, existence checks and slug sets."""
+
+    def __init__(self, slugs: Dict[str, Set[str]]) -> None:
+        self.slugs = slugs
+        self._verdicts: Dict[Tuple[str, str], Optional[str]] = {}
+        self._kinds: Dict[str, str] = {}
+
+    def kind(self, path: str) -> str:
+        """"file", "dir" or "" (missing), one stat per path."""
+        kind = self._kinds.get(path)
+        if kind is None:
+            kind = "dir" if os.path.isdir(path) else "file" if os.path.exists(path) else ""
+            self._kinds[path] = kind
+        return kind
+
+    def anchors(self, path: str) -> Optional[Set[str]]:
+        """Slugs of a markdown file (scanned lazily if it lies outside the checked tree)."""
+        if path not in self.slugs:
+            if not path.endswith(".md") or not os.path.isfile(path):
+                return None
+            with open(path, encoding="utf-8", errors="replace") as f:
+                self.slugs[path] = set(scan_markdown(f.read())[0])
+        return self.slugs[path]
+
+    def check(self, source: str, target: str) -> Optional[str]:
+        """Reason the link is broken, or None (memoized per source folder and target)."""
+        if target.startswith("#"):
+            return self._check_anchor(source, target[1:])
+        key = (os.path.dirname(source), target)
+        if key not in self._verdicts:
+            self._verdicts[key] = self._check_target(*key)
+        return self._verdicts[key]
+
+    def _check_target(self, source_dir: str, target: str) -> Optional[str]:
+        if SCHEME.match(target):
+            return None
+        path_part, _, anchor = target.partition("#")
+        path = os.path.normpath(os.path.join(source_dir, unquote(path_part.split("?", 1)[0])))
+        kind = self.kind(path)
+        if not kind:
+            return "missing file"
+        if kind == "dir":
+            path = os.path.join(path, "README.md")
+            if self.kind(path) != "file":
+                return None
+        return self._check_anchor(path, anchor) if anchor else None
+
+    def _check_anchor(self, path: str, anchor: str) -> Optional[str]:
+        anchors = self.anchors(path)
+        anchor = unquote(anchor)
+        if anchors is not None and anchor not in anchors and anchor.lower() not in anchors:
+            return "missing anchor"
+        return None
+
+
+def check_links(roots: Sequence[Path], jobs: int) -> Tuple[int, List[MissingLink]]:
+    files = collect_markdown(roots)
+    slugs: Dict[str, Set[str]] = {}
+    links: Dict[str, List[Link]] = {}
+    for path, file_slugs, file_links in scan_files(files, jobs):
+        slugs[path] = set(file_slugs)
+        links[path] = file_links
+
+    resolver = LinkResolver(slugs)
+    missing: List[MissingLink] = []
+    for path in files:
+        for lineno, target in links[path]:
+            reason = resolver.check(path, target)
+            if reason:
+                missing.append(MissingLink(Path(path), lineno, target, reason))
+    return len(files), missing
 
 
 def main() -> int:
-    missing: list[MissingLink] = []
-    for markdown_path in KB_FILES:
-        if not markdown_path.exists():
-            missing.append(MissingLink(source=markdown_path, target=markdown_path))
-            continue
-        for target in collect_links(markdown_path):
-            if not target.exists():
-                missing.append(MissingLink(source=markdown_path, target=target))
+    parser = argparse.ArgumentParser(description="Check relative links and anchors in kb/ markdown files.")
+    parser.add_argument("paths", nargs="*", type=Path, help="Files or folders to check (default: kb/)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Scan files in a pool of N processes")
+    args = parser.parse_args()
+
+    roots = args.paths or [KB_ROOT]
+    for root in roots:
+        if not root.exists():
+            print(f"ERROR: {root} does not exist", file=sys.stderr)
+            return 2
+
+    checked, missing = check_links(roots, args.jobs)
     if missing:
         print("Missing links detected:")
         for entry in missing:
-            rel_source = entry.source.relative_to(ROOT)
-            rel_target = entry.target.relative_to(ROOT)
-            print(f"- {rel_source} -> {rel_target}")
+            try:
+                rel_source = entry.source.relative_to(ROOT)
+            except ValueError:
+                rel_source = entry.source
+            print(f"- {rel_source}:{entry.line} -> {entry.target} ({entry.reason})")
+        print(f"{len(missing)} broken link(s) in {len({m.source for m in missing})} of {checked} file(s).")
         return 1
-    print("All checked links exist.")
+    print(f"All checked links exist ({checked} files).")
     return 0
 
 